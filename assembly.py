@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""Stream the final page from the template output and named insertion points.
+
+The template HTML is scanned once; every post-processing step (OG meta,
+<html lang>, minified <style> blocks, externalized images, head and body
+injections) is recorded as an edit at a named point instead of a
+whole-document str.replace(). write() then streams the untouched slices and
+the edits straight to the output file, hashing as it goes, so the page is
+held in memory once no matter how many edits there are.
+"""
+import bisect, hashlib, os
+
+from build_cache import sha256_file
+
+
+class AssemblyError(Exception):
+    pass
+
+
+class Assembly:
+    """Template output plus ordered edits; each edit replaces source[start:end] with text."""
+
+    def __init__(self, source):
+        self.source = source
+        self.points = {}   # name -> [start, end, [text, ...]]
+        self._order = []   # (start, end, name) sorted by position
+
+    # ── Insertion points ──
+    def _add(self, name, start, end):
+        if name in self.points:
+            raise AssemblyError(f'duplicate insertion point {name!r}')
+        if self.overlaps(start, end):
+            raise AssemblyError(f'insertion point {name!r} overlaps another edit')
+        bisect.insort(self._order, (start, end, name))
+        self.points[name] = [start, end, []]
+
+    def overlaps(self, start, end):
+        """True when source[start:end] intersects the span of an existing point."""
+        return any(max(s, start) < min(e, end) or s < start < e or start < s < end
+                   for s, e, _ in self._order)
+
+    def anchor(self, name, marker, where='before', required=True):
+        """Point just before/after the first occurrence of marker."""
+        at = self.source.find(marker)
+        if at < 0:
+            if required:
+                raise AssemblyError(f'{marker!r} not found in template output (point {name!r})')
+            return False
+        at += len(marker) if where == 'after' else 0
+        self._add(name, at, at)
+        return True
+
+    def span(self, name, start, end, text=None):
+        """Point replacing source[start:end]; the original is kept unless text is given or inserted later."""
+        self._add(name, start, end)
+        if text is not None:
+            self.points[name][2].append(text)
+
+    # ── Content ──
+    def insert(self, name, text):
+        """Add text at a point (several inserts at one point keep their order)."""
+        self.points[name][2].append(text)
+
+    def chunks(self):
+        pos = 0
+        for start, end, name in self._order:
+            if start > pos:
+                yield self.source[pos:start]
+            texts = self.points[name][2]
+            if texts or start == end:
+                yield from texts
+            else:
+                yield self.source[start:end]
+            pos = end
+        if pos < len(self.source):
+            yield self.source[pos:]
+
+    def inserted(self):
+        """Every text added at a point (for scans that must not materialize the page)."""
+        for _, _, texts in self.points.values():
+            yield from texts
+
+    # ── Output ──
+    def write(self, path, before_replace=None):
+        """Stream the page to path. Returns (size, sha256 hex, written).
+
+        before_replace(size) runs once the page is in the temp file (e.g. to
+        check budgets and write the assets it references); if it raises, the
+        temp file is discarded and the existing output left alone. The file
+        is not replaced when it already holds identical bytes.
+        """
+        tmp = path + '.tmp'
+        h, size = hashlib.sha256(), 0
+        try:
+            with open(tmp, 'wb') as f:
+                for chunk in self.chunks():
+                    data = chunk.encode('utf-8')
+                    h.update(data)
+                    size += len(data)
+                    f.write(data)
+            if before_replace:
+                before_replace(size)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        sha = h.hexdigest()
+        if os.path.exists(path) and os.path.getsize(path) == size and sha256_file(path) == sha:
+            os.remove(tmp)
+            return size, sha, False
+        os.replace(tmp, path)
+        return size, sha, True
+
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""Asset stage for build.py: minify CSS/JS, inline or externalize, enforce size budgets.
+
+Small assets stay inline in index.html; anything above INLINE_LIMIT is written
+to assets/<name>.<hash>.<ext> so browsers can cache it across visits and the
+HTML itself stays small. Hashed names never change content, so they are safe
+to serve with an immutable Cache-Control header (see HEADERS_FILE).
+"""
+import base64, hashlib, os, re
+
+from build_cache import write_bytes_if_changed
+from service_worker import SW_NAME
+
+INLINE_LIMIT = 8 * 1024       # bytes; larger assets become external files
+ASSET_DIRNAME = 'assets'
+HEADERS_FILE = '_headers'     # Netlify/Cloudflare-style header rules, ignored by hosts without support
+
+# Byte budgets: index.html, the JS the page loads up front, the simulation
+# modules and worker it loads on demand, all page CSS, and each image
+SIZE_BUDGETS = {
+    'html': 300 * 1024,
+    'js': 512 * 1024,
+    'js-lazy': 448 * 1024,
+    'css': 64 * 1024,
+    'image': 2 * 1024 * 1024,
+}
+
+DATA_URI_RE = re.compile(r'data:(image/[\w.+-]+);base64,([A-Za-z0-9+/=\s]+)')
+STYLE_RE = re.compile(r'(<style[^>]*>)(.*?)</style>', re.S)
+
+MIME_EXT = {'image/png': 'png', 'image/jpeg': 'jpg', 'image/webp': 'webp',
+            'image/avif': 'avif', 'image/gif': 'gif', 'image/svg+xml': 'svg'}
+
+
+# ═══════════════════════════════════════════════════════════
+# Minifiers (conservative: comments and whitespace only)
+# ═══════════════════════════════════════════════════════════
+_CSS_TOKEN = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/|\s+', re.S)
+
+
+def minify_css(css):
+    """Strip comments and collapse whitespace, leaving strings untouched."""
+    def sub(m):
+        if m.group(1):
+            return m.group(1)
+        return '' if m.group(0).startswith('/*') else ' '
+    css = _CSS_TOKEN.sub(sub, css)
+    css = re.sub(r' ?([{};,>]) ?', r'\1', css)
+    css = re.sub(r': ', ':', css)
+    return css.replace(';}', '}').strip()
+
+
+_WORD = re.compile(r'[\w$]')
+_REGEX_AFTER = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_KEYWORDS = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'delete')
+_NEWLINE_AFTER = set('{;,([')
+
+
+def _skip_quoted(src, i):
+    """Index just past the '...' or "..." string starting at i."""
+    q, i = src[i], i + 1
+    while i < len(src) and src[i] != q:
+        i += 2 if src[i] == '\\' else 1
+    return i + 1
+
+
+def _skip_template(src, i):
+    """Index just past the `...` template literal starting at i, including nested ${...}."""
+    i += 1
+    while i < len(src) and src[i] != '`':
+        if src[i] == '\\':
+            i += 2
+        elif src.startswith('${', i):
+            i = _skip_code(src, i + 2, '}')
+        else:
+            i += 1
+    return i + 1
+
+
+def _skip_code(src, i, close):
+    """Index just past the bracket that closes a ${...} expression."""
+    depth = 0
+    while i < len(src):
+        c = src[i]
+        if c in '\'"':
+            i = _skip_quoted(src, i)
+            continue
+        if c == '`':
+            i = _skip_template(src, i)
+            continue
+        if c == '{':
+            depth += 1
+        elif c == close:
+            if depth == 0:
+                return i + 1
+            depth -= 1
+        i += 1
+    return i
+
+
+def _skip_regex(src, i):
+    """Index just past the /.../flags regex literal starting at i."""
+    i += 1
+    in_class = False
+    while i < len(src) and src[i] != '\n':
+        c = src[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            break
+        i += 1
+    i += 1
+    while i < len(src) and _WORD.match(src[i]):
+        i += 1
+    return i
+
+
+def minify_js(src):
+    """Strip comments and redundant whitespace from JS.
+
+    Line breaks are kept except after { ; , ( [ so automatic semicolon
+    insertion behaves exactly as in the source; no renaming or rewriting.
+    """
+    out = []
+    last = ''  # last non-whitespace token emitted
+    i, n = 0, len(src)
+    while i < n:
+        c = src[i]
+        if c in '\'"':
+            j = _skip_quoted(src, i)
+        elif c == '`':
+            j = _skip_template(src, i)
+        elif src.startswith('//', i):
+            i = src.find('\n', i)
+            i = n if i < 0 else i
+            continue
+        elif src.startswith('/*', i):
+            end = src.find('*/', i + 2)
+            i = n if end < 0 else end + 2
+            out.append(' ')
+            continue
+        elif c == '/' and (not last or last[-1] in _REGEX_AFTER or last in _REGEX_KEYWORDS):
+            j = _skip_regex(src, i)
+        elif c.isspace():
+            j = i
+            while j < n and src[j].isspace():
+                j += 1
+            out.append('\n' if '\n' in src[i:j] else ' ')
+            i = j
+            continue
+        else:
+            j = i + 1
+            while j < n and _WORD.match(src[j]) and _WORD.match(c):
+                j += 1
+        last = src[i:j]
+        out.append(last)
+        i = j
+    return _squeeze_js_whitespace(out)
+
+
+def _squeeze_js_whitespace(tokens):
+    """Drop whitespace tokens that separate nothing.
+
+    Whitespace is held until the next real token shows what it separates, so
+    this is one pass; whitespace at the end is dropped.
+    """
+    result, pending = [], []
+    for tok in tokens:
+        if tok in (' ', '\n'):
+            pending.append(tok)
+            continue
+        for ws in pending:
+            prev = result[-1] if result else ''
+            if not prev or prev in (' ', '\n'):
+                continue
+            a, b = prev[-1], tok[0]
+            if ws == '\n' and a not in _NEWLINE_AFTER:
+                result.append('\n')
+            elif (_WORD.match(a) and _WORD.match(b)) or (a in '+-' and b in '+-'):
+                result.append(' ')
+        pending = []
+        result.append(tok)
+    return ''.join(result)
+
+
+class BudgetExceeded(Exception):
+    def __init__(self, problems):
+        super().__init__('\n'.join(problems))
+        self.problems = problems
+
+
+# ═══════════════════════════════════════════════════════════
+# Inline / external decision
+# ═══════════════════════════════════════════════════════════
+class AssetStage:
+    """Collects the page's assets and decides, per asset, inline vs hashed file."""
+
+    def __init__(self, out_dir, inline_limit=INLINE_LIMIT):
+        self.out_dir = out_dir
+        self.inline_limit = inline_limit
+        self.files = {}   # relative path -> bytes
+        self.sizes = []   # (kind, label, bytes) for the budget check
+
+    def _emit(self, name, ext, data):
+        h = hashlib.sha256(data).hexdigest()[:10]
+        rel = f'{ASSET_DIRNAME}/{name}.{h}.{ext}'
+        self.files[rel] = data
+        return rel
+
+    def style(self, name, css):
+        """<style> or <link> for a stylesheet."""
+        data = css.encode('utf-8')
+        self.sizes.append(('css', name, len(data)))
+        if len(data) <= self.inline_limit:
+            return f'<style>\n{css}\n</style>'
+        return f'<link rel="stylesheet" href="{self._emit(name, "css", data)}">'
+
+    def script(self, name, js):
+        """<script> inline or by src; order of execution is the same either way."""
+        data = js.encode('utf-8')
+        self.sizes.append(('js', name, len(data)))
+        if len(data) <= self.inline_limit and '</script' not in js:
+            return f'<script>\n{js}\n</script>'
+        return f'<script src="{self._emit(name, "js", data)}"></script>'
+
+    def external(self, kind, name, ext, data):
+        """URL of an asset that is always a separate file (images, fonts, on-demand scripts)."""
+        self.sizes.append((kind, name, len(data)))
+        return self._emit(name, ext, data)
+
+    def module(self, name, js):
+        """URL of a script the page loads on demand (budgeted apart from the up-front JS)."""
+        return self.external('js-lazy', name, 'js', js.encode('utf-8'))
+
+    def _externalize(self, match, name):
+        mime, payload = match.group(1), match.group(2)
+        data = base64.b64decode(payload)
+        self.sizes.append(('image', f'{name} ({mime})', len(data)))
+        if len(data) <= self.inline_limit or mime not in MIME_EXT:
+            return None
+        return self._emit(name, MIME_EXT[mime], data)
+
+    def minify_inline_styles(self, page):
+        """Minify every <style> block of the template output (an Assembly), externalizing large images in it."""
+        for i, m in enumerate(STYLE_RE.finditer(page.source)):
+            css = DATA_URI_RE.sub(lambda d: self._externalize(d, 'image') or d.group(0), m.group(2))
+            css = minify_css(css)
+            self.sizes.append(('css', 'inline <style>', len(css.encode('utf-8'))))
+            page.span(f'style:{i}', m.start(2), m.end(2), css)
+
+    def externalize_data_uris(self, page, name='image'):
+        """Replace base64 data: images above the inline limit with hashed files (outside <style> blocks)."""
+        for i, m in enumerate(DATA_URI_RE.finditer(page.source)):
+            if page.overlaps(m.start(), m.end()):
+                continue
+            url = self._externalize(m, name)
+            if url:
+                page.span(f'{name}:{i}', m.start(), m.end(), url)
+
+    # ── Budgets ──
+    def check_budgets(self, html_bytes, budgets=SIZE_BUDGETS):
+        problems = self.over_budget(html_bytes, budgets)
+        if problems:
+            raise BudgetExceeded(problems)
+
+    def over_budget(self, html_bytes, budgets=SIZE_BUDGETS):
+        """List of human-readable budget violations (empty when everything fits)."""
+        problems = []
+        if html_bytes > budgets['html']:
+            problems.append(f'index.html: {html_bytes:,} B > {budgets["html"]:,} B')
+        for kind in ('js', 'js-lazy', 'css'):
+            total = sum(size for k, _, size in self.sizes if k == kind)
+            if total > budgets[kind]:
+                problems.append(f'{kind} total: {total:,} B > {budgets[kind]:,} B')
+        for kind, label, size in self.sizes:
+            if kind == 'image' and size > budgets['image']:
+                problems.append(f'{label}: {size:,} B > {budgets["image"]:,} B')
+        return problems
+
+    # ── Output ──
+    def write(self):
+        """Write external assets (skipping identical files) and prune stale hashed files."""
+        asset_dir = os.path.join(self.out_dir, ASSET_DIRNAME)
+        os.makedirs(asset_dir, exist_ok=True)
+        for rel, data in self.files.items():
+            write_bytes_if_changed(os.path.join(self.out_dir, rel), data)
+        keep = {os.path.basename(rel) for rel in self.files}
+        for fname in os.listdir(asset_dir):
+            if fname not in keep:
+                os.remove(os.path.join(asset_dir, fname))
+        write_bytes_if_changed(os.path.join(self.out_dir, HEADERS_FILE),
+                               (f'/{ASSET_DIRNAME}/*\n  Cache-Control: public, max-age=31536000, immutable\n'
+                                f'/{SW_NAME}\n  Cache-Control: no-cache\n').encode('utf-8'))
+        return sorted(self.files)
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""Throughput and accuracy of the simulation kernels.
+
+    python bench_kernels.py [--n 1000000] [--repeat 5] [--only declination,verlet] [--json report.json]
+
+Each kernel the page relies on (the NumPy versions in irradiance.py,
+trajectories.py and planets.py) is timed over an input grid of --n points,
+and its error is measured against an independent reference: the Meeus
+ephemeris for the sinusoidal declination, Kasten & Young air mass for the
+plane-parallel one, extended-precision (np.longdouble) vector formulas and
+bisection for the spherical astronomy, the analytic Kepler orbit for the
+Verlet integrator, a dense scan of the geocentric longitude for the
+retrograde stations, the exact projection for the interpolated sun-path
+grid, and eclipses.py's topocentric search for the Besselian eclipse maps.
+Every error has a limit recorded below;
+the exit status is 1 when one is exceeded, so run this before changing an
+approximation the page relies on.
+"""
+import argparse, json, sys, time
+
+import numpy as np
+
+from eclipses import Site, find_solar_eclipses
+from ephemeris import delta_t, ecliptic_to_equatorial, julian_day, obliquity, sun_position
+from irradiance import (air_mass, clear_sky_irradiance, day_length, max_elevation, solar_declination,
+                        sun_altaz, sunrise_hour_angle, S0)
+from planets import PLANETS, geocentric_longitude, stations
+import besselian, sun_paths, trajectories
+
+LD = np.longdouble
+RNG = np.random.default_rng(20260101)
+
+
+def _best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _wrap(deg):
+    """Angle difference folded into -180..180."""
+    return (deg + 180.0) % 360.0 - 180.0
+
+
+def _lat_decl(n):
+    return RNG.uniform(-89.5, 89.5, n), RNG.uniform(-23.44, 23.44, n)
+
+
+# ═══════════════════════════════════════════════════════════
+# References
+# ═══════════════════════════════════════════════════════════
+def meeus_declination(year=2026):
+    """(day of year, apparent solar declination at 12h UT) for every day of the year."""
+    jd = julian_day(f'{year}-01-01T12:00') + np.arange(365)
+    jde = jd + delta_t(jd) / 86400.0
+    lon, _ = sun_position(jde)
+    _, dec = ecliptic_to_equatorial(lon, 0.0, obliquity(jde))
+    return np.arange(365), dec
+
+
+def altaz_longdouble(lat, decl, ha):
+    """Altitude/azimuth from the horizon-frame unit vector, in extended precision."""
+    phi, delta, h = (np.radians(np.asarray(v, dtype=LD)) for v in (lat, decl, ha))
+    east = -np.cos(delta) * np.sin(h)
+    north = np.cos(phi) * np.sin(delta) - np.sin(phi) * np.cos(delta) * np.cos(h)
+    up = np.sin(phi) * np.sin(delta) + np.cos(phi) * np.cos(delta) * np.cos(h)
+    return np.degrees(np.arctan2(up, np.hypot(east, north))), np.degrees(np.arctan2(east, north)) % 360
+
+
+def sunrise_bisection(lat, decl, iterations=70):
+    """Hour angle (deg) where the extended-precision altitude crosses 0, by bisection on 0..180."""
+    lo, hi = np.zeros(len(lat), dtype=LD), np.full(len(lat), 180, dtype=LD)
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        up = altaz_longdouble(lat, decl, mid)[0] > 0
+        lo, hi = np.where(up, mid, lo), np.where(up, hi, mid)
+    return (lo + hi) / 2
+
+
+def kasten_young_air_mass(elev):
+    """Kasten & Young (1989) relative optical air mass, elevation in degrees."""
+    return 1.0 / (np.sin(np.radians(elev)) + 0.50572 * (elev + 6.07995) ** -1.6364)
+
+
+def kepler_position(v0, t):
+    """Analytic position at times t (rows) for horizontal launches v0 (columns) from (0, -LAUNCH_R)."""
+    r0, gm = trajectories.LAUNCH_R, trajectories.GM
+    a = 1.0 / (2.0 / r0 - v0 ** 2 / gm)
+    perigee = v0 ** 2 * r0 >= gm  # launch point is the periapsis, else the apoapsis
+    e = np.where(perigee, 1 - r0 / a, r0 / a - 1)
+    M = np.where(perigee, 0.0, np.pi) + np.sqrt(gm / a ** 3) * t
+    E = M.copy()
+    for _ in range(50):  # Newton on Kepler's equation
+        E -= (E - e * np.sin(E) - M) / (1 - e * np.cos(E))
+    xp, yp = a * (np.cos(E) - e), a * np.sqrt(1 - e ** 2) * np.sin(E)
+    # Periapsis direction and the direction of motion there (counterclockwise on the page)
+    px, py = 0.0, np.where(perigee, -1.0, 1.0)
+    qx, qy = -py, 0.0
+    return np.stack([xp * px + yp * qx, xp * py + yp * qy], axis=-1)
+
+
+def sun_path_lookup(table, lat, decl, ha):
+    """The celestial-sphere page's pathFor() + sample(): bilinear in (lat, decl), linear in hour angle."""
+    points = table['points'].astype(float) / table['scale']
+    idx, frac = [], []
+    for v, v0, step, size in ((lat, table['lat0'], table['latStep'], points.shape[0]),
+                              (decl, table['decl0'], table['declStep'], points.shape[1]),
+                              (ha, table['ha0'], table['haStep'], points.shape[2])):
+        f = np.clip((v - v0) / step, 0, size - 1.000001)
+        idx.append(np.floor(f).astype(int))
+        frac.append(f - idx[-1])
+    out = 0.0
+    for corner in np.ndindex(2, 2, 2):
+        w = np.prod([f if c else 1 - f for c, f in zip(corner, frac)], axis=0)
+        out = out + w[:, None] * points[tuple(i + c for i, c in zip(idx, corner))]
+    return out
+
+
+# ═══════════════════════════════════════════════════════════
+# Cases: (kernel, page function, limit, unit, run(n, repeat) -> (seconds, error, note))
+# ═══════════════════════════════════════════════════════════
+def bench_declination(n, repeat):
+    day = RNG.uniform(0, 365, n)
+    seconds = _best_time(lambda: solar_declination(day), repeat)
+    days, ref = meeus_declination()
+    err = np.abs(solar_declination(days) - ref)
+    return seconds, err.max(), f'vs Meeus 2026, worst on day {int(days[err.argmax()])}'
+
+
+def bench_max_elevation(n, repeat):
+    lat, decl = _lat_decl(n)
+    seconds = _best_time(lambda: max_elevation(lat, decl), repeat)
+    ref, _ = altaz_longdouble(lat, decl, 0.0)
+    return seconds, np.abs(max_elevation(lat, decl) - ref.astype(float)).max(), 'vs long-double altitude at noon'
+
+
+def bench_sunrise(n, repeat):
+    lat, decl = _lat_decl(n)
+    seconds = _best_time(lambda: sunrise_hour_angle(lat, decl), repeat)
+    k = min(n, 20000)
+    ref = sunrise_bisection(lat[:k], decl[:k]).astype(float)
+    return seconds, np.abs(sunrise_hour_angle(lat[:k], decl[:k]) - ref).max(), \
+        'vs bisection on the long-double altitude'
+
+
+def bench_day_length(n, repeat):
+    lat, decl = _lat_decl(n)
+    seconds = _best_time(lambda: day_length(lat, decl), repeat)
+    k = min(n, 20000)
+    ref = sunrise_bisection(lat[:k], decl[:k]).astype(float) / 7.5
+    return seconds, 3600 * np.abs(day_length(lat[:k], decl[:k]) - ref).max(), 'geometric sunrise, vs bisection'
+
+
+def bench_sun_altaz(n, repeat):
+    lat, decl = _lat_decl(n)
+    ha = RNG.uniform(-180, 180, n)
+    seconds = _best_time(lambda: sun_altaz(lat, decl, ha), repeat)
+    alt, az = sun_altaz(lat, decl, ha)
+    ref_alt, ref_az = (v.astype(float) for v in altaz_longdouble(lat, decl, ha))
+    # Azimuth error as the distance it moves the Sun on the sky (azimuth is undefined at the zenith).
+    # The arccos form loses precision near azimuth 180° at polar latitudes: ~0.005° there.
+    err_az = np.abs(_wrap(az - ref_az)) * np.cos(np.radians(ref_alt))
+    err_alt = np.abs(alt - ref_alt)
+    return seconds, max(err_alt.max(), err_az.max()), \
+        f'altitude {err_alt.max():.1e}°, azimuth {err_az.max():.1e}° on the sky'
+
+
+def bench_air_mass(n, repeat):
+    elev = RNG.uniform(0.1, 90, n)
+    seconds = _best_time(lambda: air_mass(elev), repeat)
+    grid = np.linspace(10, 90, 8001)
+    rel = np.abs(air_mass(grid) / kasten_young_air_mass(grid) - 1)
+    low = abs(air_mass(5.0) / kasten_young_air_mass(5.0) - 1)
+    return seconds, 100 * rel.max(), f'vs Kasten & Young above 10° ({100 * low:.0f}% at 5°)'
+
+
+def bench_clear_sky(n, repeat):
+    elev = RNG.uniform(-5, 90, n)
+    seconds = _best_time(lambda: clear_sky_irradiance(elev), repeat)
+    grid = np.linspace(10, 90, 8001)
+    ref = S0 * np.sin(np.radians(grid)) * 0.7 ** (kasten_young_air_mass(grid) ** 0.678)
+    return seconds, np.abs(clear_sky_irradiance(grid) - ref).max(), 'with Kasten & Young air mass, above 10°'
+
+
+def bench_verlet(n, repeat):
+    m = max(n // 2, 1)  # one step of m paths per call
+    pos = np.column_stack([np.zeros(m), np.full(m, -trajectories.LAUNCH_R)])
+    vel = np.column_stack([RNG.uniform(0.95, 1.25, m), np.zeros(m)])
+    acc = trajectories._accel(pos)
+    seconds = _best_time(lambda: trajectories.verlet_step(pos, vel, acc), repeat) * n / m
+    v0 = trajectories.launch_speeds()
+    samples, steps, fate = trajectories.integrate(v0)
+    closed = fate == trajectories.CLOSED
+    v0, samples, steps = v0[closed], samples[:, closed], steps[closed]
+    k = np.arange(len(samples))[:, None]
+    t = k * trajectories.EVERY * trajectories.DT
+    err = np.linalg.norm(samples - kepler_position(v0[None, :], t), axis=-1)
+    err = np.where(k * trajectories.EVERY <= steps[None, :], err, 0)
+    worst = v0[err.max(axis=0).argmax()]
+    return seconds, err.max() * 45, f'px over one revolution vs Kepler, worst v = {worst:.2f} ({len(v0)} closed orbits)'
+
+
+def bench_stations(n, repeat):
+    t = julian_day('2026-01-01') + RNG.uniform(0, 8 * 365, n)
+    seconds = _best_time(lambda: geocentric_longitude('mars', t), repeat)
+    # Reference: the turning point of the longitude on a 10-second grid around each station
+    worst, jd0 = 0.0, julian_day('2026-01-01')
+    for p in PLANETS:
+        for start, end, _ in stations(p['key'], jd0, 8 * 365):
+            for jd, turn in ((start, np.argmax), (end, np.argmin)):
+                grid = jd + np.arange(-0.1, 0.1, 10 / 86400) + 3.7 / 86400  # off the station itself
+                lon = np.unwrap(np.radians(geocentric_longitude(p['key'], grid)))
+                worst = max(worst, abs(grid[turn(lon)] - jd) * 1440)
+    return seconds, worst, 'minutes vs a dense longitude scan, every planet 2026-2033'
+
+
+def bench_sun_path(n, repeat):
+    lat, decl = _lat_decl(n)
+    lat = np.clip(lat, -66.5, 89.5)  # the csLatSlider range
+    ha = RNG.uniform(-180, 180, n)
+    seconds = _best_time(lambda: sun_paths.sun_path(lat, decl, ha), repeat)
+    k = min(n, 200000)
+    lat, decl, ha = lat[:k], decl[:k], ha[:k]
+    got = sun_path_lookup(sun_paths.sun_path_table(), lat, decl, ha)
+    ref = sun_paths.sun_path(lat, decl, ha)
+    radius = 160  # px per sphere radius on the 700 x 400 canvas
+    err_sun = np.hypot(*(got[:, :2] - ref[:, :2]).T).max() * radius
+    tip = got[:, 3:] * sun_paths.shadow_length(got[:, 2])[:, None]
+    up = ref[:, 2] > np.sin(np.radians(0.5))  # the shadow is drawn above 0.5°
+    err_tip = np.hypot(*(tip - np.column_stack(sun_paths.shadow_tip(lat, decl, ha)))[up].T).max() * radius
+    return seconds, max(err_sun, err_tip), f'sun {err_sun:.2f} px, shadow tip {err_tip:.2f} px, grid vs exact'
+
+
+def bench_eclipse_map(n, repeat):
+    jd_max = julian_day('2035-09-02T00:46')
+    elements = besselian.besselian_elements(np.array([jd_max]))
+    lat, lon = RNG.uniform(33, 43, n), RNG.uniform(124, 131, n)
+    seconds = _best_time(lambda: besselian.local_magnitude(elements, lat, lon), repeat)
+    # Reference: the topocentric contact search of eclipses.py, at random map cells for each eclipse
+    worst_t, worst_mag = 0.0, 0.0
+    for day in ('2030-06-01T06:00', '2032-11-03T06:00', '2035-09-02T00:46'):
+        jd = julian_day(day)
+        for la, lo in zip(RNG.uniform(33, 43, 8), RNG.uniform(124, 131, 8)):
+            ev, = find_solar_eclipses(jd - 1, jd + 1, Site('', la, lo, 0.0, ''))
+            c = {x['label']: x['jd'] for x in ev['contacts']}
+            mag, _, t1, t4 = besselian.local_circumstances(ev['jd_max'], np.array([la]), np.array([lo]))
+            worst_t = max(worst_t, abs(t1[0] - c['start']) * 1440, abs(t4[0] - c['end']) * 1440)
+            worst_mag = max(worst_mag, abs(mag[0] - ev['magnitude']))
+    return seconds, worst_t, f'contacts vs eclipses.py at 24 cells, magnitude within {worst_mag:.1e}'
+
+
+CASES = [
+    ('declination', 'solarDecl / declTable', 1.7, '°', bench_declination),
+    ('max_elevation', 'maxElevation', 1e-9, '°', bench_max_elevation),
+    ('sunrise_hour_angle', 'sunriseHA', 1e-6, '°', bench_sunrise),
+    ('day_length', 'dayLengthAt', 1e-3, 's', bench_day_length),
+    ('sun_altaz', 'sunPos', 1e-2, '°', bench_sun_altaz),
+    ('air_mass', 'elevationLookup airMass', 3.5, '%', bench_air_mass),
+    ('clear_sky', 'elevationLookup irradiance', 6.0, 'W/m²', bench_clear_sky),
+    ('verlet', 'escapeAtlas (Verlet)', 0.5, 'px', bench_verlet),
+    ('stations', 'planets table (geoCanvas)', 1.0, 'min', bench_stations),
+    ('sun_path', 'sunPaths (celestialSphere)', 2.0, 'px', bench_sun_path),
+    ('eclipse_map', 'eclipseMaps (eclipseObs)', 0.1, 'min', bench_eclipse_map),
+]
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description='Time the simulation kernels and check their error')
+    p.add_argument('--n', type=int, default=1_000_000, help='input points per kernel')
+    p.add_argument('--repeat', type=int, default=5, help='timed runs per kernel (best is reported)')
+    p.add_argument('--only', default=None, help='comma-separated kernel names')
+    p.add_argument('--json', default=None, help='also write the results here')
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    only = set(args.only.split(',')) if args.only else None
+    results, failed = [], 0
+    print(f'{"kernel":<20} {"page":<28} {"Mevals/s":>9} {"error":>10} {"limit":>9}')
+    for name, page, limit, unit, run in CASES:
+        if only and name not in only:
+            continue
+        seconds, error, note = run(args.n, args.repeat)
+        error = float(error)
+        ok = error <= limit
+        failed += not ok
+        results.append({'kernel': name, 'page': page, 'n': args.n, 'seconds': seconds,
+                        'evalsPerSecond': args.n / seconds, 'error': error, 'limit': limit,
+                        'unit': unit, 'ok': ok, 'note': note})
+        print(f'{name:<20} {page:<28} {args.n / seconds / 1e6:9.1f} {error:9.3g}{unit:<1} {limit:8.3g}{unit:<1}'
+              f' {"" if ok else "✗ "}{note}')
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=1)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""Besselian elements of solar eclipses and their local circumstances over a lat/lon grid.
+
+The Moon's shadow is described on the fundamental plane (through Earth's
+centre, perpendicular to the shadow axis) by the Besselian elements: the
+axis position x, y, its direction d, mu, and the penumbral/umbral cone
+radii l1, l2 with their half-angles f1, f2. For an observer at (xi, eta,
+zeta) in the same frame the local circumstances follow from plane
+geometry, so a whole map of observers is one array expression per time
+step. This module samples the elements around each eclipse, evaluates them
+for a grid over the Korean peninsula (magnitude and contact times), and
+gives the mean shadow cones of both eclipse kinds for the side view.
+
+Sign convention as in eclipses.solar_shadow_axis: l2 > 0 where the umbra
+still has width (total), l2 < 0 in the antumbra (annular).
+"""
+import numpy as np
+
+from ephemeris import AU_KM, sidereal_time
+from eclipses import R_EARTH, R_MOON, R_SUN, _xyz_to_radec, geocentric_vectors
+
+# Map grid (degrees), ~28 km cells: the 2035 totality band is ~4 cells wide
+LAT_RANGE = (33.0, 43.0, 0.25)
+LON_RANGE = (124.0, 131.0, 0.25)
+HALF_WINDOW = 0.15        # days either side of the eclipse maximum at the site
+TIME_STEP = 1.0 / 1440.0  # one minute; contacts are interpolated between samples
+
+MAG_SCALE = 10000         # int16 quanta of the map
+TIME_SCALE = 10           # tenths of a minute from the site's maximum
+NO_DATA = -32768          # cell sees no eclipse (or the contact falls outside the window)
+
+MOON_MEAN_KM = 384400.0
+LUNAR_ENLARGEMENT = 1.02  # Chauvenet's 1/50 for Earth's atmosphere, as in eclipses.lunar_geometry
+
+# Channels of the map's last axis
+MAGNITUDE, T_START, T_END = range(3)
+
+
+# ═══════════════════════════════════════════════════════════
+# Kernels
+# ═══════════════════════════════════════════════════════════
+def besselian_elements(jd):
+    """Besselian elements for UT Julian days: x, y, l1, l2 (Earth radii), d, mu (deg), tan_f1, tan_f2."""
+    sun, moon = geocentric_vectors(jd)
+    g = sun - moon
+    dist_sm = np.linalg.norm(g, axis=-1)
+    a, d = _xyz_to_radec(g)
+    ar, dr = np.radians(a), np.radians(d)
+    east = np.stack([-np.sin(ar), np.cos(ar), np.zeros_like(ar)], axis=-1)
+    north = np.stack([-np.sin(dr) * np.cos(ar), -np.sin(dr) * np.sin(ar), np.cos(dr)], axis=-1)
+    z = np.sum(moon * g, axis=-1) / dist_sm                # Moon above the fundamental plane, km
+    tan_f1 = (R_SUN + R_MOON) / dist_sm
+    tan_f2 = (R_SUN - R_MOON) / dist_sm
+    return {
+        'x': np.sum(moon * east, axis=-1) / R_EARTH,
+        'y': np.sum(moon * north, axis=-1) / R_EARTH,
+        'd': d,
+        'mu': np.mod(sidereal_time(jd) - a, 360.0),
+        'l1': (R_MOON + z * tan_f1) / R_EARTH,
+        'l2': (R_MOON - z * tan_f2) / R_EARTH,
+        'tan_f1': tan_f1,
+        'tan_f2': tan_f2,
+    }
+
+
+def observer_coords(lat, lon, d, mu):
+    """(xi, eta, zeta) of a sea-level observer on the fundamental plane, Earth radii; zeta > 0 with the Sun up."""
+    u = np.arctan(0.99664719 * np.tan(np.radians(lat)))
+    rho_cos, rho_sin = np.cos(u), 0.99664719 * np.sin(u)
+    h, dr = np.radians(mu + lon), np.radians(d)
+    xi = rho_cos * np.sin(h)
+    eta = rho_sin * np.cos(dr) - rho_cos * np.sin(dr) * np.cos(h)
+    zeta = rho_sin * np.sin(dr) + rho_cos * np.cos(dr) * np.cos(h)
+    return xi, eta, zeta
+
+
+def local_magnitude(elements, lat, lon):
+    """(magnitude, penumbral margin L1 - m, zeta); elements broadcast against lat/lon.
+
+    Magnitude is the fraction of the Sun's diameter covered; it is above 1
+    inside the umbra. The margin is positive while the eclipse is in progress.
+    """
+    e = elements
+    xi, eta, zeta = observer_coords(lat, lon, e['d'], e['mu'])
+    m = np.hypot(e['x'] - xi, e['y'] - eta)
+    big_l1 = e['l1'] - zeta * e['tan_f1']
+    big_l2 = e['l2'] + zeta * e['tan_f2']
+    return (big_l1 - m) / (big_l1 - big_l2), big_l1 - m, zeta
+
+
+def _crossings(margin, t, peak):
+    """Last rising and first falling zero of margin (time, cell) around each cell's peak, linearly interpolated."""
+    n = len(t)
+    pos = margin > 0
+    idx = np.arange(n - 1)[:, None]
+    rising = ~pos[:-1] & pos[1:]
+    falling = pos[:-1] & ~pos[1:]
+    start = np.where(rising & (idx < peak[None, :]), idx, -1).max(axis=0)
+    end = np.where(falling & (idx >= peak[None, :]), idx, n).min(axis=0)
+    cells = np.arange(margin.shape[1])
+
+    def root(i):
+        ok = (i >= 0) & (i < n - 1)
+        j = np.clip(i, 0, n - 2)
+        f0, f1 = margin[j, cells], margin[j + 1, cells]
+        return np.where(ok, t[j] + f0 / np.where(f0 != f1, f0 - f1, 1) * (t[j + 1] - t[j]), np.nan)
+    return root(start), root(end)
+
+
+def local_circumstances(jd_center, lat, lon, half_window=HALF_WINDOW, step=TIME_STEP):
+    """Magnitude and contact times (UT JD) for every observer in the flat arrays lat, lon.
+
+    Returns (magnitude, t_max, t_start, t_end). The magnitude is the largest
+    seen with the Sun above the horizon (0 where it is never seen); t_max is
+    when that happens. The contacts are geometric, so one can fall before
+    sunrise or after sunset. NaN where the window holds no such contact.
+    """
+    t = jd_center + np.arange(-half_window, half_window + step / 2, step)
+    elements = {k: v[:, None] for k, v in besselian_elements(t).items()}
+    mag, margin, zeta = local_magnitude(elements, lat[None, :], lon[None, :])
+    seen = np.where((margin > 0) & (zeta > 0), mag, 0.0)
+    best = np.argmax(seen, axis=0)
+    cells = np.arange(len(lat))
+    t_start, t_end = _crossings(margin, t, np.argmax(margin, axis=0))
+    magnitude = seen[best, cells]
+    return magnitude, np.where(magnitude > 0, t[best], np.nan), t_start, t_end
+
+
+def shadow_cones(sun_km=AU_KM, moon_km=MOON_MEAN_KM):
+    """Radii of both shadows where they fall, as multiples of the body casting them.
+
+    solar: the Moon's penumbra/umbra at Earth's centre in Moon radii (umbra < 0:
+    only the antumbra arrives), and the umbra's length in Earth-Moon distances.
+    lunar: Earth's penumbra/umbra at the Moon's distance in Earth radii.
+    The Moon's distance and radius are given in Earth radii to convert.
+    """
+    tan_f1 = (R_SUN + R_MOON) / (sun_km - moon_km)
+    tan_f2 = (R_SUN - R_MOON) / (sun_km - moon_km)
+    earth_f1 = (R_SUN + R_EARTH) / sun_km
+    earth_f2 = (R_SUN - R_EARTH) / sun_km
+    return {
+        'moonDistance': moon_km / R_EARTH,
+        'moonRadius': R_MOON / R_EARTH,
+        'solar': {'penumbra': (R_MOON + moon_km * tan_f1) / R_MOON,
+                  'umbra': (R_MOON - moon_km * tan_f2) / R_MOON,
+                  'umbraLength': R_MOON / tan_f2 / moon_km},
+        'lunar': {'penumbra': LUNAR_ENLARGEMENT * (R_EARTH + moon_km * earth_f1) / R_EARTH,
+                  'umbra': LUNAR_ENLARGEMENT * (R_EARTH - moon_km * earth_f2) / R_EARTH},
+    }
+
+
+# ═══════════════════════════════════════════════════════════
+# Table for the page
+# ═══════════════════════════════════════════════════════════
+def _grid(lo, hi, step):
+    return np.arange(lo, hi + step / 2, step)
+
+
+def _minutes(jd, jd0):
+    q = np.rint((jd - jd0) * 1440.0 * TIME_SCALE)
+    return np.where(np.isnan(q), NO_DATA, np.clip(q, NO_DATA + 1, 32767))
+
+
+def eclipse_maps(solar, lat_range=LAT_RANGE, lon_range=LON_RANGE):
+    """SIM_DATA.eclipseMaps: int16 (lat, lon, 3) local circumstances per solar eclipse.
+
+    solar maps the page's event id to the UT JD of the maximum at the site.
+    Rows run north to south. Channels: magnitude x MAG_SCALE and the
+    start/end times in 1/TIME_SCALE minutes from that maximum, NO_DATA
+    where there are none.
+    """
+    lat, lon = _grid(*lat_range)[::-1], _grid(*lon_range)
+    glat, glon = (v.ravel() for v in np.meshgrid(lat, lon, indexing='ij'))
+    maps = {}
+    for event_id, jd_max in solar.items():
+        mag, _, t_start, t_end = local_circumstances(jd_max, glat, glon)
+        table = np.stack([np.where(mag > 0, np.rint(mag * MAG_SCALE), NO_DATA),
+                          _minutes(t_start, jd_max), _minutes(t_end, jd_max)], axis=-1)
+        maps[event_id] = table.reshape(len(lat), len(lon), 3).astype(np.int16)
+    return {
+        'lat0': float(lat[0]), 'latStep': -lat_range[2],
+        'lon0': float(lon[0]), 'lonStep': lon_range[2],
+        'magScale': MAG_SCALE, 'timeScale': TIME_SCALE, 'noData': NO_DATA,
+        'channels': ['magnitude', 'start', 'end'],
+        'maps': maps,
+    }
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""Content-hashed build cache used by build.py for incremental rebuilds."""
+import hashlib, json, os
+
+CACHE_DIRNAME = '.build_cache'
+MANIFEST_NAME = 'manifest.json'
+
+
+def digest(*parts):
+    """Return a stable sha256 hex digest of strings, bytes and JSON-able values."""
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, bytes):
+            data = part
+        elif isinstance(part, str):
+            data = part.encode('utf-8')
+        else:
+            data = json.dumps(part, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8')
+        h.update(len(data).to_bytes(8, 'little'))
+        h.update(data)
+    return h.hexdigest()
+
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return digest(f.read())
+
+
+def sha256_file(path, block=1 << 20):
+    """Plain sha256 of a file, read in blocks (outputs are hashed this way so they can be streamed)."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for data in iter(lambda: f.read(block), b''):
+            h.update(data)
+    return h.hexdigest()
+
+
+class BuildCache:
+    """Input hashes and cached intermediate strings, kept under <root>/.build_cache.
+
+    The manifest maps input names to the hash seen on the previous build; blobs
+    hold expensive intermediate results (e.g. the ReportTemplate output) keyed
+    by the hash of everything that went into them.
+    """
+
+    def __init__(self, root, force=False, name=''):
+        self.root = root
+        self.dir = os.path.join(root, CACHE_DIRNAME, name)  # one manifest per build variant
+        self.force = force  # ignore previous results, but still record this build
+        self.manifest = {'inputs': {}, 'outputs': {}}
+        self.changed = set()
+        self.used = set()  # blob keys touched by this build; the rest are pruned on save()
+        self.outputs = {}  # files written by this build; replaces the manifest's list on save()
+        path = os.path.join(self.dir, MANIFEST_NAME)
+        if not force and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.manifest = json.load(f)
+            except (OSError, ValueError):
+                pass  # corrupt manifest: treat as cold cache
+
+    # ── Inputs ──
+    def track(self, name, value):
+        """Hash an input, remember it for save() and return the hash."""
+        h = digest(value)
+        if self.manifest['inputs'].get(name) != h:
+            self.changed.add(name)
+        self.manifest['inputs'][name] = h
+        return h
+
+    # ── Intermediate blobs ──
+    def _blob_path(self, key):
+        return os.path.join(self.dir, 'blobs', key[:2], key)
+
+    def get(self, key):
+        self.used.add(key)
+        if self.force:
+            return None
+        try:
+            with open(self._blob_path(key), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, key, text):
+        self.used.add(key)
+        path = self._blob_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def memo(self, key, fn):
+        """Return the cached blob for key, computing and storing it via fn() on a miss."""
+        text = self.get(key)
+        if text is None:
+            text = fn()
+            self.put(key, text)
+        return text
+
+    # ── Outputs ──
+    def _output_name(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, '/')
+
+    def up_to_date(self, path, key):
+        """True when path was last written from key and still has the bytes we wrote."""
+        if self.force:
+            return False
+        rec = self.manifest['outputs'].get(self._output_name(path))
+        if not rec or rec.get('key') != key or not os.path.exists(path):
+            return False
+        if os.path.getsize(path) != rec.get('size'):
+            return False
+        return sha256_file(path) == rec.get('sha256')
+
+    def outputs_up_to_date(self, key):
+        """True when the previous build was made from key and all of its files are intact."""
+        names = [n for n, rec in self.manifest['outputs'].items() if rec.get('key') == key]
+        return bool(names) and all(self.up_to_date(os.path.join(self.root, n), key) for n in names)
+
+    def record_output(self, path, key, data=None, size=None, sha256=None):
+        """Remember an output file by its bytes, or by size and sha256 when it was streamed."""
+        if data is not None:
+            size, sha256 = len(data), hashlib.sha256(data).hexdigest()
+        self.outputs[self._output_name(path)] = {'key': key, 'sha256': sha256, 'size': size}
+
+    def save(self):
+        os.makedirs(self.dir, exist_ok=True)
+        if self.outputs:
+            self.manifest['outputs'] = self.outputs
+        blob_root = os.path.join(self.dir, 'blobs')
+        for dirpath, _, names in os.walk(blob_root):
+            for name in names:
+                if name not in self.used:
+                    os.remove(os.path.join(dirpath, name))
+        tmp = os.path.join(self.dir, MANIFEST_NAME + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp, os.path.join(self.dir, MANIFEST_NAME))
+
+
+def write_bytes_if_changed(path, data):
+    """Write data to path unless the file already holds identical bytes. Returns whether a write happened."""
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    return False
+    except OSError:
+        pass
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return True
+
+
+def write_if_changed(path, text):
+    """Text version of write_bytes_if_changed. Returns the encoded bytes and whether a write happened."""
+    data = text.encode('utf-8')
+    return data, write_bytes_if_changed(path, data)
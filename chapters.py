@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""Chapter sources under chapters/, rendered one file at a time.
+
+Each chapter is an .html or .md file that starts with front matter:
+
+    ---
+    id: ch1
+    toc.sec1-1: 1.1 천동설: 프톨레마이오스
+    ---
+
+The files are read in name order. `role: references` marks the reference
+list, which gets no TOC entry. The TOC is derived from each rendered
+chapter: the chapter title ("제1장. X" → "1. X", or `toc:`) and every
+<h2 class="section-title">, labelled by its text or by a `toc.<id>:` line.
+
+Rendering a chapter involves Markdown, macros such as <scientist-card>,
+build-time slots (the eclipse list) and, with --offline, KaTeX. It depends
+only on that chapter's source, so chapters render in parallel worker
+processes and each is cached on its own inputs.
+"""
+import json, os, re
+from concurrent.futures import ProcessPoolExecutor
+
+import offline
+from build_cache import digest, file_digest
+from offline import MATH_RE, render_math
+
+try:
+    import markdown as _markdown
+except ImportError:  # optional: only needed for .md chapters
+    _markdown = None
+
+SOURCE_EXTS = ('.html', '.md')
+FRONT_MATTER_RE = re.compile(r'\A---\n(.*?)\n---\n', re.S)
+TITLE_RE = re.compile(r'<h1 class="chapter-title"[^>]*>(.*?)</h1>', re.S)
+SECTION_RE = re.compile(r'<h2 class="section-title" id="([^"]+)"[^>]*>(.*?)</h2>', re.S)
+TAG_RE = re.compile(r'<[^>]+>')
+
+
+class ChapterError(Exception):
+    pass
+
+
+# ═══════════════════════════════════════════════════════════
+# Macros
+# ═══════════════════════════════════════════════════════════
+# Scientist portraits (Wikimedia Commons, public domain)
+PORTRAITS = {
+    'ptolemy': 'https://upload.wikimedia.org/wikipedia/commons/0/0e/Ptolemy_16century.jpg',
+    'copernicus': 'https://upload.wikimedia.org/wikipedia/commons/f/f2/Nikolaus_Kopernikus.jpg',
+    'kepler': 'https://upload.wikimedia.org/wikipedia/commons/d/d4/Johannes_Kepler_1610.jpg',
+    'newton': 'https://upload.wikimedia.org/wikipedia/commons/3/3b/Portrait_of_Sir_Isaac_Newton%2C_1689.jpg',
+    'galileo': 'https://upload.wikimedia.org/wikipedia/commons/d/d4/Justus_Sustermans_-_Portrait_of_Galileo_Galilei%2C_1636.jpg',
+    'brahe': 'https://upload.wikimedia.org/wikipedia/commons/2/2b/Tycho_Brahe.JPG',
+}
+
+
+def scientist_card(key, name, years, desc):
+    url = PORTRAITS.get(key, '')
+    return f'''<div class="scientist-card">
+  <img src="{url}" alt="{name}" loading="lazy" onerror="this.style.display='none'">
+  <div class="scientist-info">
+    <h4>{name}</h4>
+    <div class="years">{years}</div>
+    <p>{desc}</p>
+  </div>
+</div>'''
+
+
+# <tag attr="…">body</tag> in a source -> MACROS[tag](**attrs, body)
+MACROS = {
+    'scientist-card': lambda key, name, years, body: scientist_card(key, name, years, body),
+}
+MACRO_RE = re.compile(r'<(%s)\b([^>]*)>(.*?)</\1>' % '|'.join(map(re.escape, MACROS)), re.S)
+ATTR_RE = re.compile(r'([\w-]+)="([^"]*)"')
+
+
+def expand_macros(html, path=''):
+    def sub(m):
+        try:
+            return MACROS[m.group(1)](**dict(ATTR_RE.findall(m.group(2))), body=m.group(3).strip())
+        except TypeError as e:
+            raise ChapterError(f'{path}: <{m.group(1)}>: {e}')
+    return MACRO_RE.sub(sub, html)
+
+
+# ═══════════════════════════════════════════════════════════
+# Sources
+# ═══════════════════════════════════════════════════════════
+def parse_source(text, path=''):
+    """(front matter dict, body) of one chapter file."""
+    m = FRONT_MATTER_RE.match(text.replace('\r\n', '\n'))
+    if not m:
+        raise ChapterError(f'{path}: missing --- front matter ---')
+    meta = {}
+    for line in m.group(1).splitlines():
+        if line.strip() and not line.lstrip().startswith('#'):
+            key, sep, value = line.partition(':')
+            if not sep:
+                raise ChapterError(f'{path}: front matter line without "key: value": {line!r}')
+            meta[key.strip()] = value.strip()
+    if 'id' not in meta:
+        raise ChapterError(f'{path}: front matter needs an id')
+    return meta, text.replace('\r\n', '\n')[m.end():]
+
+
+def load_sources(directory):
+    """Every chapter file in directory, in name order: [{'path', 'text'}]."""
+    if not os.path.isdir(directory):
+        raise ChapterError(f'no chapter directory at {directory}')
+    sources = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(SOURCE_EXTS) and not name.startswith(('.', '_')):
+            with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+                sources.append({'path': os.path.join(directory, name), 'text': f.read()})
+    if not sources:
+        raise ChapterError(f'no chapter files ({", ".join(SOURCE_EXTS)}) in {directory}')
+    return sources
+
+
+def markdown_chapter(body, meta, path=''):
+    """A Markdown chapter as the same markup the HTML chapters use.
+
+    `# Title` becomes the chapter title, `## 1.1 Section {#sec1-1}` a section;
+    math is set aside first so Markdown leaves its backslashes alone.
+    """
+    if _markdown is None:
+        raise ChapterError(f'{path}: Markdown chapters need the markdown package (pip install markdown)')
+    math = []
+
+    def stash(m):
+        math.append(m.group(0))
+        return f'@@MATH{len(math) - 1}@@'
+    html = _markdown.markdown(MATH_RE.sub(stash, body), extensions=['attr_list', 'md_in_html', 'tables'])
+    html = re.sub(r'@@MATH(\d+)@@', lambda m: math[int(m.group(1))], html)
+    html = re.sub(r'<h1(?: id="[^"]*")?>', f'<h1 class="chapter-title" id="{meta["id"]}-title">', html)
+    html = re.sub(r'<h2 id="([^"]+)">', r'<h2 class="section-title" id="\1">', html)
+    return f'<div class="chapter" id="{meta["id"]}">\n<div class="chapter-body">\n{html}\n</div>\n</div>'
+
+
+def toc_entry(html, meta):
+    """(chapter id, label, [(section id, label)]) for the template's sidebar."""
+    title = meta.get('toc')
+    if not title:
+        m = TITLE_RE.search(html)
+        if not m:
+            raise ChapterError(f'{meta["id"]}: no <h1 class="chapter-title"> and no toc: in the front matter')
+        title = re.sub(r'^제(\d+)장\.\s*', r'\1. ', TAG_RE.sub('', m.group(1)).strip())
+    sections = [(sid, meta.get(f'toc.{sid}') or TAG_RE.sub('', text).strip()) for sid, text in SECTION_RE.findall(html)]
+    return meta['id'], title, sections
+
+
+# ═══════════════════════════════════════════════════════════
+# Rendering (one chapter per call, so chapters can go to worker processes)
+# ═══════════════════════════════════════════════════════════
+def render_chapter(source, slots, offline_math):
+    """[html, toc entry or None] for one source; slots maps placeholders to their HTML."""
+    path = source['path']
+    meta, body = parse_source(source['text'], path)
+    html = markdown_chapter(body, meta, path) if path.endswith('.md') else body.strip('\n')
+    html = expand_macros(html, path)
+    for slot, text in slots.items():
+        html = html.replace(slot, text)
+    if offline_math:
+        html, = render_math([html])
+    return [html, None if meta.get('role') == 'references' else toc_entry(html, meta)]
+
+
+def _render_job(job):
+    return render_chapter(*job)
+
+
+def render_book(sources, slots, cache, jobs=1, math_key=None):
+    """Render every source, reusing cached chapters. Returns (chapters, refs, toc_items).
+
+    math_key (the vendored KaTeX hash) turns on --offline math rendering.
+    Only the slots a chapter contains enter its cache key.
+    """
+    code = digest(file_digest(__file__), file_digest(offline.__file__))
+    jobs_todo, rendered, keys = [], {}, []
+    for i, source in enumerate(sources):
+        used = {k: v for k, v in slots.items() if k in source['text']}
+        key = digest('chapter', code, source['text'], used, math_key)
+        keys.append(key)
+        text = cache.get(key)
+        if text is None:
+            jobs_todo.append((i, (source, used, math_key is not None)))
+        else:
+            rendered[i] = json.loads(text)
+    workers = min(jobs, len(jobs_todo))
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_render_job, [job for _, job in jobs_todo]))
+    else:
+        results = [_render_job(job) for _, job in jobs_todo]
+    for (i, _), result in zip(jobs_todo, results):
+        cache.put(keys[i], json.dumps(result, ensure_ascii=False))
+        rendered[i] = result
+    chapters, refs, toc_items = [], [], []
+    for i in range(len(sources)):
+        html, toc = rendered[i]
+        if toc is None:
+            refs.append(html)
+        else:
+            chapters.append(html)
+            toc_items.append((toc[0], toc[1], [tuple(s) for s in toc[2]]))
+    return chapters, '\n'.join(refs), toc_items
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""Local authoring loop for `build.py --serve`: watch the inputs, serve the output, live reload.
+
+Everything stays on 127.0.0.1 and uses only the standard library. The
+watcher polls modification times (no platform file-event APIs); the server
+is http.server with one Server-Sent Events endpoint, /__livereload, whose
+client script is added to every HTML response (never to the files on disk).
+After a rebuild the browser either reloads, or, when only stylesheets
+changed, swaps the page's <style>/<link> elements for those of the new
+build in place, so running simulations keep their state.
+"""
+import glob, os, queue, threading, time, urllib.parse
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+LIVE_RELOAD_PATH = '/__livereload'
+POLL_SECONDS = 0.2
+SETTLE_SECONDS = 0.05  # editors write in several steps; wait for the last one
+
+LIVE_RELOAD_JS = '''<script>
+(function() {
+  let build = null;
+  const source = new EventSource('%s');
+  // A new server process (after a Python change) announces a different build id on reconnect
+  source.addEventListener('hello', e => { if (build && build !== e.data) location.reload(); build = e.data; });
+  source.addEventListener('reload', () => location.reload());
+  source.addEventListener('css', async () => {
+    const html = await (await fetch(location.pathname, { cache: 'no-store' })).text();
+    const fresh = new DOMParser().parseFromString(html, 'text/html');
+    const sel = 'style, link[rel="stylesheet"]';
+    const old = [...document.head.querySelectorAll(sel)];
+    fresh.head.querySelectorAll(sel).forEach(el => document.head.appendChild(document.importNode(el, true)));
+    old.forEach(el => el.remove());
+  });
+})();
+</script>
+''' % LIVE_RELOAD_PATH
+
+
+# ═══════════════════════════════════════════════════════════
+# Watcher
+# ═══════════════════════════════════════════════════════════
+class Watcher:
+    """Polls the files matching a list of glob patterns for changes."""
+
+    def __init__(self, patterns):
+        self.patterns = [os.path.abspath(p) for p in patterns]
+        self.state = self.scan()
+
+    def scan(self):
+        state = {}
+        for pattern in self.patterns:
+            for path in glob.glob(pattern):
+                try:
+                    st = os.stat(path)
+                except OSError:  # removed while scanning
+                    continue
+                state[path] = (st.st_mtime_ns, st.st_size)
+        return state
+
+    def changes(self):
+        """Block until something changed; returns the set of added, removed or modified paths."""
+        while True:
+            time.sleep(POLL_SECONDS)
+            state = self.scan()
+            if state != self.state:
+                time.sleep(SETTLE_SECONDS)
+                state = self.scan()
+                changed = {p for p in state.keys() | self.state.keys() if state.get(p) != self.state.get(p)}
+                self.state = state
+                return changed
+
+
+# ═══════════════════════════════════════════════════════════
+# Server
+# ═══════════════════════════════════════════════════════════
+class LiveReload:
+    """Server-Sent Event fan-out to every connected page."""
+
+    def __init__(self):
+        self.build_id = f'{os.getpid()}-{time.time():.0f}'
+        self.clients = set()
+        self.lock = threading.Lock()
+
+    def connect(self):
+        q = queue.Queue()
+        with self.lock:
+            self.clients.add(q)
+        return q
+
+    def disconnect(self, q):
+        with self.lock:
+            self.clients.discard(q)
+
+    def notify(self, event):
+        """event: 'reload' or 'css'."""
+        with self.lock:
+            for q in self.clients:
+                q.put(event)
+        return len(self.clients)
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    live = None
+
+    def end_headers(self):
+        self.send_header('Cache-Control', 'no-store')
+        super().end_headers()
+
+    def log_message(self, *args):
+        pass  # the build report is the log
+
+    def do_GET(self):
+        if self.path == LIVE_RELOAD_PATH:
+            return self._events()
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            parts = urllib.parse.urlsplit(self.path)
+            if not parts.path.endswith('/'):
+                # As SimpleHTTPRequestHandler does: the page's relative URLs need the directory's slash
+                self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+                self.send_header('Location', urllib.parse.urlunsplit(parts._replace(path=parts.path + '/')))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            path = os.path.join(path, 'index.html')
+        if not path.endswith('.html') or not os.path.isfile(path):
+            return super().do_GET()
+        with open(path, 'rb') as f:
+            page = f.read()
+        at = page.rfind(b'</body>')
+        at = at if at >= 0 else len(page)
+        page = page[:at] + LIVE_RELOAD_JS.encode('utf-8') + page[at:]
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(page)))
+        self.end_headers()
+        self.wfile.write(page)
+
+    def _events(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        q = self.live.connect()
+        try:
+            self.wfile.write(f'event: hello\ndata: {self.live.build_id}\n\n'.encode('utf-8'))
+            self.wfile.flush()
+            while True:
+                try:
+                    msg = f'event: {q.get(timeout=15)}\ndata: \n\n'
+                except queue.Empty:
+                    msg = ': keep-alive\n\n'
+                self.wfile.write(msg.encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.live.disconnect(q)
+
+
+def start_server(root, port, host='127.0.0.1'):
+    """Serve root on host:port from a daemon thread. Returns (server, LiveReload)."""
+    live = LiveReload()
+    handler = type('Handler', (_Handler,), {'live': live})
+    server = ThreadingHTTPServer((host, port), partial(handler, directory=root))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, live
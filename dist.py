@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""Deployable dist/ directory: the built pages and their assets only, precompressed.
+
+    python dist.py [--output DIR] [--dist DIR] [--matrix variants.json] [--jobs N] [--plain]
+
+Collects every variant's index.html, sw.js and hashed assets/ from a build output
+(build.py --dist runs this right after building), plus the site-level EXTRAS;
+a page without its sw.js or assets/ is a stale build and an error. Sources,
+the build cache and stale files stay behind. Every
+compressible file gets .gz (zlib level 9) and .br (quality 11, when the
+brotli package is installed) siblings, and a site-wide _headers file sets
+Cache-Control. Both only help hosts that read them (Netlify, Cloudflare
+Pages, nginx gzip_static/brotli_static); GitHub Pages compresses on the fly
+and ignores _headers, so --plain leaves them out.
+dist/manifest.json lists each file's sha256 and raw/compressed sizes.
+A file whose hash matches the previous manifest keeps its compressed
+siblings; the rest are compressed in a process pool.
+"""
+import argparse, gzip, hashlib, json, os, sys
+from concurrent.futures import ProcessPoolExecutor
+
+from assets import ASSET_DIRNAME, HEADERS_FILE
+from build_cache import write_bytes_if_changed
+from service_worker import SW_NAME
+
+try:
+    import brotli
+except ImportError:  # optional: without it only .gz siblings are written
+    brotli = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+EXTRAS = ('og-image.jpg',)  # site-level files referenced by absolute URL
+COMPRESSIBLE = ('.html', '.js', '.css', '.json', '.svg', '.txt', '.xml', '.webmanifest')
+ENCODINGS = (('gzip', '.gz'), ('br', '.br'))
+
+# Cache-Control per path: hashed assets never change, entry points must revalidate
+HEADER_RULES = (
+    ('/{dir}' + ASSET_DIRNAME + '/*', 'public, max-age=31536000, immutable'),
+    ('/{dir}', 'no-cache'),
+    ('/{dir}index.html', 'no-cache'),
+    ('/{dir}' + SW_NAME, 'no-cache'),
+)
+
+
+class DistError(Exception):
+    pass
+
+
+# ═══════════════════════════════════════════════════════════
+# Compression (worker processes)
+# ═══════════════════════════════════════════════════════════
+def compress(data):
+    """{encoding: bytes} for every available encoding that makes data smaller."""
+    out = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        out['br'] = brotli.compress(data, quality=11, mode=brotli.MODE_TEXT)
+    return {enc: blob for enc, blob in out.items() if len(blob) < len(data)}
+
+
+def _compress_file(job):
+    path, dist = job
+    with open(os.path.join(dist, path), 'rb') as f:
+        blobs = compress(f.read())
+    for enc, ext in ENCODINGS:
+        target = os.path.join(dist, path + ext)
+        if enc in blobs:
+            write_bytes_if_changed(target, blobs[enc])
+        elif os.path.exists(target):
+            os.remove(target)
+    return {enc: len(blob) for enc, blob in blobs.items()}
+
+
+# ═══════════════════════════════════════════════════════════
+# Packaging
+# ═══════════════════════════════════════════════════════════
+def collect(output, variant_dirs, extras=EXTRAS):
+    """{dist path: source path} of every deployable file in a build output."""
+    if not variant_dirs:
+        raise DistError(f'no built pages under {output} (run build.py first)')
+    files = {}
+    for d in variant_dirs:
+        root = os.path.join(output, d)
+        page = os.path.join(root, 'index.html')
+        if not os.path.isfile(page):
+            raise DistError(f'{page} not built')
+        files[os.path.join(d, 'index.html').replace(os.sep, '/')] = page
+        # A page without its service worker or assets is a stale or partial build
+        worker = os.path.join(root, SW_NAME)
+        if not os.path.isfile(worker):
+            raise DistError(f'{worker} not built (run build.py first)')
+        files[os.path.join(d, SW_NAME).replace(os.sep, '/')] = worker
+        asset_dir = os.path.join(root, ASSET_DIRNAME)
+        if not os.path.isdir(asset_dir):
+            raise DistError(f'{asset_dir} not built (run build.py first)')
+        for name in sorted(os.listdir(asset_dir)):
+            files['/'.join(p for p in (d, ASSET_DIRNAME, name) if p)] = os.path.join(asset_dir, name)
+    for name in extras:
+        path = os.path.join(output, name)
+        if not os.path.isfile(path):
+            path = os.path.join(HERE, name)
+        if os.path.isfile(path):
+            files[name] = path
+    return files
+
+
+def headers_file(variant_dirs):
+    """One site-wide _headers; the per-variant files only cover their own root."""
+    lines = []
+    for d in sorted(variant_dirs):
+        prefix = d.strip('/') + '/' if d.strip('/') else ''
+        for pattern, value in HEADER_RULES:
+            lines += [pattern.format(dir=prefix), f'  Cache-Control: {value}']
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _load_manifest(dist, plain=False):
+    try:
+        with open(os.path.join(dist, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        same = manifest.get('version') == MANIFEST_VERSION and manifest.get('plain', False) == plain
+        return manifest['files'] if same else {}
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def _check_target(output, dist):
+    """Refuse a dist dir that is or contains the build output or this repo: package() prunes everything it did not write."""
+    for root, what in ((output, 'the build output'), (HERE, 'the source tree')):
+        root, target = os.path.realpath(root), os.path.realpath(dist)
+        if os.path.commonpath([root, target]) == target:
+            raise DistError(f'--dist {dist} would hold {what} ({root}); pick a directory of its own')
+
+
+def package(output, dist, variant_dirs, jobs=1, plain=False):
+    """Mirror the deployable files of output into dist. Returns (manifest dict, report lines).
+
+    plain: no precompressed siblings and no _headers (hosts that ignore them).
+    """
+    _check_target(output, dist)
+    files = collect(output, variant_dirs)
+    previous = _load_manifest(dist, plain)
+    os.makedirs(dist, exist_ok=True)
+    entries, todo = {}, []
+    blobs = {}
+    for path, src in files.items():
+        with open(src, 'rb') as f:
+            blobs[path] = f.read()
+    if not plain:
+        blobs[HEADERS_FILE] = headers_file(variant_dirs)
+    for path, data in sorted(blobs.items()):
+        target = os.path.join(dist, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        write_bytes_if_changed(target, data)
+        entry = {'sha256': hashlib.sha256(data).hexdigest(), 'size': len(data)}
+        old = previous.get(path, {})
+        if path.endswith(COMPRESSIBLE) and not plain:
+            if old.get('sha256') == entry['sha256'] and all(
+                    os.path.exists(target + ext) for enc, ext in ENCODINGS if enc in old):
+                entry.update({enc: old[enc] for enc, _ in ENCODINGS if enc in old})
+            else:
+                todo.append(path)
+        entries[path] = entry
+
+    workers = max(1, min(jobs, len(todo)))
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            sizes = list(pool.map(_compress_file, [(p, dist) for p in todo]))
+    else:
+        sizes = [_compress_file((p, dist)) for p in todo]
+    for path, size in zip(todo, sizes):
+        entries[path].update(size)
+
+    # Anything else in dist is left over from an earlier build
+    keep = {MANIFEST_NAME} | {p + ext for p, e in entries.items() for enc, ext in ENCODINGS if enc in e} | set(entries)
+    for dirpath, _, names in os.walk(dist, topdown=False):
+        for name in names:
+            rel = os.path.relpath(os.path.join(dirpath, name), dist).replace(os.sep, '/')
+            if rel not in keep:
+                os.remove(os.path.join(dirpath, name))
+        if dirpath != dist and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+
+    totals = {'files': len(entries), 'size': sum(e['size'] for e in entries.values())}
+    for enc, _ in ENCODINGS:
+        totals[enc] = sum(e.get(enc, e['size']) for e in entries.values())
+    manifest = {'version': MANIFEST_VERSION, 'plain': plain, 'totals': totals, 'files': entries}
+    write_bytes_if_changed(os.path.join(dist, MANIFEST_NAME),
+                           (json.dumps(manifest, indent=1, sort_keys=True) + '\n').encode('utf-8'))
+    report = [f'✓ dist: {dist} ({totals["files"]} files, {len(todo)} compressed, '
+              f'{len(entries) - len(todo)} unchanged or binary)',
+              f'  {totals["size"]:,} bytes raw'
+              + (' (plain: no precompressed files, no _headers)' if plain else
+                 f', {totals["gzip"]:,} gzip'
+                 + (f', {totals["br"]:,} brotli' if brotli is not None else ' (brotli not installed: no .br files)'))]
+    return manifest, report
+
+
+def variant_dirs(matrix_path, names=None):
+    """Output directories of the variants in the matrix (all of them by default)."""
+    with open(matrix_path, 'r', encoding='utf-8') as f:
+        matrix = json.load(f)
+
+    def resolve(name):
+        v = matrix[name]
+        return v['dir'] if 'dir' in v else resolve(v['extends']) if 'extends' in v else ''
+    return [resolve(name) for name in (names or matrix)]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Package a build output into a clean, precompressed dist/.')
+    ap.add_argument('--output', default=HERE, help='build output root (build.py --output)')
+    ap.add_argument('--dist', default=os.path.join(HERE, 'dist'), help='directory to (re)write')
+    ap.add_argument('--matrix', default=os.path.join(HERE, 'variants.json'), help='variant matrix (JSON)')
+    ap.add_argument('--variants', default='all', help="comma-separated variant names, or 'all'")
+    ap.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='compression processes')
+    ap.add_argument('--plain', action='store_true',
+                    help='leave out the .gz/.br siblings and _headers (GitHub Pages ignores both)')
+    args = ap.parse_args(argv)
+    names = None if args.variants == 'all' else [n.strip() for n in args.variants.split(',') if n.strip()]
+    dirs = [d for d in variant_dirs(args.matrix, names)
+            if names or os.path.isfile(os.path.join(args.output, d, 'index.html'))]
+    try:
+        _, report = package(os.path.abspath(args.output), os.path.abspath(args.dist), dirs, args.jobs, args.plain)
+    except DistError as e:
+        sys.exit(f'✗ {e}')
+    print('\n'.join(report))
+
+
+if __name__ == '__main__':
+    main()
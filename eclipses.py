@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+"""Batch solar/lunar eclipse search with local circumstances for one observing site.
+
+The scan is vectorized in three passes so that a century takes seconds:
+
+  1. mean new/full moons from Meeus 49.1 and the |sin F| < 0.36 test of
+     Meeus ch. 54 throw away ~80 % of syzygies without touching the ephemeris;
+  2. Newton iterations on the Moon-Sun elongation give the true syzygies and
+     a geometric shadow-axis test (gamma) keeps only real eclipses;
+  3. a coarse time grid around each survivor brackets every contact, and all
+     brackets are refined together by bisection.
+"""
+from collections import namedtuple
+import datetime as _dt
+
+import numpy as np
+
+from ephemeris import (AU_KM, calendar_date, delta_t, ecliptic_to_equatorial, horizontal,
+                       julian_day, moon_position, obliquity, sidereal_time, sun_position)
+
+Site = namedtuple('Site', 'name lat lon tz tz_name')
+SEOUL = Site('서울', 37.5665, 126.9780, 9.0, 'KST')
+
+R_EARTH = 6378.14
+R_SUN = 696000.0
+R_MOON = 1737.4
+SYNODIC = 29.530588861
+
+SOLAR_LABELS = {'total': '개기일식', 'annular': '금환일식', 'partial': '부분일식'}
+LUNAR_LABELS = {'total': '개기월식', 'partial': '부분월식', 'penumbral': '반영월식'}
+
+
+# ═══════════════════════════════════════════════════════════
+# Geometry
+# ═══════════════════════════════════════════════════════════
+def _unit_xyz(ra, dec):
+    ra, dec = np.radians(ra), np.radians(dec)
+    return np.stack([np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)], axis=-1)
+
+
+def _xyz_to_radec(v):
+    r = np.linalg.norm(v, axis=-1)
+    return np.mod(np.degrees(np.arctan2(v[..., 1], v[..., 0])), 360.0), np.degrees(np.arcsin(v[..., 2] / r))
+
+
+def geocentric_vectors(jd):
+    """Equatorial geocentric Sun and Moon position vectors in km for UT Julian days."""
+    jd = np.asarray(jd, dtype=float)
+    jde = jd + delta_t(jd) / 86400.0
+    eps = obliquity(jde)
+    sun_lon, sun_r = sun_position(jde)
+    moon_lon, moon_lat, moon_dist = moon_position(jde)
+    sun = _unit_xyz(*ecliptic_to_equatorial(sun_lon, 0.0, eps)) * (sun_r * AU_KM)[..., None]
+    moon = _unit_xyz(*ecliptic_to_equatorial(moon_lon, moon_lat, eps)) * moon_dist[..., None]
+    return sun, moon
+
+
+def observer_vector(jd, site):
+    """Geocentric equatorial position of the site in km (sea level, IAU 1976 flattening)."""
+    u = np.arctan(0.99664719 * np.tan(np.radians(site.lat)))
+    theta = np.radians(sidereal_time(jd) + site.lon)
+    rho_cos, rho_sin = np.cos(u), 0.99664719 * np.sin(u)
+    return R_EARTH * np.stack([rho_cos * np.cos(theta), rho_cos * np.sin(theta),
+                               rho_sin * np.ones_like(theta)], axis=-1)
+
+
+def angle_between(a, b):
+    """Angle in degrees between vectors along the last axis (stable for small angles)."""
+    cross = np.linalg.norm(np.cross(a, b), axis=-1)
+    return np.degrees(np.arctan2(cross, np.sum(a * b, axis=-1)))
+
+
+def solar_shadow_axis(jd):
+    """gamma (shadow-axis distance from Earth's centre) and penumbral/umbral radii l1, l2 on the fundamental plane, in Earth radii.
+
+    l2 > 0 means the umbral cone still has width at the plane (total), l2 < 0 antumbra (annular).
+    """
+    sun, moon = geocentric_vectors(jd)
+    d = moon - sun
+    dist_sm = np.linalg.norm(d, axis=-1)
+    d = d / dist_sm[..., None]
+    along = -np.sum(moon * d, axis=-1)                  # Moon -> fundamental plane
+    gamma = np.linalg.norm(moon + along[..., None] * d, axis=-1) / R_EARTH
+    tan_f1 = (R_SUN + R_MOON) / dist_sm
+    tan_f2 = (R_SUN - R_MOON) / dist_sm
+    l1 = (R_MOON + along * tan_f1) / R_EARTH
+    l2 = (R_MOON - along * tan_f2) / R_EARTH
+    return gamma, l1, l2
+
+
+def solar_local(jd, site):
+    """Topocentric Sun-Moon separation and semi-diameters (deg) at the site."""
+    sun, moon = geocentric_vectors(jd)
+    obs = observer_vector(jd, site)
+    sun_t, moon_t = sun - obs, moon - obs
+    sep = angle_between(sun_t, moon_t)
+    s_sun = np.degrees(np.arcsin(R_SUN / np.linalg.norm(sun_t, axis=-1)))
+    s_moon = np.degrees(np.arcsin(R_MOON / np.linalg.norm(moon_t, axis=-1)))
+    return sep, s_sun, s_moon, sun_t
+
+
+def lunar_geometry(jd):
+    """Moon-shadow separation, umbral and penumbral radii, lunar semi-diameter (deg); Chauvenet's 1/50 enlargement."""
+    sun, moon = geocentric_vectors(jd)
+    sep = angle_between(-sun, moon)
+    dist_s = np.linalg.norm(sun, axis=-1)
+    dist_m = np.linalg.norm(moon, axis=-1)
+    par_m = np.degrees(np.arcsin(R_EARTH / dist_m))
+    par_s = np.degrees(np.arcsin(R_EARTH / dist_s))
+    s_sun = np.degrees(np.arcsin(R_SUN / dist_s))
+    s_moon = np.degrees(np.arcsin(R_MOON / dist_m))
+    rho_u = 1.02 * (par_m - s_sun + par_s)
+    rho_p = 1.02 * (par_m + s_sun + par_s)
+    return sep, rho_u, rho_p, s_moon, moon
+
+
+def altitude(vec, jd, site):
+    ra, dec = _xyz_to_radec(vec)
+    return horizontal(ra, dec, jd, site.lat, site.lon)
+
+
+# ═══════════════════════════════════════════════════════════
+# Syzygies
+# ═══════════════════════════════════════════════════════════
+def syzygy_candidates(jd_start, jd_end, phase):
+    """Mean new (phase 0) or full (phase 0.5) moons in [jd_start, jd_end) that pass Meeus' |sin F| < 0.36 test."""
+    k0 = np.floor((jd_start - 2451550.09766) / SYNODIC) - 1
+    k1 = np.ceil((jd_end - 2451550.09766) / SYNODIC) + 1
+    k = np.arange(k0, k1) + phase
+    T = k / 1236.85
+    jde = 2451550.09766 + SYNODIC * k + 0.00015437 * T**2
+    F = np.radians(160.7108 + 390.67050284 * k - 0.0016118 * T**2)
+    keep = (np.abs(np.sin(F)) < 0.36) & (jde >= jd_start - 1) & (jde < jd_end + 1)
+    return jde[keep]
+
+
+def refine_syzygy(jd, target):
+    """Newton iterations on the elongation (target 0 or 180°); jd in UT, vectorized."""
+    jd = np.asarray(jd, dtype=float)
+    for _ in range(4):
+        jde = jd + delta_t(jd) / 86400.0
+        sun_lon, _ = sun_position(jde)
+        moon_lon, _, _ = moon_position(jde)
+        err = np.mod(moon_lon - sun_lon - target + 180.0, 360.0) - 180.0
+        jd = jd - err / (360.0 / SYNODIC)
+    return jd
+
+
+# ═══════════════════════════════════════════════════════════
+# Root finding
+# ═══════════════════════════════════════════════════════════
+def _bisect(f, lo, hi, iters=22):
+    """Vectorized bisection for sign changes of f on [lo, hi]; NaN brackets stay NaN (~2 s after 22 steps on a 6-min grid)."""
+    flo = f(lo)
+    for _ in range(iters):
+        mid = 0.5 * (lo + hi)
+        fm = f(mid)
+        left = np.sign(fm) == np.sign(flo)
+        lo = np.where(left, mid, lo)
+        flo = np.where(left, fm, flo)
+        hi = np.where(left, hi, mid)
+    return 0.5 * (lo + hi)
+
+
+def _brackets(grid, values, imax):
+    """Grid intervals of the last sign change before imax and the first after it (NaN where none)."""
+    n, m = values.shape
+    pos = values > 0
+    change = pos[:, 1:] != pos[:, :-1]                      # (n, m-1)
+    idx = np.arange(m - 1)
+    before = np.where(change & (idx[None, :] < imax[:, None]), idx[None, :], -1).max(axis=1)
+    after = np.where(change & (idx[None, :] >= imax[:, None]), idx[None, :], m).min(axis=1)
+    rows = np.arange(n)
+
+    def pick(i):
+        ok = (i >= 0) & (i < m - 1)
+        j = np.clip(i, 0, m - 2)
+        return (np.where(ok, grid[rows, j], np.nan), np.where(ok, grid[rows, j + 1], np.nan))
+    return pick(before), pick(after)
+
+
+def _contacts(f, grid, values, imax, iters=22):
+    """Refined (start, end) roots of f around each row's maximum."""
+    (lo1, hi1), (lo2, hi2) = _brackets(grid, values, imax)
+    return _bisect(f, lo1, hi1, iters), _bisect(f, lo2, hi2, iters)
+
+
+def _peak(grid, values):
+    """Index of the maximum per row and its parabola-refined time."""
+    n, m = values.shape
+    i = np.clip(np.argmax(values, axis=1), 1, m - 2)
+    rows = np.arange(n)
+    y0, y1, y2 = values[rows, i - 1], values[rows, i], values[rows, i + 1]
+    den = y0 - 2 * y1 + y2
+    shift = np.where(den != 0, 0.5 * (y0 - y2) / np.where(den != 0, den, 1), 0.0)
+    step = grid[rows, 1] - grid[rows, 0]
+    return i, grid[rows, i] + np.clip(shift, -1, 1) * step
+
+
+# ═══════════════════════════════════════════════════════════
+# Search
+# ═══════════════════════════════════════════════════════════
+HALF_WINDOW = 0.2   # days either side of syzygy (covers the longest lunar P1..P4)
+GRID_STEP = 6.0 / 1440.0
+
+
+def _window(jd):
+    offsets = np.arange(-HALF_WINDOW, HALF_WINDOW + GRID_STEP / 2, GRID_STEP)
+    return jd[:, None] + offsets[None, :]
+
+
+def find_solar_eclipses(jd_start, jd_end, site=SEOUL):
+    """Solar eclipses in the span that are at least partly above the site's horizon."""
+    jd = refine_syzygy(syzygy_candidates(jd_start, jd_end, 0.0), 0.0)
+    gamma, l1, l2 = solar_shadow_axis(jd)
+    hit = (gamma < 1.0 + l1) & (jd >= jd_start) & (jd < jd_end)
+    jd, gamma, l2 = jd[hit], gamma[hit], l2[hit]
+    if not len(jd):
+        return []
+    central = gamma < 1.0
+    global_kind = np.where(~central, 'partial', np.where(l2 > 0, 'total', 'annular'))
+
+    grid = _window(jd)
+    sep, s_sun, s_moon, _ = solar_local(grid, site)
+    overlap = s_sun + s_moon - sep
+    imax, tmax = _peak(grid, overlap)
+
+    def f(t):
+        sp, ss, sm, _ = solar_local(t, site)
+        return ss + sm - sp
+    t1, t4 = _contacts(f, grid, overlap, imax)
+
+    sep_m, ss_m, sm_m, sun_m = solar_local(tmax, site)
+    mag = (ss_m + sm_m - sep_m) / (2 * ss_m)
+    local_kind = np.where(sep_m <= sm_m - ss_m, 'total',
+                          np.where(sep_m <= ss_m - sm_m, 'annular', 'partial'))
+
+    events = []
+    for i in np.nonzero(mag > 0)[0]:
+        times = {'start': t1[i], 'max': tmax[i], 'end': t4[i]}
+        if np.isnan(times['start']) or np.isnan(times['end']):
+            continue
+        contacts = []
+        for label in ('start', 'max', 'end'):
+            _, _, _, vec = solar_local(np.array([times[label]]), site)
+            alt, az = altitude(vec, times[label], site)
+            contacts.append({'label': label, 'jd': float(times[label]),
+                             'alt': float(alt[0]), 'az': float(az[0])})
+        if max(c['alt'] for c in contacts) <= 0:
+            continue
+        events.append({
+            'type': 'solar', 'kind': str(local_kind[i]), 'global_kind': str(global_kind[i]),
+            'jd_max': float(tmax[i]), 'magnitude': float(mag[i]),
+            'ratio': float(sm_m[i] / ss_m[i]), 'gamma': float(gamma[i]),
+            'contacts': contacts,
+        })
+    return events
+
+
+def find_lunar_eclipses(jd_start, jd_end, site=SEOUL, include_penumbral=False):
+    """Lunar eclipses in the span with the Moon above the site's horizon during the (umbral) eclipse."""
+    jd = refine_syzygy(syzygy_candidates(jd_start, jd_end, 0.5), 180.0)
+    jd = jd[(jd >= jd_start) & (jd < jd_end)]
+    sep, rho_u, rho_p, s_moon, _ = lunar_geometry(jd)
+    jd = jd[sep < rho_p + s_moon + 0.05]
+    if not len(jd):
+        return []
+
+    grid = _window(jd)
+    sep, rho_u, rho_p, s_moon, _ = lunar_geometry(grid)
+    depth = rho_p + s_moon - sep
+    imax, tmax = _peak(grid, depth)
+
+    def shadow_fn(kind):
+        def f(t):
+            sp, ru, rp, sm, _ = lunar_geometry(t)
+            return {'P': rp + sm, 'U': ru + sm, 'T': ru - sm}[kind] - sp
+        return f
+
+    contacts_t = {}
+    for kind in ('P', 'U', 'T'):
+        vals = {'P': rho_p + s_moon, 'U': rho_u + s_moon, 'T': rho_u - s_moon}[kind] - sep
+        contacts_t[kind] = _contacts(shadow_fn(kind), grid, vals, imax)
+
+    sep_m, ru_m, rp_m, sm_m, _ = lunar_geometry(tmax)
+    umbral_mag = (ru_m + sm_m - sep_m) / (2 * sm_m)
+    penumbral_mag = (rp_m + sm_m - sep_m) / (2 * sm_m)
+    kind = np.where(umbral_mag >= 1, 'total', np.where(umbral_mag > 0, 'partial', 'penumbral'))
+
+    events = []
+    for i in range(len(jd)):
+        if penumbral_mag[i] <= 0 or (kind[i] == 'penumbral' and not include_penumbral):
+            continue
+        seq = [('P1', contacts_t['P'][0][i]), ('U1', contacts_t['U'][0][i]), ('U2', contacts_t['T'][0][i]),
+               ('max', tmax[i]),
+               ('U3', contacts_t['T'][1][i]), ('U4', contacts_t['U'][1][i]), ('P4', contacts_t['P'][1][i])]
+        contacts = []
+        for label, t in seq:
+            if np.isnan(t):
+                continue
+            _, _, _, _, vec = lunar_geometry(np.array([t]))
+            alt, az = altitude(vec, t, site)
+            contacts.append({'label': label, 'jd': float(t), 'alt': float(alt[0]), 'az': float(az[0])})
+        span = [c for c in contacts if c['label'] in
+                (('P1', 'max', 'P4') if kind[i] == 'penumbral' else ('U1', 'max', 'U4'))]
+        if max(c['alt'] for c in span) <= 0:
+            continue
+        events.append({
+            'type': 'lunar', 'kind': str(kind[i]), 'global_kind': str(kind[i]),
+            'jd_max': float(tmax[i]), 'magnitude': float(umbral_mag[i]),
+            'penumbral_magnitude': float(penumbral_mag[i]), 'contacts': contacts,
+        })
+    return events
+
+
+def find_eclipses(start, end, site=SEOUL, include_penumbral=False):
+    """All solar and lunar eclipses visible from `site` between two dates, sorted by time."""
+    jd_start, jd_end = julian_day(start), julian_day(end)
+    events = (find_solar_eclipses(jd_start, jd_end, site)
+              + find_lunar_eclipses(jd_start, jd_end, site, include_penumbral))
+    return sorted(events, key=lambda e: e['jd_max'])
+
+
+# ═══════════════════════════════════════════════════════════
+# Page data (eclipseObsCanvas)
+# ═══════════════════════════════════════════════════════════
+def _local(jd, site):
+    return calendar_date(jd) + _dt.timedelta(hours=site.tz)
+
+
+def _hhmm(hours):
+    h = int(np.floor(hours + 1 / 120.0)) % 24
+    return f'{h:02d}:{int(round((hours % 1) * 60)) % 60:02d}'
+
+
+def _event_id(ev, site):
+    return f'{ev["type"]}_{_local(ev["jd_max"], site):%Y%m%d}'
+
+
+def _span(ev):
+    """The contacts the page's progress slider runs between: first to last, umbral ones for lunar eclipses."""
+    if ev['type'] == 'lunar' and ev['kind'] != 'penumbral':
+        return (next(c for c in ev['contacts'] if c['label'] == 'U1'),
+                next(c for c in ev['contacts'] if c['label'] == 'U4'))
+    return ev['contacts'][0], ev['contacts'][-1]
+
+
+def page_events(events, site=SEOUL):
+    """Shape events for simulations.js: local hours from the local midnight of the first contact."""
+    out = []
+    for ev in events:
+        first = ev['contacts'][0]['jd']
+        day0 = _local(first, site).replace(hour=0, minute=0, second=0, microsecond=0)
+        hours = lambda jd: (_local(jd, site) - day0).total_seconds() / 3600.0
+        peak = _local(ev['jd_max'], site)
+        solar = ev['type'] == 'solar'
+        labels = SOLAR_LABELS if solar else LUNAR_LABELS
+        start, end = _span(ev)
+        max_c = next(c for c in ev['contacts'] if c['label'] == 'max')
+
+        body = '태양' if solar else '달'
+        desc = (f'{site.name}에서 {labels[ev["kind"]]} (식분 {ev["magnitude"]:.2f}). '
+                f'최대 {_hhmm(hours(ev["jd_max"]))} {site.tz_name}, {body} 고도 {max_c["alt"]:.0f}°.')
+        if solar and ev['global_kind'] != ev['kind']:
+            desc += f' 지구 전체로는 {labels[ev["global_kind"]]}.'
+        if start['alt'] < 0:
+            desc += f' 식이 시작될 때 {body}이 지평선 아래에 있습니다.' if not solar else ' 일출 시 이미 식이 진행 중입니다.'
+        if end['alt'] < 0:
+            desc += ' 식이 끝나기 전에 해가 집니다.' if solar else ' 식이 끝나기 전에 달이 집니다.'
+
+        item = {
+            'id': _event_id(ev, site),
+            'name': f'{peak:%Y-%m-%d} {labels[ev["global_kind"]]}',
+            'type': ev['type'], 'kind': ev['kind'],
+            'date': f'{peak.year}년 {peak.month}월 {peak.day}일',
+            'startH': round(hours(start['jd']), 3), 'maxH': round(hours(ev['jd_max']), 3),
+            'endH': round(hours(end['jd']), 3), 'maxMag': round(ev['magnitude'], 3),
+            'contacts': [{'label': c['label'], 'h': round(hours(c['jd']), 3),
+                          'alt': round(c['alt'], 1), 'az': round(c['az'], 1)} for c in ev['contacts']],
+            'desc': desc,
+        }
+        if solar:
+            item['ratio'] = round(ev['ratio'], 4)
+        out.append(item)
+    return out
+
+
+TRACK_SAMPLES = 25  # over the slider's span, so the page indexes them by progress
+
+
+def _sky_offset(body, other, jd, site):
+    """Body (alt, az) and the other direction's offset from it in degrees: along increasing azimuth, then up."""
+    alt, az = altitude(body, jd, site)
+    alt2, az2 = altitude(other, jd, site)
+    a, z, a2, z2 = (np.radians(v) for v in (alt, az, alt2, az2))
+    v = np.stack([np.sin(z2) * np.cos(a2), np.cos(z2) * np.cos(a2), np.sin(a2)], axis=-1)
+    ex = np.stack([np.cos(z), -np.sin(z), np.zeros_like(z)], axis=-1)
+    ey = np.stack([-np.sin(z) * np.sin(a), -np.cos(z) * np.sin(a), np.cos(a)], axis=-1)
+    return alt, az, np.degrees(np.sum(v * ex, axis=-1)), np.degrees(np.sum(v * ey, axis=-1))
+
+
+def sky_tracks(events, site=SEOUL, samples=TRACK_SAMPLES):
+    """SIM_DATA.eclipseTracks: what the site sees over each event's slider span, by page event id.
+
+    track is float32 (samples, 4): the eclipsed body's altitude and azimuth,
+    and the offset of the Moon (solar) or of the umbra's centre (lunar) from
+    it in the body's radii. Lunar events add the umbral and penumbral radii
+    at maximum in Moon radii.
+    """
+    out = {}
+    for ev in events:
+        start, end = _span(ev)
+        t = np.linspace(start['jd'], end['jd'], samples)
+        if ev['type'] == 'solar':
+            sun, moon = geocentric_vectors(t)
+            obs = observer_vector(t, site)
+            body, other = sun - obs, moon - obs
+            radius = np.degrees(np.arcsin(R_SUN / np.linalg.norm(body, axis=-1)))
+            extra = {}
+        else:
+            _, _, _, s_moon, body = lunar_geometry(t)
+            other = -geocentric_vectors(t)[0]
+            radius = s_moon
+            _, rho_u, rho_p, s_max, _ = lunar_geometry(np.array([ev['jd_max']]))
+            extra = {'umbra': round(float(rho_u[0] / s_max[0]), 4), 'penumbra': round(float(rho_p[0] / s_max[0]), 4)}
+        alt, az, dx, dy = _sky_offset(body, other, t, site)
+        track = np.stack([alt, az, dx / radius, dy / radius], axis=-1).astype(np.float32)
+        out[_event_id(ev, site)] = {'track': track, **extra}
+    return {'samples': samples, 'channels': ['alt', 'az', 'dx', 'dy'], 'events': out}
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""Vectorized Sun-Earth-Moon ephemeris (Meeus, Astronomical Algorithms [7]).
+
+All functions take Julian Ephemeris Days as scalars or NumPy arrays and
+return angles in degrees, distances in AU (Sun) or km (Moon).
+
+  sun_position   Meeus ch. 25 (low accuracy, ~0.01°)
+  moon_position  Meeus ch. 47, the principal periodic terms (~0.01°, ~20 km)
+"""
+import datetime as _dt
+
+import numpy as np
+
+J2000 = 2451545.0
+AU_KM = 149597870.7
+
+
+# ═══════════════════════════════════════════════════════════
+# Time
+# ═══════════════════════════════════════════════════════════
+def julian_day(date):
+    """JD (UT) of a datetime/date or 'YYYY-MM-DD[THH:MM]' string."""
+    if isinstance(date, str):
+        date = _dt.datetime.fromisoformat(date)
+    elif not isinstance(date, _dt.datetime):
+        date = _dt.datetime(date.year, date.month, date.day)
+    if date.tzinfo is not None:
+        date = date.astimezone(_dt.timezone.utc).replace(tzinfo=None)
+    return J2000 + (date - _dt.datetime(2000, 1, 1, 12)).total_seconds() / 86400.0
+
+
+def calendar_date(jd):
+    """Inverse of julian_day for a scalar JD (UT), returned as a naive UTC datetime."""
+    return _dt.datetime(2000, 1, 1, 12) + _dt.timedelta(days=float(jd) - J2000)
+
+
+def delta_t(jd):
+    """TT - UT in seconds (Espenak & Meeus polynomial, 1986-2150)."""
+    y = 2000.0 + (np.asarray(jd, dtype=float) - J2000) / 365.25
+    t = y - 2000.0
+    u = (y - 1820.0) / 100.0
+    return np.where(
+        y < 2005, 63.86 + 0.3345 * t - 0.060374 * t**2 + 0.0017275 * t**3 + 0.000651814 * t**4,
+        np.where(y < 2050, 62.92 + 0.32217 * t + 0.005589 * t**2,
+                 -20 + 32 * u**2 - 0.5628 * (2150 - y)))
+
+
+def centuries(jde):
+    return (np.asarray(jde, dtype=float) - J2000) / 36525.0
+
+
+# ═══════════════════════════════════════════════════════════
+# Earth orientation
+# ═══════════════════════════════════════════════════════════
+def obliquity(jde):
+    """True obliquity of the ecliptic (Meeus 22.2 plus the main nutation term)."""
+    T = centuries(jde)
+    eps0 = 23.439291111 - (46.8150 * T + 0.00059 * T**2 - 0.001813 * T**3) / 3600.0
+    omega = 125.04452 - 1934.136261 * T
+    return eps0 + 0.00256 * np.cos(np.radians(omega))
+
+
+def sidereal_time(jd):
+    """Greenwich mean sidereal time in degrees (Meeus 12.4), jd in UT."""
+    d = np.asarray(jd, dtype=float) - J2000
+    T = d / 36525.0
+    return np.mod(280.46061837 + 360.98564736629 * d + 0.000387933 * T**2 - T**3 / 38710000.0, 360.0)
+
+
+def ecliptic_to_equatorial(lon, lat, eps):
+    """(RA, Dec) in degrees from ecliptic longitude/latitude and obliquity."""
+    lon, lat, eps = np.radians(lon), np.radians(lat), np.radians(eps)
+    ra = np.arctan2(np.sin(lon) * np.cos(eps) - np.tan(lat) * np.sin(eps), np.cos(lon))
+    dec = np.arcsin(np.sin(lat) * np.cos(eps) + np.cos(lat) * np.sin(eps) * np.sin(lon))
+    return np.mod(np.degrees(ra), 360.0), np.degrees(dec)
+
+
+def horizontal(ra, dec, jd, lat, lon):
+    """(altitude, azimuth) in degrees for an observer at lat/lon (east positive); azimuth from north, clockwise."""
+    H = np.radians(sidereal_time(jd) + lon - ra)
+    phi, d = np.radians(lat), np.radians(dec)
+    alt = np.arcsin(np.sin(phi) * np.sin(d) + np.cos(phi) * np.cos(d) * np.cos(H))
+    az = np.arctan2(-np.sin(H) * np.cos(d), np.cos(phi) * np.sin(d) - np.sin(phi) * np.cos(d) * np.cos(H))
+    return np.degrees(alt), np.mod(np.degrees(az), 360.0)
+
+
+# ═══════════════════════════════════════════════════════════
+# Sun (Meeus ch. 25)
+# ═══════════════════════════════════════════════════════════
+def sun_position(jde):
+    """Apparent geocentric ecliptic longitude (deg) and distance (AU) of the Sun."""
+    T = centuries(jde)
+    L0 = 280.46646 + 36000.76983 * T + 0.0003032 * T**2
+    M = np.radians(357.52911 + 35999.05029 * T - 0.0001537 * T**2)
+    e = 0.016708634 - 0.000042037 * T - 0.0000001267 * T**2
+    C = ((1.914602 - 0.004817 * T - 0.000014 * T**2) * np.sin(M)
+         + (0.019993 - 0.000101 * T) * np.sin(2 * M)
+         + 0.000289 * np.sin(3 * M))
+    nu = M + np.radians(C)
+    R = 1.000001018 * (1 - e**2) / (1 + e * np.cos(nu))
+    omega = np.radians(125.04 - 1934.136 * T)
+    lon = L0 + C - 0.00569 - 0.00478 * np.sin(omega)
+    return np.mod(lon, 360.0), R
+
+
+# ═══════════════════════════════════════════════════════════
+# Moon (Meeus ch. 47)
+# ═══════════════════════════════════════════════════════════
+# Rows: D, M, M', F multipliers, Σl (1e-6 deg), Σr (1e-3 km)  — Table 47.A
+_MOON_LR = np.array([
+    (0, 0, 1, 0, 6288774, -20905355), (2, 0, -1, 0, 1274027, -3699111),
+    (2, 0, 0, 0, 658314, -2955968), (0, 0, 2, 0, 213618, -569925),
+    (0, 1, 0, 0, -185116, 48888), (0, 0, 0, 2, -114332, -3149),
+    (2, 0, -2, 0, 58793, 246158), (2, -1, -1, 0, 57066, -152138),
+    (2, 0, 1, 0, 53322, -170733), (2, -1, 0, 0, 45758, -204586),
+    (0, 1, -1, 0, -40923, -129620), (1, 0, 0, 0, -34720, 108743),
+    (0, 1, 1, 0, -30383, 104755), (2, 0, 0, -2, 15327, 10321),
+    (0, 0, 1, 2, -12528, 0), (0, 0, 1, -2, 10980, 79661),
+    (4, 0, -1, 0, 10675, -34782), (0, 0, 3, 0, 10034, -23210),
+    (4, 0, -2, 0, 8548, -21636), (2, 1, -1, 0, -7888, 24208),
+    (2, 1, 0, 0, -6766, 30824), (1, 0, -1, 0, -5163, -8379),
+    (1, 1, 0, 0, 4987, -16675), (2, -1, 1, 0, 4036, -12831),
+    (2, 0, 2, 0, 3994, -10445), (4, 0, 0, 0, 3861, -11650),
+    (2, 0, -3, 0, 3665, 14403), (0, 1, -2, 0, -2689, -7003),
+    (2, 0, -1, 2, -2602, 0), (2, -1, -2, 0, 2390, 10056),
+    (1, 0, 1, 0, -2348, 6322), (2, -2, 0, 0, 2236, -9884),
+], dtype=float)
+
+# Rows: D, M, M', F multipliers, Σb (1e-6 deg)  — Table 47.B
+_MOON_B = np.array([
+    (0, 0, 0, 1, 5128122), (0, 0, 1, 1, 280602), (0, 0, 1, -1, 277693),
+    (2, 0, 0, -1, 173237), (2, 0, -1, 1, 55413), (2, 0, -1, -1, 46271),
+    (2, 0, 0, 1, 32573), (0, 0, 2, 1, 17198), (2, 0, 1, -1, 9266),
+    (0, 0, 2, -1, 8822), (2, -1, 0, -1, 8216), (2, 0, -2, -1, 4324),
+    (2, 0, 1, 1, 4200), (2, 1, 0, -1, -3359), (2, -1, -1, 1, 2463),
+    (2, -1, 0, 1, 2211), (2, -1, -1, -1, 2065), (0, 1, -1, -1, -1870),
+    (4, 0, -1, -1, 1828), (0, 1, 0, 1, -1794),
+], dtype=float)
+
+
+def _eccentricity_factor(m_mult, E):
+    """Terms containing M are multiplied by E (|M| = 1) or E² (|M| = 2)."""
+    return E[..., None] ** np.abs(m_mult)
+
+
+def moon_position(jde):
+    """Apparent geocentric ecliptic longitude, latitude (deg) and distance (km) of the Moon."""
+    T = centuries(jde)
+    Lp = 218.3164477 + 481267.88123421 * T - 0.0015786 * T**2 + T**3 / 538841 - T**4 / 65194000
+    D = 297.8501921 + 445267.1114034 * T - 0.0018819 * T**2 + T**3 / 545868 - T**4 / 113065000
+    M = 357.5291092 + 35999.0502909 * T - 0.0001536 * T**2 + T**3 / 24490000
+    Mp = 134.9633964 + 477198.8675055 * T + 0.0087414 * T**2 + T**3 / 69699 - T**4 / 14712000
+    F = 93.2720950 + 483202.0175233 * T - 0.0036539 * T**2 - T**3 / 3526000 + T**4 / 863310000
+    A1 = np.radians(119.75 + 131.849 * T)
+    A2 = np.radians(53.09 + 479264.290 * T)
+    A3 = np.radians(313.45 + 481266.484 * T)
+    E = 1 - 0.002516 * T - 0.0000074 * T**2
+
+    args = np.radians(np.stack([D, M, Mp, F], axis=-1))          # (..., 4)
+    lr_arg = args @ _MOON_LR[:, :4].T                              # (..., 32)
+    lr_e = _eccentricity_factor(_MOON_LR[:, 1], E)
+    sl = np.sum(_MOON_LR[:, 4] * lr_e * np.sin(lr_arg), axis=-1)
+    sr = np.sum(_MOON_LR[:, 5] * lr_e * np.cos(lr_arg), axis=-1)
+    b_arg = args @ _MOON_B[:, :4].T
+    sb = np.sum(_MOON_B[:, 4] * _eccentricity_factor(_MOON_B[:, 1], E) * np.sin(b_arg), axis=-1)
+
+    Lp_r, Mp_r, F_r = np.radians(Lp), np.radians(Mp), np.radians(F)
+    sl = sl + 3958 * np.sin(A1) + 1962 * np.sin(Lp_r - F_r) + 318 * np.sin(A2)
+    sb = (sb - 2235 * np.sin(Lp_r) + 382 * np.sin(A3) + 175 * np.sin(A1 - F_r)
+          + 175 * np.sin(A1 + F_r) + 127 * np.sin(Lp_r - Mp_r) - 115 * np.sin(Lp_r + Mp_r))
+
+    # Nutation in longitude, main term only (Meeus 22)
+    omega = np.radians(125.04452 - 1934.136261 * T)
+    dpsi = -17.20 / 3600.0 * np.sin(omega)
+    lon = np.mod(Lp + sl / 1e6 + dpsi, 360.0)
+    return lon, sb / 1e6, 385000.56 + sr / 1000.0
+
+
+def elongation(jde):
+    """Moon-Sun elongation in ecliptic longitude, 0..360° (0 = new, 180 = full)."""
+    sun_lon, _ = sun_position(jde)
+    moon_lon, _, _ = moon_position(jde)
+    return np.mod(moon_lon - sun_lon, 360.0)
+
+
+# ═══════════════════════════════════════════════════════════
+# Tables for the page
+# ═══════════════════════════════════════════════════════════
+EPHEMERIS_CHANNELS = ('earthLon', 'earthR', 'moonLon', 'moonLat', 'moonDist')
+
+
+def ephemeris_table(start, days, step=1.0):
+    """Sample Sun/Earth/Moon positions on a regular grid starting at `start` (UT midnight).
+
+    Returns a dict with the JD of the first sample, the step in days, the
+    channel names and an (n, 5) float32 array. Longitudes are unwrapped so the
+    page can interpolate linearly between samples.
+    """
+    jd0 = julian_day(start)
+    jd = jd0 + np.arange(0.0, days + step / 2, step)
+    jde = jd + delta_t(jd) / 86400.0
+    sun_lon, sun_r = sun_position(jde)
+    moon_lon, moon_lat, moon_dist = moon_position(jde)
+    earth_lon = np.mod(sun_lon + 180.0, 360.0)  # heliocentric Earth = geocentric Sun + 180°
+    values = np.stack([
+        np.degrees(np.unwrap(np.radians(earth_lon))),
+        sun_r,
+        np.degrees(np.unwrap(np.radians(moon_lon))),
+        moon_lat,
+        moon_dist,
+    ], axis=-1).astype(np.float32)
+
+    # First new moon in the span anchors the lunar-phase slider to a real lunation
+    elong = np.mod(moon_lon - sun_lon, 360.0)
+    wrap = np.nonzero(np.diff(elong) < -180.0)[0]
+    i = int(wrap[0]) if len(wrap) else 0
+    a, b = elong[i] - 360.0, elong[i + 1]
+    new_moon = (i + (-a) / (b - a)) * step
+
+    return {
+        'jd0': jd0,
+        'step': step,
+        'channels': list(EPHEMERIS_CHANNELS),
+        'newMoon': round(float(new_moon), 4),
+        'values': values,
+    }
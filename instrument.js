@@ -0,0 +1,212 @@
+// ═══════════════════════════════════════════════════════════
+// Frame-time instrumentation (build.py --instrument only)
+// ═══════════════════════════════════════════════════════════
+// Put in front of the core bundle of instrumented builds, in the same script,
+// so it rebinds the (hoisted) boot helpers of simulations.js before any
+// simulation module runs: simModule times each init and the input/pointer
+// listeners it adds (slider redraws), simFrame times every animation callback
+// and the interval since that canvas's previous frame (the report adds the
+// quality its simSurface() is at), and simTrail remembers which simulation
+// owns each trail. Long tasks (where PerformanceObserver
+// reports them) are attributed to the simulation whose callback overlapped
+// them. A small overlay shows the live numbers; its JSON button, or
+// simPerf.download(), saves everything for comparing builds.
+// build.py also appends this file to the worker bundle (sim_worker.js): there
+// it hooks the same helpers and the element mirrors' listeners, and posts its
+// per-simulation numbers to the page every second (a 'perf' message, see
+// startSimWorker), which reports them with its own.
+const simPerf = (() => {
+  const IN_WORKER = typeof window === 'undefined';
+  const BUCKETS = [1, 2, 4, 8, 16.7, 33.3, 50, 100, Infinity];  // ms, upper bucket edges
+  const SAMPLES = 600;        // recent samples per series, for the percentiles
+  const RESTART_MS = 1000;    // a longer gap between frames is a paused loop, not a dropped frame
+  const TIMED_EVENTS = /^(input|change|click|wheel|pointer\w+|mouse\w+|touch\w+|key\w+)$/;
+  const started = performance.now();
+  const sims = {};
+  const spans = [];           // [start, end, canvas id] of the last timed callbacks
+  const longTasks = [];
+  const remote = {};          // canvas id -> the numbers posted by its worker
+  let owner = null;           // simulation whose init is running
+
+  function series() {
+    return { count: 0, total: 0, max: 0, hist: BUCKETS.map(() => 0), recent: new Float32Array(SAMPLES) };
+  }
+  function sim(id) {
+    if (!sims[id]) sims[id] = { init: null, frame: series(), interval: series(), event: series(), trails: [], last: null,
+                                canvas: null };
+    return sims[id];
+  }
+  function record(s, ms) {
+    s.recent[s.count % SAMPLES] = ms;
+    s.count++;
+    s.total += ms;
+    s.max = Math.max(s.max, ms);
+    s.hist[BUCKETS.findIndex(b => ms <= b)]++;
+  }
+  function timed(id, kind, fn, self, args) {
+    const t0 = performance.now();
+    try {
+      return fn.apply(self, args);
+    } finally {
+      const t1 = performance.now();
+      record(sim(id)[kind], t1 - t0);
+      spans.push([t0, t1, id]);
+      if (spans.length > 64) spans.shift();
+    }
+  }
+  function summary(s) {
+    const n = Math.min(s.count, SAMPLES);
+    const sorted = Array.from(s.recent.subarray(0, n)).sort((a, b) => a - b);
+    const q = p => n ? sorted[Math.min(n - 1, Math.floor(p * n))] : 0;
+    return { count: s.count, mean: s.count ? s.total / s.count : 0, p50: q(0.5), p95: q(0.95), p99: q(0.99),
+             max: s.max, hist: s.hist.slice(), sorted };
+  }
+
+  // ── Hooks ──
+  const bootModule = simModule, bootFrame = simFrame, bootTrail = simTrail;
+  simModule = function(canvasId, init) {
+    bootModule(canvasId, function() {
+      // Listeners go through EventTarget on the page and through the element mirrors in a worker
+      const targets = IN_WORKER ? [...Object.values(simElements), simCanvas] : [EventTarget.prototype];
+      const adds = targets.map(target => {
+        const add = target.addEventListener;
+        target.addEventListener = function(type, listener, options) {
+          if (TIMED_EVENTS.test(type) && typeof listener === 'function') {
+            const inner = listener;
+            listener = function() { return timed(canvasId, 'event', inner, this, arguments); };
+          }
+          return add.call(this, type, listener, options);
+        };
+        return add;
+      });
+      owner = canvasId;
+      const t0 = performance.now();
+      try {
+        return init.apply(this, arguments);
+      } finally {
+        sim(canvasId).init = performance.now() - t0;
+        owner = null;
+        targets.forEach((target, k) => { target.addEventListener = adds[k]; });
+      }
+    });
+  };
+  simFrame = function(canvas, cb) {
+    const s = sim(canvas.id);
+    s.canvas = canvas;
+    const id = bootFrame(canvas, function(t) {
+      if (s.last !== null && t - s.last < RESTART_MS) record(s.interval, t - s.last);
+      s.last = t;
+      return timed(canvas.id, 'frame', cb, this, arguments);
+    });
+    if (!id) s.last = null;  // parked off-screen
+    return id;
+  };
+  simTrail = function(capacity) {
+    const trail = bootTrail(capacity);
+    if (owner) sim(owner).trails.push({ capacity, trail, peak: 0 });
+    return trail;
+  };
+
+  if (typeof PerformanceObserver === 'function' && (PerformanceObserver.supportedEntryTypes || []).includes('longtask')) {
+    new PerformanceObserver(list => list.getEntries().forEach(e => {
+      const end = e.startTime + e.duration;
+      const span = spans.slice().reverse().find(([t0, t1]) => t0 < end && t1 > e.startTime);
+      longTasks.push({ start: e.startTime, duration: e.duration, sim: span ? span[2] : null });
+    })).observe({ type: 'longtask', buffered: true });
+  }
+
+  // ── Report ──
+  function simsReport() {
+    const out = {};
+    for (const id in sims) {
+      const s = sims[id];
+      const { sorted: _f, ...frame } = summary(s.frame);
+      const { sorted, ...interval } = summary(s.interval);
+      const { sorted: _e, ...event } = summary(s.event);
+      // Dropped: intervals over 1.5x the median, i.e. at least one display refresh missed
+      interval.dropped = sorted.filter(v => v > 1.5 * interval.p50).length / (sorted.length || 1);
+      s.trails.forEach(t => { t.peak = Math.max(t.peak, t.trail.length); });
+      const surface = s.canvas && simSurfaces.get(s.canvas);
+      out[id] = { initMs: s.init, frame, interval, event, quality: surface ? surface.quality : null,
+                  trails: s.trails.map(t => ({ capacity: t.capacity, length: t.trail.length, peak: t.peak })),
+                  longTasks: longTasks.filter(t => t.sim === id).length, worker: IN_WORKER };
+    }
+    return out;
+  }
+
+  function report() {
+    const out = {
+      version: 1,
+      build: typeof SIM_PERF_BUILD === 'object' ? SIM_PERF_BUILD : null,
+      recordedAt: new Date().toISOString(),
+      durationMs: performance.now() - started,
+      device: { userAgent: navigator.userAgent, devicePixelRatio: window.devicePixelRatio,
+                hardwareConcurrency: navigator.hardwareConcurrency || null, deviceMemory: navigator.deviceMemory || null,
+                screen: typeof screen === 'object' ? [screen.width, screen.height] : null },
+      buckets: BUCKETS.map(b => (b === Infinity ? null : b)),
+      longTasks: longTasks.slice(),
+      sims: Object.assign({}, remote, simsReport()),
+    };
+    return out;
+  }
+
+  // Numbers posted by a worker's copy of this file (the page's own win for a worker that fell back)
+  function receive(workerSims) {
+    Object.assign(remote, workerSims);
+  }
+
+  function download() {
+    const data = report();
+    const a = document.createElement('a');
+    a.href = URL.createObjectURL(new Blob([JSON.stringify(data, null, 1)], { type: 'application/json' }));
+    a.download = `simperf-${data.build ? data.build.variant + '-' + data.build.inputs : 'page'}-${Date.now()}.json`;
+    document.body.appendChild(a);
+    a.click();
+    a.remove();
+    setTimeout(() => URL.revokeObjectURL(a.href), 1000);
+  }
+
+  // ── Overlay ──
+  function overlay() {
+    const box = document.createElement('div');
+    box.style.cssText = 'position:fixed;right:8px;bottom:8px;z-index:9999;background:rgba(10,14,39,.88);color:#cde;' +
+      'font:11px/1.4 monospace;padding:6px 8px;border-radius:4px;max-width:440px;white-space:pre;pointer-events:auto';
+    const body = document.createElement('div');
+    const button = (label, onclick) => {
+      const b = document.createElement('button');
+      b.type = 'button';
+      b.textContent = label;
+      b.style.cssText = 'font:inherit;margin-left:6px';
+      b.addEventListener('click', onclick);
+      box.appendChild(b);
+      return b;
+    };
+    const title = document.createElement('b');
+    title.textContent = 'sim frame times (ms)';
+    box.appendChild(title);
+    button('JSON', download);
+    const fold = button('−', () => {
+      body.hidden = !body.hidden;
+      fold.textContent = body.hidden ? '+' : '−';
+    });
+    box.appendChild(body);
+    document.body.appendChild(box);
+    const f = v => v.toFixed(1).padStart(5);
+    setInterval(() => {
+      if (body.hidden) return;
+      const r = report();
+      const rows = Object.entries(r.sims).map(([id, s]) => {
+        const trails = s.trails.map(t => `${t.length}/${t.capacity}`).join(' ');
+        return `${id.replace(/Canvas$/, '').padEnd(16)}${f(s.frame.p50)}${f(s.frame.p95)}${f(s.event.p95)}` +
+               `${(100 * s.interval.dropped).toFixed(0).padStart(5)}%${String(s.longTasks).padStart(4)}` +
+               `${s.quality === null ? '    -' : s.quality.toFixed(2).padStart(5)}  ${trails}`;
+      });
+      body.textContent = `${'sim'.padEnd(16)}  p50  p95 input drop long    q trails\n` + rows.join('\n');
+    }, 1000);
+  }
+  if (IN_WORKER) setInterval(() => postMessage({ type: 'perf', sims: simsReport() }), 1000);
+  else if (document.readyState === 'loading') document.addEventListener('DOMContentLoaded', overlay);
+  else overlay();
+
+  return { report, download, receive };
+})();
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Daily solar geometry and clear-sky irradiance tables for the chapter 4 simulations.
+
+Same simple model as the page text: sinusoidal declination, noon elevation,
+day length from the sunrise hour angle, and a Meinel-type air-mass
+attenuation S0·sin(α)·0.7^(AM^0.678). Everything is vectorized over days,
+latitudes and elevations.
+"""
+import numpy as np
+
+S0 = 1361.0          # solar constant, W/m²
+OBLIQUITY = 23.44
+DAYS = 365
+MONTH_DAYS = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+MONTH_START = np.concatenate([[0], np.cumsum(MONTH_DAYS)[:-1]])
+
+
+# ═══════════════════════════════════════════════════════════
+# Kernels
+# ═══════════════════════════════════════════════════════════
+def solar_declination(day):
+    """Declination in degrees for day-of-year (0 = Jan 1)."""
+    return OBLIQUITY * np.sin(2 * np.pi / DAYS * (np.asarray(day, dtype=float) - 81))
+
+
+def max_elevation(lat, decl):
+    """Noon solar elevation in degrees (may be negative during polar night)."""
+    return 90.0 - np.abs(np.asarray(lat, dtype=float) - decl)
+
+
+def sunrise_hour_angle(lat, decl):
+    """Hour angle of sunrise/sunset in degrees: 0 in polar night, 180 under the midnight sun."""
+    cos_ha = -np.tan(np.radians(lat)) * np.tan(np.radians(decl))
+    return np.degrees(np.arccos(np.clip(cos_ha, -1.0, 1.0)))
+
+
+def day_length(lat, decl):
+    """Hours of daylight from the sunrise hour angle."""
+    return sunrise_hour_angle(lat, decl) / 7.5
+
+
+def sun_altaz(lat, decl, ha):
+    """(altitude, azimuth) of the Sun in degrees at hour angle ha (0 = noon, > 0 afternoon).
+
+    Azimuth from north, clockwise, as sunPos() in the celestial-sphere simulation.
+    """
+    phi, delta, h = np.radians(lat), np.radians(decl), np.radians(ha)
+    sin_alt = np.clip(np.sin(phi) * np.sin(delta) + np.cos(phi) * np.cos(delta) * np.cos(h), -1.0, 1.0)
+    alt = np.arcsin(sin_alt)
+    cos_az = (np.sin(delta) - np.sin(phi) * sin_alt) / (np.cos(phi) * np.cos(alt) + 1e-10)
+    az = np.arccos(np.clip(cos_az, -1.0, 1.0))
+    return np.degrees(alt), np.degrees(np.where(np.sin(h) > 0, 2 * np.pi - az, az))
+
+
+def air_mass(elev):
+    """Plane-parallel air mass 1/sin(α); infinite at or below the horizon."""
+    elev = np.asarray(elev, dtype=float)
+    with np.errstate(divide='ignore'):
+        return np.where(elev > 0, 1.0 / np.sin(np.radians(np.maximum(elev, 1e-9))), np.inf)
+
+
+def clear_sky_irradiance(elev):
+    """Clear-sky irradiance on a horizontal surface, W/m², for solar elevation α in degrees."""
+    elev = np.asarray(elev, dtype=float)
+    up = elev > 0
+    am = air_mass(np.where(up, elev, 90.0))
+    return np.where(up, S0 * np.sin(np.radians(elev)) * 0.7 ** (am ** 0.678), 0.0)
+
+
+def weather_factor(day, monthly):
+    """Monthly clearness factors (Jan-Dec) interpolated to days, blending each month into the next."""
+    day = np.asarray(day)
+    m = np.searchsorted(MONTH_START, day, side='right') - 1
+    frac = (day - MONTH_START[m]) / MONTH_DAYS[m]
+    monthly = np.asarray(monthly, dtype=float)
+    return monthly[m] * (1 - frac) + monthly[(m + 1) % 12] * frac
+
+
+# ═══════════════════════════════════════════════════════════
+# Tables for the page
+# ═══════════════════════════════════════════════════════════
+CITY_CHANNELS = ('dayLength', 'clearSky', 'actual')
+
+
+def city_table(cities):
+    """(n_cities, 365, 3) float32: day length (h), clear-sky and weather-weighted noon irradiance (W/m²)."""
+    day = np.arange(DAYS)
+    decl = solar_declination(day)
+    lat = np.array([c['lat'] for c in cities], dtype=float)[:, None]
+    clear = clear_sky_irradiance(max_elevation(lat, decl[None, :]))
+    weather = np.stack([weather_factor(day, c['weather']) for c in cities])
+    return np.stack([day_length(lat, decl[None, :]), clear, clear * weather], axis=-1).astype(np.float32)
+
+
+def elevation_table(step=0.1):
+    """Irradiance and air mass sampled over noon elevation 0..90°."""
+    elev = np.arange(0.0, 90.0 + step / 2, step)
+    return {'step': step,
+            'irradiance': clear_sky_irradiance(elev).astype(np.float32),
+            'airMass': air_mass(elev).astype(np.float32)}
+
+
+def day_length_table(lat_step=1.0, decl_step=1.0):
+    """Day length in minutes on a latitude-band x declination grid (bilinear lookup in the page)."""
+    lats = np.arange(-90.0, 90.0 + lat_step / 2, lat_step)
+    decls = np.arange(-24.0, 24.0 + decl_step / 2, decl_step)
+    minutes = np.rint(60 * day_length(lats[:, None], decls[None, :]))
+    return {'lat0': float(lats[0]), 'latStep': lat_step,
+            'decl0': float(decls[0]), 'declStep': decl_step,
+            'minutes': minutes.astype(np.uint16)}
+
+
+def irradiance_tables(cities):
+    """Everything the irradiance and axial-tilt simulations read from SIM_DATA.irradiance."""
+    return {
+        'declination': solar_declination(np.arange(DAYS)).astype(np.float32),
+        'cities': [dict(c) for c in cities],
+        'channels': list(CITY_CHANNELS),
+        'values': city_table(cities),
+        'elevation': elevation_table(),
+        'dayLength': day_length_table(),
+    }
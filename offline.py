@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""Offline build support: vendored KaTeX and portraits, math pre-rendered at build time.
+
+`python build.py --fetch-vendor` downloads KaTeX and the scientist portraits
+into vendor/ once, on a connected machine. After that, `python build.py --offline`
+needs no network: every $$…$$ and \\(…\\) block is rendered to static HTML by
+the vendored katex.min.js (run once per build under node), the KaTeX
+stylesheet and woff2 fonts are shipped as hashed assets, and the portraits
+are served as resized AVIF/WebP/JPEG from the same origin.
+"""
+import html as html_lib
+import io, json, os, re, subprocess, urllib.request
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # optional: without Pillow the original portrait files are shipped unchanged
+    Image = None
+
+KATEX_VERSION = '0.16.9'
+KATEX_CDN = f'https://cdn.jsdelivr.net/npm/katex@{KATEX_VERSION}/dist/'
+VENDOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vendor')
+KATEX_DIR = os.path.join(VENDOR_DIR, f'katex-{KATEX_VERSION}')
+PORTRAIT_DIR = os.path.join(VENDOR_DIR, 'portraits')
+
+PORTRAIT_SIZE = (240, 300)  # 2x the 120x150 .scientist-card img box
+USER_AGENT = 'celestial-mechanics-build/1.0 (offline vendoring)'
+
+
+class OfflineError(Exception):
+    pass
+
+
+# ═══════════════════════════════════════════════════════════
+# Fetch (run once with network access)
+# ═══════════════════════════════════════════════════════════
+def _download(url, path):
+    req = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    with urllib.request.urlopen(req, timeout=60) as r:
+        data = r.read()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    print(f'  {url} -> {os.path.relpath(path, VENDOR_DIR)} ({len(data):,} B)')
+    return data
+
+
+def fetch_vendor(portraits):
+    """Download katex.min.js/css, the woff2 fonts they reference, and the portraits."""
+    _download(KATEX_CDN + 'katex.min.js', os.path.join(KATEX_DIR, 'katex.min.js'))
+    css = _download(KATEX_CDN + 'katex.min.css', os.path.join(KATEX_DIR, 'katex.min.css')).decode('utf-8')
+    for font in sorted(set(re.findall(r'url\(fonts/([\w.-]+\.woff2)\)', css))):
+        _download(KATEX_CDN + 'fonts/' + font, os.path.join(KATEX_DIR, 'fonts', font))
+    for key, url in portraits.items():
+        ext = os.path.splitext(url)[1].lower()
+        _download(url, os.path.join(PORTRAIT_DIR, key + ext))
+
+
+def vendor_files():
+    """Every vendored file, for the build cache."""
+    paths = []
+    for dirpath, _, names in os.walk(VENDOR_DIR):
+        paths.extend(os.path.join(dirpath, n) for n in names)
+    return sorted(paths)
+
+
+def require_vendor():
+    if not os.path.exists(os.path.join(KATEX_DIR, 'katex.min.js')):
+        raise OfflineError(f'{KATEX_DIR} is missing; run `python build.py --fetch-vendor` on a connected machine '
+                           'and copy vendor/ along with the sources')
+
+
+# ═══════════════════════════════════════════════════════════
+# Math pre-rendering
+# ═══════════════════════════════════════════════════════════
+# Same delimiters as the client-side auto-render call in simulations.js
+MATH_RE = re.compile(r'\$\$(.+?)\$\$|\\\((.+?)\\\)', re.S)
+
+_RENDER_SCRIPT = '''
+const katex = require(process.argv[1]);
+let input = '';
+process.stdin.on('data', d => input += d);
+process.stdin.on('end', () => {
+  const out = JSON.parse(input).map(([tex, display]) =>
+    katex.renderToString(tex, { displayMode: display, throwOnError: false }));
+  process.stdout.write(JSON.stringify(out));
+});
+'''
+
+
+def render_math(pages):
+    """Replace math delimiters in each HTML string with KaTeX markup (one node process for all)."""
+    items = []
+    for page in pages:
+        for m in MATH_RE.finditer(page):
+            display = m.group(1) is not None
+            items.append((html_lib.unescape(m.group(1) if display else m.group(2)).strip(), display))
+    if not items:
+        return list(pages)
+    try:
+        proc = subprocess.run(['node', '-e', _RENDER_SCRIPT, os.path.join(KATEX_DIR, 'katex.min.js')],
+                              input=json.dumps(items), capture_output=True, text=True, encoding='utf-8')
+    except FileNotFoundError:
+        raise OfflineError('node is required to pre-render math with the vendored KaTeX')
+    if proc.returncode != 0:
+        raise OfflineError(f'KaTeX render failed:\n{proc.stderr}')
+    rendered = iter(json.loads(proc.stdout))
+    return [MATH_RE.sub(lambda m: next(rendered), page) for page in pages]
+
+
+# ═══════════════════════════════════════════════════════════
+# Vendored assets
+# ═══════════════════════════════════════════════════════════
+def katex_assets():
+    """(css, {font filename: bytes}) with @font-face sources trimmed to woff2."""
+    with open(os.path.join(KATEX_DIR, 'katex.min.css'), 'r', encoding='utf-8') as f:
+        css = f.read()
+    # Every browser that runs the simulations reads woff2; drop the woff/ttf fallbacks
+    css = re.sub(r'src:url\((fonts/[\w.-]+\.woff2)\) format\("woff2"\)[^;}]*',
+                 r'src:url(\1) format("woff2")', css)
+    fonts = {}
+    for name in sorted(set(re.findall(r'url\(fonts/([\w.-]+\.woff2)\)', css))):
+        with open(os.path.join(KATEX_DIR, 'fonts', name), 'rb') as f:
+            fonts[name] = f.read()
+    return css, fonts
+
+
+def portrait_variants(key):
+    """[(mime, ext, bytes)] for one portrait, best format first; JPEG (or the original) last."""
+    names = [n for n in os.listdir(PORTRAIT_DIR) if os.path.splitext(n)[0] == key] \
+        if os.path.isdir(PORTRAIT_DIR) else []
+    if not names:
+        return []
+    with open(os.path.join(PORTRAIT_DIR, names[0]), 'rb') as f:
+        original = f.read()
+    if Image is None:
+        ext = os.path.splitext(names[0])[1].lower().lstrip('.')
+        return [('image/jpeg' if ext in ('jpg', 'jpeg') else f'image/{ext}', ext, original)]
+    img = ImageOps.fit(Image.open(io.BytesIO(original)).convert('RGB'), PORTRAIT_SIZE,
+                       Image.LANCZOS, centering=(0.5, 0.3))
+    variants = []
+    for fmt, mime, ext, opts in (('AVIF', 'image/avif', 'avif', {'quality': 50}),
+                                 ('WEBP', 'image/webp', 'webp', {'quality': 75, 'method': 6}),
+                                 ('JPEG', 'image/jpeg', 'jpg', {'quality': 80, 'optimize': True, 'progressive': True})):
+        if fmt == 'AVIF' and not features.check('avif'):
+            continue
+        buf = io.BytesIO()
+        img.save(buf, fmt, **opts)
+        variants.append((mime, ext, buf.getvalue()))
+    return variants
+
+
+# ═══════════════════════════════════════════════════════════
+# Self-containment check
+# ═══════════════════════════════════════════════════════════
+# Resources the page would still fetch from another origin at runtime
+THIRD_PARTY_RE = re.compile(r'<(?:script|link|img|source|iframe)\b[^>]*?\s(?:src|href|srcset)="(https?://[^"]+)"')
+
+
+def third_party_urls(page):
+    return sorted(set(THIRD_PARTY_RE.findall(page)))
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""Planet positions and retrograde stations for the chapter 7 geocentric/heliocentric comparison.
+
+Heliocentric positions come from Standish's Keplerian elements (JPL,
+"Approximate Positions of the Planets", valid 1800-2050, ~arcminutes for
+the inner planets), solved for every date at once. A station is where the
+geocentric ecliptic longitude stops and turns: the sign changes of its
+rate on a daily grid are refined by vectorized bisection, so the start and
+end of every retrograde loop are exact to well under a minute for the model.
+
+All functions take Julian Ephemeris Days as scalars or NumPy arrays and
+return angles in degrees, distances in AU.
+"""
+import numpy as np
+
+from ephemeris import centuries
+
+# a (AU), e, I, L, long. perihelion ϖ, long. ascending node Ω (deg) at J2000, then rates per century
+ELEMENTS = {
+    'mercury': ((0.38709927, 0.20563593, 7.00497902, 252.25032350, 77.45779628, 48.33076593),
+                (0.00000037, 0.00001906, -0.00594749, 149472.67411175, 0.16047689, -0.12534081)),
+    'venus': ((0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255),
+              (0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418)),
+    'earth': ((1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0),
+              (0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0)),
+    'mars': ((1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891),
+             (0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343)),
+    'jupiter': ((5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909),
+                (-0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106)),
+    'saturn': ((9.53667594, 0.05386179, 2.48599187, 49.95424423, 92.59887831, 113.66242448),
+               (-0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794)),
+}
+
+# What the page offers, innermost first
+PLANETS = [
+    {'key': 'mercury', 'name': '수성', 'nameEn': 'Mercury', 'color': '#b8a48c'},
+    {'key': 'venus', 'name': '금성', 'nameEn': 'Venus', 'color': '#e8c878'},
+    {'key': 'mars', 'name': '화성', 'nameEn': 'Mars', 'color': '#cc6644'},
+    {'key': 'jupiter', 'name': '목성', 'nameEn': 'Jupiter', 'color': '#d8a870'},
+    {'key': 'saturn', 'name': '토성', 'nameEn': 'Saturn', 'color': '#e0cc90'},
+]
+
+
+# ═══════════════════════════════════════════════════════════
+# Kernels
+# ═══════════════════════════════════════════════════════════
+def orbital_period(body):
+    """Sidereal period in days from the mean-longitude rate."""
+    return 360.0 * 36525.0 / ELEMENTS[body][1][3]
+
+
+def heliocentric(body, jde):
+    """Heliocentric ecliptic (x, y, z) in AU, J2000 ecliptic and equinox."""
+    T = centuries(jde)
+    a, e, I, L, varpi, Omega = (v0 + rate * T for v0, rate in zip(*ELEMENTS[body]))
+    M = np.radians(np.mod(L - varpi + 180.0, 360.0) - 180.0)
+    E = M + e * np.sin(M)
+    for _ in range(6):  # Newton on Kepler's equation; e < 0.21 converges to machine precision
+        E = E - (E - e * np.sin(E) - M) / (1 - e * np.cos(E))
+    xp, yp = a * (np.cos(E) - e), a * np.sqrt(1 - e * e) * np.sin(E)
+    w, O, I = np.radians(varpi - Omega), np.radians(Omega), np.radians(I)
+    cw, sw, cO, sO, cI, sI = np.cos(w), np.sin(w), np.cos(O), np.sin(O), np.cos(I), np.sin(I)
+    x = (cw * cO - sw * sO * cI) * xp + (-sw * cO - cw * sO * cI) * yp
+    y = (cw * sO + sw * cO * cI) * xp + (-sw * sO + cw * cO * cI) * yp
+    z = sw * sI * xp + cw * sI * yp
+    return x, y, z
+
+
+def orbit_shape(body, jde):
+    """[a (AU), e, ϖ (deg)] at jde: the orbit's ellipse in the ecliptic, Sun at a focus."""
+    T = centuries(jde)
+    a, e, _, _, varpi, _ = (v0 + rate * T for v0, rate in zip(*ELEMENTS[body]))
+    return [round(float(a), 6), round(float(e), 6), round(float(varpi), 4)]
+
+
+def geocentric_longitude(body, jde):
+    """Geometric geocentric ecliptic longitude, 0..360°."""
+    x, y, _ = heliocentric(body, jde)
+    ex, ey, _ = heliocentric('earth', jde)
+    return np.mod(np.degrees(np.arctan2(y - ey, x - ex)), 360.0)
+
+
+def longitude_rate(body, jde, h=0.01):
+    """d(geocentric longitude)/dt in degrees per day (central difference); negative while retrograde."""
+    jde = np.asarray(jde, dtype=float)
+    d = geocentric_longitude(body, jde + h) - geocentric_longitude(body, jde - h)
+    return (np.mod(d + 180.0, 360.0) - 180.0) / (2 * h)
+
+
+def stations(body, jd_start, days, iterations=40):
+    """Retrograde loops overlapping [jd_start, jd_start + days]: (start, end, arc °) rows.
+
+    The search runs a year beyond both ends so a loop in progress at either
+    edge keeps its true start/end.
+    """
+    t = jd_start + np.arange(-366.0, days + 367.0)
+    rate = longitude_rate(body, t)
+    i = np.flatnonzero(np.sign(rate[:-1]) != np.sign(rate[1:]))
+    lo, hi = t[i], t[i + 1]
+    up = rate[i] > 0  # prograde -> retrograde: a loop starts
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        same = (longitude_rate(body, mid) > 0) == up
+        lo, hi = np.where(same, mid, lo), np.where(same, hi, mid)
+    roots = (lo + hi) / 2
+    starts = roots[up]
+    ends = roots[~up]
+    ends = ends[ends > starts[0]] if len(starts) else ends
+    n = min(len(starts), len(ends))
+    starts, ends = starts[:n], ends[:n]
+    keep = (ends >= jd_start) & (starts <= jd_start + days)
+    starts, ends = starts[keep], ends[keep]
+    arc = np.mod(geocentric_longitude(body, starts) - geocentric_longitude(body, ends), 360.0)
+    return np.column_stack([starts, ends, arc])
+
+
+# ═══════════════════════════════════════════════════════════
+# Table for the page
+# ═══════════════════════════════════════════════════════════
+def retrograde_table(jd_start, days, step=2.0):
+    """SIM_DATA.planets: polar heliocentric tracks for Earth and PLANETS plus their retrograde stations.
+
+    lon/r are (bodies, samples) with bodies = ['earth'] + PLANETS keys; the
+    page interpolates in (longitude, radius), which follows the orbit even
+    for Mercury's 16° per 4-day step. stations[k] holds (start, end, arc)
+    rows flattened, as days since jd0. orbits[body] is (a, e, ϖ) at jd0, for
+    drawing each orbit as its ellipse (the inclination's foreshortening, under
+    1% for Mercury, is left out).
+    """
+    t = jd_start + np.arange(0.0, days + step / 2, step)
+    bodies = ['earth'] + [p['key'] for p in PLANETS]
+    lon, r = [], []
+    for body in bodies:
+        x, y, _ = heliocentric(body, t)
+        lon.append(np.degrees(np.arctan2(y, x)))
+        r.append(np.hypot(x, y))
+    return {
+        'jd0': float(jd_start), 'step': step,
+        'bodies': bodies,
+        'planets': [dict(p, a=ELEMENTS[p['key']][0][0], period=round(orbital_period(p['key']), 2)) for p in PLANETS],
+        'lon': np.mod(np.array(lon), 360.0).astype(np.float32),
+        'r': np.array(r).astype(np.float32),
+        'orbits': {body: orbit_shape(body, jd_start) for body in bodies},
+        'stations': {p['key']: (stations(p['key'], jd_start, days) - [jd_start, jd_start, 0]).ravel().astype(np.float32)
+                     for p in PLANETS},
+    }
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Per-stage build profiling for `build.py --profile`.
+
+Each stage records wall time, the bytes of new strings it produced (every
+html.replace() copies the whole page) and its peak traced Python memory.
+The report is plain JSON so release pipelines can diff it across commits.
+"""
+import json, os, platform, subprocess, sys, time, tracemalloc
+from contextlib import contextmanager
+
+REPORT_VERSION = 1
+
+
+class StageRecord:
+    __slots__ = ('name', 'seconds', 'bytes_copied', 'peak_bytes')
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.bytes_copied = 0
+        self.peak_bytes = 0
+
+    def copied(self, *values):
+        """Count the memory of freshly built strings/bytes; returns the first value for chaining."""
+        self.bytes_copied += sum(sys.getsizeof(v) for v in values)
+        return values[0] if values else None
+
+    def as_dict(self):
+        return {'name': self.name, 'seconds': round(self.seconds, 6),
+                'bytesCopied': self.bytes_copied, 'peakBytes': self.peak_bytes}
+
+
+class BuildProfile:
+    """Stage timer; when disabled every call is a cheap no-op so the build code need not branch."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.stages = []
+        self.started_at = time.strftime('%Y-%m-%dT%H:%M:%S%z')  # when the build began, for the report
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name):
+        rec = StageRecord(name)
+        if not self.enabled:
+            yield rec
+            return
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        try:
+            yield rec
+        finally:
+            rec.seconds = time.perf_counter() - t0
+            rec.peak_bytes = max(0, tracemalloc.get_traced_memory()[1] - base)
+            self.stages.append(rec)
+
+    def as_dict(self):
+        return {'stages': [s.as_dict() for s in self.stages],
+                'seconds': round(sum(s.seconds for s in self.stages), 6),
+                'bytesCopied': sum(s.bytes_copied for s in self.stages),
+                'peakBytes': max((s.peak_bytes for s in self.stages), default=0),
+                'maxRssBytes': max_rss()}
+
+
+def max_rss():
+    """Peak resident set size of this process in bytes (None where unavailable, e.g. Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def git_commit(cwd):
+    try:
+        out = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=cwd, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def write_report(path, shared, variants, total_seconds, jobs, cwd, started_at):
+    """Write the JSON report: the shared stages, each variant's stages, and run metadata.
+
+    started_at: BuildProfile.started_at of the build's main profile.
+    """
+    report = {
+        'version': REPORT_VERSION,
+        'commit': git_commit(cwd),
+        'startedAt': started_at,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'jobs': jobs,
+        'seconds': round(total_seconds, 6),
+        'shared': shared,
+        'variants': variants,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    return report
+
+
+def format_table(title, profile):
+    """Human-readable summary of one profile dict, slowest stages first."""
+    lines = [f'  {title}: {profile["seconds"]:.3f} s, {profile["bytesCopied"] / 1e6:.1f} MB copied, '
+             f'peak {profile["peakBytes"] / 1e6:.1f} MB traced']
+    for s in sorted(profile['stages'], key=lambda s: -s['seconds']):
+        lines.append(f'    {s["name"]:<24} {s["seconds"] * 1000:9.1f} ms {s["bytesCopied"] / 1e3:10.0f} kB'
+                     f' {s["peakBytes"] / 1e3:10.0f} kB peak')
+    return lines
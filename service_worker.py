@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Service worker for each built page: precached hashed assets, versioned by the build.
+
+build.py writes <dir>/sw.js next to every variant's index.html. It carries
+the precache manifest: index.html with its sha256 as the revision, and every
+assets/ file the AssetStage emitted (their names already hold their hash).
+The cache name is derived from that manifest, so a deploy that changes any
+file installs a new worker and a new cache; on install, hashed files an
+older cache already holds are copied instead of re-fetched, and on activate
+the older caches of the same scope are deleted. The page is then served
+from cache (fast on slow school networks, readable with none); a new
+deploy is downloaded in the background and shows on the following visit.
+
+Third-party files the page loads (the KaTeX CDN bundle, the Wikimedia
+portraits) are versioned by URL, so they go to a separate runtime cache,
+cache-first, which survives deploys. The og:image is only fetched by link
+previews, not by the page, so it is not cached.
+"""
+import hashlib, json
+from urllib.parse import urlsplit
+
+SW_NAME = 'sw.js'
+CACHE_PREFIX = 'celestial-mechanics'
+
+# Added at body-end. file:// pages (and --serve, which must always show the latest build) go without.
+REGISTER_JS = ("if ('serviceWorker' in navigator && /^https?:$/.test(location.protocol)) "
+               "addEventListener('load', () => navigator.serviceWorker.register('%s').catch(() => {}));" % SW_NAME)
+
+SW_JS = '''// Generated by build.py (service_worker.py) from the build's asset hashes; do not edit.
+const VERSION = %(version)s;
+const PRECACHE = %(precache)s;  // [url relative to the scope, revision or null when the name is hashed]
+const WARM = %(warm)s;          // third-party files of the page
+const ORIGINS = %(origins)s;
+const PREFIX = %(prefix)s;
+const SCOPE = self.registration.scope;
+const CACHE = `${PREFIX} ${SCOPE} ${VERSION}`;  // caches are per origin; variants share it
+const RUNTIME = `${PREFIX} runtime`;
+const INDEX = new URL('./', SCOPE).href;
+
+self.addEventListener('install', event => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(CACHE);
+    await Promise.all(PRECACHE.map(async ([url, revision]) => {
+      const key = new URL(url, SCOPE).href;
+      const hit = revision ? null : await caches.match(key);  // unchanged since an earlier build
+      const res = hit || await fetch(key, { cache: 'no-cache' });
+      if (!res.ok) throw new Error(`precache ${key}: ${res.status}`);
+      await cache.put(key, res);
+    }));
+    const runtime = await caches.open(RUNTIME);
+    await Promise.all(WARM.map(async url => {
+      try {
+        if (!await runtime.match(url)) await runtime.put(url, await fetch(url, { mode: 'no-cors' }));
+      } catch (e) { /* offline: cached on first use instead */ }
+    }));
+  })());
+});
+
+self.addEventListener('activate', event => {
+  event.waitUntil((async () => {
+    for (const name of await caches.keys()) {
+      const [prefix, scope] = name.split(' ');
+      if (prefix === PREFIX && scope === SCOPE && name !== CACHE) await caches.delete(name);
+    }
+    await self.clients.claim();
+  })());
+});
+
+self.addEventListener('fetch', event => {
+  const req = event.request;
+  if (req.method !== 'GET') return;
+  const url = new URL(req.url);
+  url.hash = '';
+  if (url.origin === self.location.origin) {
+    const key = req.mode === 'navigate' && (url.href === INDEX || url.href === INDEX + 'index.html') ? INDEX : url.href;
+    event.respondWith(caches.open(CACHE).then(c => c.match(key)).then(hit => hit || fetch(req)));
+  } else if (ORIGINS.includes(url.origin)) {
+    event.respondWith((async () => {
+      const runtime = await caches.open(RUNTIME);
+      const hit = await runtime.match(req);
+      if (hit) return hit;
+      const res = await fetch(req);
+      if (res.ok || res.type === 'opaque') event.waitUntil(runtime.put(req, res.clone()));
+      return res;
+    })());
+  }
+});
+'''
+
+
+def precache_entries(asset_files, page_sha256):
+    """[url, revision] pairs: the page (revision = its sha256) and every hashed asset (revision None)."""
+    return [['./', page_sha256[:16]]] + [[rel, None] for rel in sorted(asset_files)]
+
+
+def cache_version(entries, warm=()):
+    """Short hash of everything the worker caches; changes whenever any precached file does."""
+    return hashlib.sha256(json.dumps([entries, sorted(warm)]).encode('utf-8')).hexdigest()[:10]
+
+
+def render_sw(asset_files, page_sha256, third_party=()):
+    """(cache version, sw.js bytes) for one variant. third_party: absolute URLs the page loads."""
+    entries = precache_entries(asset_files, page_sha256)
+    warm = sorted(set(third_party))
+    origins = sorted({'{0.scheme}://{0.netloc}'.format(urlsplit(u)) for u in warm})
+    version = cache_version(entries, warm)
+    js = SW_JS % {k: json.dumps(v, ensure_ascii=False) for k, v in
+                  dict(version=version, precache=entries, warm=warm, origins=origins, prefix=CACHE_PREFIX).items()}
+    return version, js.encode('utf-8')
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Encode precomputed NumPy tables as the SIM_DATA global read by simulations.js."""
+import base64, json
+
+import numpy as np
+
+# NumPy dtype -> JS typed-array constructor (see simTable() in simulations.js)
+JS_TYPES = {
+    'float32': 'Float32Array', 'float64': 'Float64Array',
+    'int8': 'Int8Array', 'uint8': 'Uint8Array',
+    'int16': 'Int16Array', 'uint16': 'Uint16Array',
+    'int32': 'Int32Array', 'uint32': 'Uint32Array',
+}
+
+
+def encode_array(arr):
+    """Little-endian base64 payload plus dtype/shape, decodable into a JS typed array."""
+    arr = np.ascontiguousarray(arr)
+    name = arr.dtype.name
+    if name not in JS_TYPES:
+        raise TypeError(f'no typed-array equivalent for dtype {name}')
+    data = arr.astype(arr.dtype.newbyteorder('<'), copy=False).tobytes()
+    return {'$array': JS_TYPES[name], 'shape': list(arr.shape),
+            'data': base64.b64encode(data).decode('ascii')}
+
+
+def _encode(value):
+    if isinstance(value, np.ndarray):
+        return encode_array(value)
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def render_sim_data(tables):
+    """JS source defining SIM_DATA from a dict of tables (arrays may be nested anywhere)."""
+    payload = json.dumps(_encode(tables), ensure_ascii=False, separators=(',', ':'))
+    return f'const SIM_DATA = {payload};\n'
+
+
+def render_module_data(tables):
+    """JS source adding tables to SIM_DATA, for data only one simulation module reads."""
+    payload = json.dumps(_encode(tables), ensure_ascii=False, separators=(',', ':'))
+    return f'Object.assign(SIM_DATA, {payload});\n'
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Split simulations.js into the shared core and one lazily loaded script per simulation."""
+import json, re
+
+# A simulation is a top-level simModule('<canvasId>', function() { ... }); block
+MODULE_RE = re.compile(r"^simModule\('(\w+)', function\(\) \{\n.*?^\}\);\n", re.S | re.M)
+CANVAS_RE = re.compile(r'<canvas\s+id="(\w+)"')
+CANVAS_SIZE_RE = re.compile(r'<canvas\s+id="(\w+)"\s+width="(\d+)"\s+height="(\d+)"')
+# Everything above this banner in simulations.js is DOM-free and also runs in the render worker
+PRELUDE_END_RE = re.compile(r'^// ═+\n// Lazy simulation boot$', re.M)
+# A simulation's markup in the chapter HTML: <div class="sim-container"> ... </div> at column 0
+SIM_CONTAINER_RE = re.compile(r'^<div class="sim-container">\n.*?^</div>\n', re.S | re.M)
+
+
+def split_simulations(js):
+    """Return (core_js, {canvas_id: module_js}) with modules in source order."""
+    modules = {}
+
+    def take(m):
+        modules[m.group(1)] = m.group(0)
+        return ''
+    core = MODULE_RE.sub(take, js)
+    return core, modules
+
+
+def simulation_prelude(js):
+    """The helpers at the top of simulations.js (tables, trails) that the render worker shares."""
+    m = PRELUDE_END_RE.search(js)
+    if not m:
+        raise ValueError('simulations.js: no "Lazy simulation boot" section to end the prelude')
+    return js[:m.start()]
+
+
+def page_canvases(html):
+    """Canvas ids present in the chapter HTML."""
+    return set(CANVAS_RE.findall(html))
+
+
+def canvas_sizes(html):
+    """{canvas id: (width, height)} from the chapter HTML."""
+    return {cid: (int(w), int(h)) for cid, w, h in CANVAS_SIZE_RE.findall(html)}
+
+
+def module_urls_js(urls):
+    """The SIM_MODULE_URLS global read by the lazy boot code in simulations.js."""
+    return f'const SIM_MODULE_URLS = {json.dumps(urls, separators=(",", ":"))};\n'
+
+
+def sprites_js(url, rects, scale):
+    """The SIM_SPRITES global read by simSprite() in simulations.js; scale: atlas pixels per CSS pixel."""
+    info = {'url': url, 'layers': rects, 'scale': scale}
+    return f'const SIM_SPRITES = {json.dumps(info, separators=(",", ":"))};\n'
+
+
+def sim_workers_js(url, canvas_ids):
+    """The SIM_WORKERS global read by startSimWorker() in simulations.js."""
+    return f'const SIM_WORKERS = {json.dumps({"url": url, "sims": canvas_ids}, separators=(",", ":"))};\n'
+
+
+def perf_build_js(variant, input_hash):
+    """The SIM_PERF_BUILD global that instrument.js puts in its JSON export, to tell builds apart."""
+    info = {'variant': variant, 'inputs': input_hash[:10]}
+    return f'const SIM_PERF_BUILD = {json.dumps(info, separators=(",", ":"))};\n'
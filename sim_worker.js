@@ -0,0 +1,143 @@
+// ═══════════════════════════════════════════════════════════
+// Worker-side boot for simulations rendered off the main thread
+// ═══════════════════════════════════════════════════════════
+// build.py puts the prelude of simulations.js (tables, trails, helpers) in front
+// of this file as one worker script. startSimWorker() in simulations.js sends
+// 'init' with the canvas (an OffscreenCanvas), a snapshot of the elements that
+// have an id in the simulation's container, the page's SIM_DATA tables (still
+// encoded) and the URL of the simulation's ordinary module script, which is
+// then imported here unchanged. The module sees a small document:
+// getElementById() returns the canvas or a mirror element whose value/checked
+// come from the page and whose writes (textContent, innerHTML, ...) go back in
+// one message per task; createElement('canvas') makes an OffscreenCanvas.
+// Listeners it adds are announced to the page, which forwards those events.
+const SIM_DATA = {};
+const MIRRORED = ['textContent', 'innerHTML', 'value', 'checked', 'disabled', 'hidden', 'className'];
+const simElements = {};
+let simCanvas = null, simVisible = true, simParked = null, simInit = null;
+let simWrites = null;
+let simRect = null;           // the canvas's client rect at the last forwarded event
+
+function flushSimWrites() {
+  postMessage({ type: 'dom', writes: simWrites });
+  simWrites = null;
+}
+
+function simElement(id, props) {
+  const values = Object.assign({}, props);
+  const listeners = {};
+  const el = {
+    id, tagName: props.tagName, style: {}, dataset: {},
+    addEventListener(type, fn) {
+      if (!listeners[type]) {
+        listeners[type] = [];
+        postMessage({ type: 'listen', id, event: type });
+      }
+      listeners[type].push(fn);
+    },
+    removeEventListener(type, fn) {
+      if (listeners[type]) listeners[type] = listeners[type].filter(f => f !== fn);
+    },
+    // Runs the listeners on an event forwarded by the page; msg.state holds the element's value/checked
+    dispatch(msg) {
+      Object.assign(values, msg.state);
+      if (msg.rect) simRect = msg.rect;
+      const event = Object.assign({ type: msg.event, target: el, currentTarget: el, preventDefault() {}, stopPropagation() {} },
+                                  msg.detail);
+      (listeners[msg.event] || []).forEach(fn => fn.call(el, event));
+    },
+  };
+  MIRRORED.forEach(prop => Object.defineProperty(el, prop, {
+    get: () => values[prop],
+    set(v) {
+      values[prop] = v;
+      if (!simWrites) { simWrites = []; queueMicrotask(flushSimWrites); }
+      simWrites.push([id, prop, v]);
+    },
+  }));
+  return el;
+}
+
+self.document = {
+  getElementById: id => (simCanvas && id === simCanvas.id ? simCanvas : simElements[id] || null),
+  createElement: tag => (tag === 'canvas' ? new OffscreenCanvas(300, 150) : null),
+  querySelectorAll: () => [],
+  addEventListener() {},
+};
+
+// ── Boot helpers with the same contract as on the page ──
+function simModule(canvasId, init) {
+  simInit = init;
+}
+
+function simFrame(canvas, cb) {
+  if (simVisible) {
+    const timed = simTimed(canvas, cb);
+    return typeof requestAnimationFrame === 'function'
+      ? requestAnimationFrame(timed) : setTimeout(() => timed(performance.now()), 16);
+  }
+  simParked = cb;
+  return 0;
+}
+
+// Sprites: the atlas comes as an ImageBitmap (drawn at CSS size, as on the page); until then
+// the caller draws a plain background
+let simSpriteBitmap = null, simSpriteInfo = null;
+const simSpriteWaiters = [];
+function simSprite(ctx, name, redraw) {
+  const rect = simSpriteInfo ? simSpriteInfo.layers[name] : null;
+  if (!rect) return false;
+  if (!simSpriteBitmap) {
+    if (redraw && !simSpriteWaiters.includes(redraw)) simSpriteWaiters.push(redraw);
+    return false;
+  }
+  const [x, y, w, h] = rect;
+  ctx.drawImage(simSpriteBitmap, x, y, w, h, 0, 0, w / simSpriteInfo.scale, h / simSpriteInfo.scale);
+  return true;
+}
+
+function loadSimSprites(info) {
+  simSpriteInfo = info;
+  fetch(info.url).then(r => r.blob()).then(createImageBitmap).then(bitmap => {
+    simSpriteBitmap = bitmap;
+    simSpriteWaiters.splice(0).forEach(cb => cb());
+  }).catch(() => {});
+}
+
+// ── Messages from the page ──
+self.onmessage = ({ data }) => {
+  if (data.type === 'init') {
+    try {
+      for (const id in data.elements) simElements[id] = simElement(id, data.elements[id]);
+      // Canvas listeners (pointer input) go through a mirror too, so they are forwarded like the rest
+      const mirror = simElement(data.canvasId, { tagName: 'CANVAS' });
+      simElements[data.canvasId] = mirror;
+      simCanvas = data.canvas;
+      simRect = data.rect;
+      Object.assign(simCanvas, { id: data.canvasId, style: {}, dataset: {},
+                                 getBoundingClientRect: () => simRect,
+                                 addEventListener: mirror.addEventListener,
+                                 removeEventListener: mirror.removeEventListener });
+      Object.assign(SIM_DATA, data.tables);
+      if (data.sprites) loadSimSprites(data.sprites);
+      simVisible = data.visible;
+      self.devicePixelRatio = data.pixelRatio;  // for simSurface()
+      if (!simCanvas.getContext('2d')) throw new Error('no 2d context on OffscreenCanvas');
+      importScripts(data.moduleUrl);
+      simInit();
+      postMessage({ type: 'ready' });
+    } catch (e) {
+      postMessage({ type: 'failed', message: String(e) });
+    }
+  } else if (data.type === 'event') {
+    const el = simElements[data.id];
+    if (el) el.dispatch(data);
+  } else if (data.type === 'visible') {
+    simVisible = data.visible;
+    if (simVisible && simParked) {
+      const cb = simParked;
+      simParked = null;
+      simFrame(simCanvas, cb);
+    }
+  }
+};
@@ -7,14 +7,419 @@ const TAU = 2 * Math.PI;
 const DEG = Math.PI / 180;
 function lerp(a, b, t) { return a + (b - a) * t; }
 
+// ── Precomputed tables (SIM_DATA is emitted by build.py) ──
+const simTableCache = {};
+function decodeArrays(v) {
+  if (v && typeof v === 'object' && v.$array) {
+    const bin = atob(v.data);
+    const bytes = new Uint8Array(bin.length);
+    for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+    const arr = new globalThis[v.$array](bytes.buffer);
+    arr.shape = v.shape;
+    return arr;
+  }
+  if (Array.isArray(v)) return v.map(decodeArrays);
+  if (v && typeof v === 'object') {
+    const out = {};
+    for (const k in v) out[k] = decodeArrays(v[k]);
+    return out;
+  }
+  return v;
+}
+function simTable(name) {
+  if (!(name in simTableCache)) {
+    const raw = typeof SIM_DATA !== 'undefined' ? SIM_DATA[name] : undefined;
+    simTableCache[name] = raw === undefined ? null : decodeArrays(raw);
+  }
+  return simTableCache[name];
+}
+
+// Sun/Earth/Moon ephemeris (ephemeris.py), t = days since the table start.
+// Linear interpolation between daily samples; t wraps around the table span.
+function ephemerisAt(t) {
+  const eph = simTable('ephemeris');
+  const v = eph.values, nc = eph.channels.length, n = v.length / nc;
+  const span = (n - 1) * eph.step;
+  t = ((t % span) + span) % span;
+  const x = t / eph.step, i = Math.min(Math.floor(x), n - 2), f = x - i;
+  const a = i * nc, b = a + nc;
+  const earthLon = (lerp(v[a], v[b], f) % 360 + 360) % 360;
+  const moonLon = (lerp(v[a + 2], v[b + 2], f) % 360 + 360) % 360;
+  return {
+    jd: eph.jd0 + t,
+    earthLon, moonLon,
+    earthR: lerp(v[a + 1], v[b + 1], f),
+    moonLat: lerp(v[a + 3], v[b + 3], f),
+    moonDist: lerp(v[a + 4], v[b + 4], f),
+    elongation: ((moonLon - earthLon - 180) % 360 + 360) % 360, // 0 = new, 180 = full
+  };
+}
+
+// Chapter 4 solar geometry (irradiance.py): irradiance/air mass by noon elevation
+function elevationLookup(channel, elevDeg) {
+  if (elevDeg <= 0) return channel === 'airMass' ? Infinity : 0;
+  const e = simTable('irradiance').elevation, v = e[channel];
+  const x = Math.min(elevDeg, 90) / e.step, i = Math.min(Math.floor(x), v.length - 2);
+  return lerp(v[i], v[i + 1], x - i);
+}
+
+// Day length in hours, bilinear over the latitude-band x declination grid
+function dayLengthAt(lat, decl) {
+  const t = simTable('irradiance').dayLength, m = t.minutes;
+  const [nLat, nDecl] = m.shape;
+  const x = Math.max(0, Math.min((lat - t.lat0) / t.latStep, nLat - 1.001));
+  const y = Math.max(0, Math.min((decl - t.decl0) / t.declStep, nDecl - 1.001));
+  const i = Math.floor(x), j = Math.floor(y), fx = x - i, fy = y - j;
+  const a = m[i * nDecl + j], b = m[i * nDecl + j + 1];
+  const c = m[(i + 1) * nDecl + j], d = m[(i + 1) * nDecl + j + 1];
+  return lerp(lerp(a, b, fy), lerp(c, d, fy), fx) / 60;
+}
+
+// Calendar date (UTC) of a Julian Day: {year, month (1-12), day, dayOfYear (0-based)}
+function jdToDate(jd) {
+  const d = new Date((jd - 2440587.5) * 86400000);
+  const y = d.getUTCFullYear();
+  return { year: y, month: d.getUTCMonth() + 1, day: d.getUTCDate(),
+           dayOfYear: Math.floor((d - Date.UTC(y, 0, 1)) / 86400000) };
+}
+
+// ── Trails ──
+// A fixed-size ring of points in one Float32Array: push() overwrites the oldest
+// point once full, so a trail never allocates after creation. penUp() stores a
+// NaN break; stroke() draws the trail oldest to newest as a single path, also
+// lifting the pen across jumps of maxJump pixels or more in x; with keep < 1
+// only that fraction of the newest points.
+function simTrail(capacity) {
+  const xy = new Float32Array(capacity * 2);
+  let start = 0;
+  const trail = {
+    length: 0,
+    clear() { start = 0; trail.length = 0; },
+    push(x, y) {
+      const i = 2 * ((start + trail.length) % capacity);
+      xy[i] = x; xy[i + 1] = y;
+      if (trail.length < capacity) trail.length++;
+      else start = (start + 1) % capacity;
+    },
+    penUp() {
+      if (trail.length && !Number.isNaN(trail.x(-1))) trail.push(NaN, NaN);
+    },
+    // k-th point from the oldest; negative k counts back from the newest (-1 = newest)
+    x(k) { return xy[2 * ((start + (k < 0 ? trail.length + k : k)) % capacity)]; },
+    y(k) { return xy[2 * ((start + (k < 0 ? trail.length + k : k)) % capacity) + 1]; },
+    stroke(ctx, maxJump = Infinity, keep = 1) {
+      ctx.beginPath();
+      let penDown = false, px = 0;
+      const skip = trail.length - Math.ceil(trail.length * keep);
+      for (let k = skip, i = 2 * ((start + skip) % capacity); k < trail.length; k++, i = (i + 2) % xy.length) {
+        const x = xy[i], y = xy[i + 1];
+        if (Number.isNaN(x)) { penDown = false; continue; }
+        if (penDown && Math.abs(x - px) < maxJump) ctx.lineTo(x, y);
+        else { ctx.moveTo(x, y); penDown = true; }
+        px = x;
+      }
+      ctx.stroke();
+    },
+  };
+  return trail;
+}
+
+// ── Simulation clock ──
+// Animation loops advance simulated time in fixed steps of SIM_STEP_MS of real
+// time rather than once per displayed frame, so a simulation runs at the same
+// speed on 60 Hz and 120 Hz displays and on a slow laptop, and the work per
+// frame is bounded. tick(now) adds the time since the previous frame to an
+// accumulator and returns the whole steps now due, at most maxSteps: the rest
+// of a longer stall (a busy main thread, a parked loop) is dropped, not caught
+// up. alpha is the fraction of the next step already elapsed, for drawing
+// between the last two steps; dt is the frame's real duration in steps (capped
+// the same way). reset() forgets the previous frame, after a pause.
+const SIM_STEP_MS = 1000 / 60;  // the per-step increments were tuned as per-frame ones at 60 Hz
+function simClock(maxSteps = 6) {
+  let last = null, acc = 0;
+  const clock = {
+    alpha: 0,
+    dt: 1,
+    reset() { last = null; acc = 0; clock.alpha = 0; },
+    tick(now) {
+      if (typeof now !== 'number') now = performance.now();  // called directly, not from a frame
+      const elapsed = Math.min(last === null ? SIM_STEP_MS : Math.max(0, now - last), (maxSteps + 1) * SIM_STEP_MS);
+      last = now;
+      acc += elapsed;
+      const steps = Math.min(Math.floor(acc / SIM_STEP_MS), maxSteps);
+      acc = Math.min(acc - steps * SIM_STEP_MS, SIM_STEP_MS * 0.999);
+      clock.alpha = acc / SIM_STEP_MS;
+      clock.dt = elapsed / SIM_STEP_MS;
+      return steps;
+    },
+  };
+  return clock;
+}
+
+// ── Canvas resolution and adaptive quality ──
+// simSurface(canvas) sizes the canvas's backing store for the display's pixel
+// ratio and returns {ctx, W, H, scale, quality}: the module keeps drawing in the
+// CSS pixels of the width/height attributes (W, H) through a scaling transform.
+// simFrame() times the animation callbacks of a canvas that has a surface.
+// While frames come late and the callback does real work, the surface
+// drops a SIM_QUALITY level (fewer backing-store pixels; modules thin trails
+// by quality); after upWait ms of headroom it goes back up, waiting twice as
+// long after each drop so it does not flip between two levels. A surface made
+// with a lead (the other canvas of a pair) changes level with it. Resizing
+// clears the canvas; a module that keeps pixels between frames repaints them in
+// onresize().
+const SIM_QUALITY = [1, 0.75, 0.5];  // pixel ratio factor and detail fraction per level
+const SIM_MAX_RATIO = 2;             // past 2x, more pixels cost more than they show
+const simSurfaces = new WeakMap();   // canvas -> surface
+
+function simSurface(canvas, lead) {
+  const W = canvas.width, H = canvas.height;
+  const ratio = Math.min(typeof devicePixelRatio === 'number' ? devicePixelRatio : 1, SIM_MAX_RATIO);
+  if (canvas.style) canvas.style.width = W + 'px';  // displayed at the attributes' size at any resolution
+  let last = 0, frames = 0, calm = 0;
+  const surface = {
+    ctx: canvas.getContext('2d'), W, H, scale: 1, quality: 1, level: 0, next: 0,
+    cost: 0, interval: SIM_STEP_MS, upWait: 2000, followers: [], onresize: null,
+    resize(level) {
+      surface.level = surface.next = level;
+      surface.quality = SIM_QUALITY[level];
+      surface.scale = ratio * surface.quality;
+      canvas.width = Math.round(W * surface.scale);
+      canvas.height = Math.round(H * surface.scale);
+      surface.ctx.setTransform(canvas.width / W, 0, 0, canvas.height / H, 0, 0);
+      if (surface.onresize) surface.onresize();
+      surface.followers.forEach(f => f.resize(level));
+    },
+    // One timed frame: its callback took cost ms; smoothed, both against the frame budget
+    measure(now, cost) {
+      const gap = now - last;
+      last = now;
+      if (!(gap < 250)) return;  // first frame after a pause
+      surface.cost += (cost - surface.cost) * 0.1;
+      surface.interval += (gap - surface.interval) * 0.1;
+      if (++frames < 30) return;  // let a new level settle
+      // Late frames the callback has a real share in (it only sees the drawing calls, not the raster work)
+      if (surface.interval > 1.4 * SIM_STEP_MS && surface.cost > 0.1 * SIM_STEP_MS) {
+        calm = 0;
+        if (surface.level < SIM_QUALITY.length - 1) {
+          surface.next = surface.level + 1;
+          surface.upWait = Math.min(2 * surface.upWait, 60000);
+          frames = 0;
+        }
+      } else if (surface.level > 0 && (surface.interval < 1.2 * SIM_STEP_MS || surface.cost < 0.05 * SIM_STEP_MS)) {
+        calm += gap;
+        if (calm > surface.upWait) { surface.next = surface.level - 1; frames = calm = 0; }
+      } else {
+        calm = 0;
+      }
+    },
+  };
+  surface.resize(lead ? lead.level : 0);
+  if (lead) lead.followers.push(surface);
+  simSurfaces.set(canvas, surface);
+  return surface;
+}
+
+// The animation callback cb, timed for the canvas's surface if it has one. A
+// level change is applied just before a frame, which then redraws the canvas.
+function simTimed(canvas, cb) {
+  const surface = simSurfaces.get(canvas);
+  if (!surface) return cb;
+  return now => {
+    if (surface.next !== surface.level) surface.resize(surface.next);
+    const t0 = performance.now();
+    cb(now);
+    surface.measure(now, performance.now() - t0);
+  };
+}
+
+// ═══════════════════════════════════════════════════════════
+// Lazy simulation boot
+// ═══════════════════════════════════════════════════════════
+// Each simulation registers with simModule(canvasId, init); init() runs the first
+// time its .sim-container comes near the viewport. Animation loops call
+// simFrame(canvas, cb) instead of requestAnimationFrame so they park while the
+// container is off-screen and resume when it scrolls back. When build.py splits
+// the simulations into separate files, SIM_MODULE_URLS maps each canvas id to
+// the script that registers it, fetched on first approach (or handed to a
+// worker, see startSimWorker).
+const simSlots = new Map();  // .sim-container element -> {visible, init, started, parked, url, canvasId, worker}
+const simObserver = typeof IntersectionObserver === 'function'
+  ? new IntersectionObserver(onSimIntersect, { rootMargin: '200px 0px' }) : null;
+
+function simSlot(canvas) {
+  const container = canvas.closest('.sim-container') || canvas;
+  if (!simSlots.has(container)) {
+    simSlots.set(container, { visible: !simObserver, init: null, started: false, parked: null, url: null,
+                              canvasId: canvas.id, worker: null });
+    if (simObserver) simObserver.observe(container);
+  }
+  return simSlots.get(container);
+}
+
+function startSim(slot) {
+  if (slot.started || !slot.init) return;
+  slot.started = true;
+  slot.init();
+}
+
+function loadSimScript(slot) {
+  if (!slot.url) return;
+  const url = slot.url;
+  slot.url = null;
+  if (!startSimWorker(slot, url)) appendSimScript(url);
+}
+
+function appendSimScript(url) {
+  const script = document.createElement('script');
+  script.src = url;
+  document.body.appendChild(script);
+}
+
+function onSimIntersect(entries) {
+  entries.forEach(entry => {
+    const slot = simSlots.get(entry.target);
+    slot.visible = entry.isIntersecting;
+    if (slot.worker) slot.worker.postMessage({ type: 'visible', visible: slot.visible });
+    if (!slot.visible) return;
+    if (slot.init) startSim(slot); else loadSimScript(slot);
+    if (slot.parked) {
+      const cb = slot.parked;
+      slot.parked = null;
+      requestAnimationFrame(cb);
+    }
+  });
+}
+
+function simModule(canvasId, init) {
+  const canvas = document.getElementById(canvasId);
+  if (!canvas) return;
+  const slot = simSlot(canvas);
+  slot.init = init;
+  if (slot.visible) startSim(slot);
+}
+
+function simFrame(canvas, cb) {
+  const slot = simSlot(canvas);
+  if (slot.visible) return requestAnimationFrame(simTimed(canvas, cb));
+  slot.parked = cb;
+  return 0;
+}
+
+// ── Worker rendering (variants.json worker_sims) ──
+// SIM_WORKERS = {url, sims: [canvasId, ...]} lists the simulations this build
+// renders off the main thread. Their module script is
+// imported by a worker (sim_worker.js) that draws on the canvas transferred as
+// an OffscreenCanvas. The page mirrors the elements of the container to it,
+// forwards the events the module listens to and applies the text it writes,
+// so scrolling and the math typesetting never wait for a frame. Without
+// Worker/OffscreenCanvas, or when the worker fails to start, the canvas is
+// swapped for a fresh copy and the module script runs here as usual.
+const SIM_EVENT_FIELDS = ['offsetX', 'offsetY', 'clientX', 'clientY', 'button', 'buttons', 'deltaX', 'deltaY', 'key'];
+
+function startSimWorker(slot, url) {
+  const canvas = document.getElementById(slot.canvasId);
+  if (typeof SIM_WORKERS !== 'object' || !canvas || !SIM_WORKERS.sims.includes(canvas.id)) return false;
+  if (typeof Worker !== 'function' || typeof canvas.transferControlToOffscreen !== 'function') return false;
+  let worker;
+  try {
+    worker = new Worker(SIM_WORKERS.url);
+  } catch (e) {
+    return false;  // e.g. file:// pages
+  }
+  const container = canvas.closest('.sim-container') || canvas.parentElement;
+  const elements = {};
+  container.querySelectorAll('[id]').forEach(el => {
+    if (el === canvas) return;
+    elements[el.id] = { tagName: el.tagName, textContent: el.textContent, innerHTML: el.innerHTML, value: el.value,
+                        checked: el.checked, disabled: el.disabled, hidden: el.hidden, className: el.className };
+  });
+  const rectOf = el => { const r = el.getBoundingClientRect(); return { left: r.left, top: r.top, width: r.width, height: r.height }; };
+
+  let ready = false;
+  function fallBack() {
+    if (ready || !slot.worker) return;
+    worker.terminate();
+    slot.worker = null;
+    canvas.replaceWith(canvas.cloneNode(false));  // the transferred canvas cannot get a context here
+    appendSimScript(url);
+  }
+  worker.onerror = fallBack;
+  worker.onmessage = ({ data }) => {
+    if (data.type === 'dom') {
+      data.writes.forEach(([id, prop, value]) => { const el = document.getElementById(id); if (el) el[prop] = value; });
+    } else if (data.type === 'listen') {
+      const el = document.getElementById(data.id);
+      if (el) el.addEventListener(data.event, e => {
+        const detail = {};
+        SIM_EVENT_FIELDS.forEach(k => { if (k in e) detail[k] = e[k]; });
+        worker.postMessage({ type: 'event', id: data.id, event: data.event, detail,
+                             state: { value: el.value, checked: el.checked },
+                             rect: el === canvas ? rectOf(canvas) : null });
+      });
+    } else if (data.type === 'perf') {
+      if (typeof simPerf === 'object') simPerf.receive(data.sims);  // --instrument builds
+    } else if (data.type === 'ready') {
+      ready = true;
+    } else if (data.type === 'failed') {
+      fallBack();
+    }
+  };
+
+  canvas.style.width = canvas.width + 'px';  // the worker's simSurface() resizes the backing store
+  const offscreen = canvas.transferControlToOffscreen();
+  slot.worker = worker;
+  worker.postMessage({
+    type: 'init', canvasId: canvas.id, canvas: offscreen, elements, tables: SIM_DATA, rect: rectOf(canvas),
+    moduleUrl: new URL(url, document.baseURI).href, visible: slot.visible, pixelRatio: devicePixelRatio,
+    sprites: typeof SIM_SPRITES === 'object'
+      ? { url: new URL(SIM_SPRITES.url, document.baseURI).href, layers: SIM_SPRITES.layers, scale: SIM_SPRITES.scale }
+      : null,
+  }, [offscreen]);
+  return true;
+}
+
+// ── Prerendered backdrops (sprites.py) ──
+// simSprite(ctx, name, redraw) blits a static layer from the SIM_SPRITES atlas in
+// one drawImage and returns true. The atlas has SIM_SPRITES.scale pixels per CSS
+// pixel; the layer is drawn at the canvas' CSS size. Until the atlas has loaded it returns false (the
+// caller paints a plain background) and calls redraw() once it arrives.
+let simSpriteImage = null;
+const simSpriteWaiters = [];
+function simSprite(ctx, name, redraw) {
+  const rect = typeof SIM_SPRITES === 'object' ? SIM_SPRITES.layers[name] : null;
+  if (!rect || typeof Image !== 'function') return false;
+  if (!simSpriteImage) {
+    simSpriteImage = new Image();
+    simSpriteImage.onload = () => simSpriteWaiters.splice(0).forEach(cb => cb());
+    simSpriteImage.src = SIM_SPRITES.url;
+  }
+  if (!simSpriteImage.complete || !simSpriteImage.naturalWidth) {
+    if (redraw && !simSpriteWaiters.includes(redraw)) simSpriteWaiters.push(redraw);
+    return false;
+  }
+  const [x, y, w, h] = rect;
+  ctx.drawImage(simSpriteImage, x, y, w, h, 0, 0, w / SIM_SPRITES.scale, h / SIM_SPRITES.scale);
+  return true;
+}
+
+if (typeof SIM_MODULE_URLS === 'object') {
+  Object.entries(SIM_MODULE_URLS).forEach(([canvasId, url]) => {
+    const canvas = document.getElementById(canvasId);
+    if (!canvas) return;
+    const slot = simSlot(canvas);
+    slot.url = url;
+    if (slot.visible) loadSimScript(slot);
+  });
+}
+
 // ═══════════════════════════════════════════════════════════
 // 1. Gravitational Force Simulation
 // ═══════════════════════════════════════════════════════════
-(function() {
+simModule('gravityCanvas', function() {
   const canvas = document.getElementById('gravityCanvas');
   if (!canvas) return;
-  const ctx = canvas.getContext('2d');
-  const W = canvas.width, H = canvas.height;
+  const { ctx, W, H } = simSurface(canvas);
   const distSlider = document.getElementById('gravityDist');
   const massSlider = document.getElementById('gravityMass');
   const info = document.getElementById('gravityInfo');
@@ -25,16 +430,11 @@ function lerp(a, b, t) { return a + (b - a) * t; }
   function draw() {
     const distFactor = parseFloat(distSlider.value);
     const massFactor = parseFloat(massSlider.value);
-    ctx.clearRect(0, 0, W, H);
 
     // Background stars
-    ctx.fillStyle = '#0a0e27';
-    ctx.fillRect(0, 0, W, H);
-    for (let i = 0; i < 60; i++) {
-      ctx.fillStyle = `rgba(255,255,255,${0.2 + Math.random() * 0.5})`;
-      ctx.beginPath();
-      ctx.arc((i * 137.5) % W, (i * 97.3) % H, 0.5 + Math.random(), 0, TAU);
-      ctx.fill();
+    if (!simSprite(ctx, 'gravity', draw)) {
+      ctx.fillStyle = '#0a0e27';
+      ctx.fillRect(0, 0, W, H);
     }
 
     const cx = W / 2, cy = H / 2;
@@ -110,16 +510,16 @@ function lerp(a, b, t) { return a + (b - a) * t; }
   distSlider.addEventListener('input', draw);
   massSlider.addEventListener('input', draw);
   draw();
-})();
+});
 
 // ═══════════════════════════════════════════════════════════
 // 1b. Escape Velocity Simulation
 // ═══════════════════════════════════════════════════════════
-(function() {
+simModule('escapeCanvas', function() {
   const canvas = document.getElementById('escapeCanvas');
   if (!canvas) return;
-  const ctx = canvas.getContext('2d');
-  const W = canvas.width, H = canvas.height;
+  const surface = simSurface(canvas);
+  const { ctx, W, H } = surface;
   const velSlider = document.getElementById('escapeVelSlider');
   const velVal = document.getElementById('escapeVelVal');
   const launchBtn = document.getElementById('escapeLaunchBtn');
@@ -128,7 +528,6 @@ function lerp(a, b, t) { return a + (b - a) * t; }
 
   // Normalized units: Earth radius = 1, GM = 1
   // v_circular = 1, v_escape = sqrt(2) ≈ 1.414
-  const GM = 1;
   const Re = 1; // Earth radius in sim units
   const V_CIRC = 7.9;  // km/s (for display)
   const V_ESC = 11.2;  // km/s
@@ -136,26 +535,50 @@ function lerp(a, b, t) { return a + (b - a) * t; }
   const cx = W * 0.4, cy = H * 0.5;
   const scale = 45; // pixels per sim unit
   const earthPixR = Re * scale;
-  const dt = 0.005;
-  const maxSteps = 12000;
-  const trailMax = 4000;
 
-  let trail = [];
-  let sx, sy, svx, svy; // spacecraft state
+  // Every slider value's trajectory is precomputed (trajectories.py): the
+  // slider selects a path and the animation just plays it back
+  const atlas = simTable('escapeAtlas');
+  const CLOSED = atlas.fates.indexOf('closed');
+  const dt = atlas.dt;
+  const stepsPerTick = 8;  // atlas steps per clock step
+  const trailSteps = 4000;
+
+  let path = 0;       // atlas path index for the slider value
+  let stepCount = 0;  // integration steps since launch
   let running = false;
   let animId = null;
-  let stepCount = 0;
+  const clock = simClock();
+  const pos = { x: 0, y: 0 }, ahead = { x: 0, y: 0 }, behind = { x: 0, y: 0 };
+
+  function pathIndex(v) {
+    return Math.max(0, Math.min(atlas.steps.length - 1, Math.round((v - atlas.v0) / atlas.vStep)));
+  }
+
+  // Position of path i after s steps, linear between samples; closed orbits repeat
+  function pathPoint(i, s, out) {
+    const end = atlas.steps[i], o = atlas.offsets[i], n = atlas.offsets[i + 1] - o;
+    s = atlas.fate[i] === CLOSED ? ((s % end) + end) % end : Math.max(0, Math.min(s, end));
+    const k = Math.min(Math.floor(s / atlas.every), n - 2);
+    const s0 = k * atlas.every, s1 = Math.min(s0 + atlas.every, end);
+    const f = (s - s0) / (s1 - s0), xy = atlas.xy, a = 2 * (o + k);
+    out.x = lerp(xy[a], xy[a + 2], f) / atlas.scale;
+    out.y = lerp(xy[a + 1], xy[a + 3], f) / atlas.scale;
+    return out;
+  }
+
+  function finished() {
+    return stepCount >= atlas.maxSteps ||
+      (atlas.fate[path] !== CLOSED && stepCount >= atlas.steps[path]);
+  }
 
   function resetSim() {
     running = false;
     if (animId) { cancelAnimationFrame(animId); animId = null; }
-    trail = [];
     stepCount = 0;
     // Start above Earth surface (altitude ≈ 0.2 Re ≈ 1,270km), launch horizontally
-    const launchR = Re * 1.2;
-    sx = 0; sy = -launchR;
     const vNorm = parseFloat(velSlider.value);
-    svx = vNorm; svy = 0;
+    path = pathIndex(vNorm);
     drawFrame();
     updateInfo(vNorm);
   }
@@ -175,62 +598,13 @@ function lerp(a, b, t) { return a + (b - a) * t; }
       '<strong>v₂(탈출):</strong> ' + V_ESC + ' km/s';
   }
 
-  function step() {
-    // Velocity Verlet integration
-    const r2 = sx * sx + sy * sy;
-    const r = Math.sqrt(r2);
-    if (r < Re) { running = false; return; } // hit Earth surface
-    const a = -GM / r2;
-    const ax = a * sx / r;
-    const ay = a * sy / r;
-
-    // Half-step velocity
-    const hvx = svx + ax * dt * 0.5;
-    const hvy = svy + ay * dt * 0.5;
-    // Full-step position
-    sx += hvx * dt;
-    sy += hvy * dt;
-    // New acceleration
-    const nr2 = sx * sx + sy * sy;
-    const nr = Math.sqrt(nr2);
-    const na = -GM / nr2;
-    const nax = na * sx / nr;
-    const nay = na * sy / nr;
-    // Full-step velocity
-    svx = hvx + nax * dt * 0.5;
-    svy = hvy + nay * dt * 0.5;
-
-    trail.push({ x: sx, y: sy });
-    if (trail.length > trailMax) trail.shift();
-    stepCount++;
-
-    // Stop conditions
-    if (nr < Re && stepCount > 5) { running = false; return; } // impact on surface
-    if (nr > 12) { running = false; return; } // escaped
-    if (stepCount > maxSteps) { running = false; return; }
-  }
-
-  function drawFrame() {
-    ctx.clearRect(0, 0, W, H);
-    ctx.fillStyle = '#0a0e27';
-    ctx.fillRect(0, 0, W, H);
-
-    // Stars
-    for (let i = 0; i < 50; i++) {
-      ctx.fillStyle = `rgba(255,255,255,${0.15 + Math.random() * 0.3})`;
-      ctx.beginPath();
-      ctx.arc((i * 137.5) % W, (i * 97.3) % H, 0.4 + Math.random() * 0.5, 0, TAU);
-      ctx.fill();
-    }
-
-    // Orbit reference circles
-    ctx.strokeStyle = 'rgba(100,150,255,0.1)';
-    ctx.lineWidth = 1;
-    ctx.setLineDash([3, 5]);
-    for (let r = 2; r <= 6; r += 2) {
-      ctx.beginPath(); ctx.arc(cx, cy, r * scale, 0, TAU); ctx.stroke();
+  // steps: how far along the path to draw (between clock steps while running)
+  function drawFrame(steps = stepCount) {
+    // Stars, orbit reference circles (2, 4, 6 Re) and the speed colour bar
+    if (!simSprite(ctx, 'escape', drawFrame)) {
+      ctx.fillStyle = '#0a0e27';
+      ctx.fillRect(0, 0, W, H);
     }
-    ctx.setLineDash([]);
 
     // Earth
     const eGrad = ctx.createRadialGradient(cx - earthPixR * 0.2, cy - earthPixR * 0.2, earthPixR * 0.1, cx, cy, earthPixR);
@@ -249,29 +623,37 @@ function lerp(a, b, t) { return a + (b - a) * t; }
     ctx.textAlign = 'center';
     ctx.fillText('지구', cx, cy + earthPixR + 14);
 
-    // Trail
-    if (trail.length > 1) {
-      for (let i = 1; i < trail.length; i++) {
-        const alpha = 0.15 + 0.85 * (i / trail.length);
-        const speed = i < trail.length - 1 ?
-          Math.sqrt((trail[i].x - trail[i-1].x)**2 + (trail[i].y - trail[i-1].y)**2) / dt : 0;
-        // Color by speed: slow=blue, fast=red
-        const t = Math.min(speed / 2, 1);
-        const r = Math.floor(80 + 175 * t);
-        const g = Math.floor(180 - 80 * t);
-        const b = Math.floor(255 - 200 * t);
-        ctx.strokeStyle = `rgba(${r},${g},${b},${alpha})`;
-        ctx.lineWidth = 1.5;
-        ctx.beginPath();
-        ctx.moveTo(cx + trail[i-1].x * scale, cy + trail[i-1].y * scale);
-        ctx.lineTo(cx + trail[i].x * scale, cy + trail[i].y * scale);
-        ctx.stroke();
-      }
+    // Trail: the last trailSteps of the path (fewer at lower quality), one segment per atlas sample
+    const trailStart = Math.max(0, steps - trailSteps * surface.quality);
+    const first = Math.floor(trailStart / atlas.every);
+    const segments = Math.ceil(steps / atlas.every) - first;
+    pathPoint(path, trailStart, behind);
+    for (let j = 1; j <= segments; j++) {
+      const s = Math.min((first + j) * atlas.every, steps);
+      const prevX = behind.x, prevY = behind.y;
+      pathPoint(path, s, behind);
+      const alpha = 0.15 + 0.85 * (j / segments);
+      const speed = Math.sqrt((behind.x - prevX) ** 2 + (behind.y - prevY) ** 2) / (dt * atlas.every);
+      // Color by speed: slow=blue, fast=red
+      const t = Math.min(speed / 2, 1);
+      const r = Math.floor(80 + 175 * t);
+      const g = Math.floor(180 - 80 * t);
+      const b = Math.floor(255 - 200 * t);
+      ctx.strokeStyle = `rgba(${r},${g},${b},${alpha})`;
+      ctx.lineWidth = 1.5;
+      ctx.beginPath();
+      ctx.moveTo(cx + prevX * scale, cy + prevY * scale);
+      ctx.lineTo(cx + behind.x * scale, cy + behind.y * scale);
+      ctx.stroke();
     }
 
-    // Spacecraft
-    const spx = cx + sx * scale;
-    const spy = cy + sy * scale;
+    // Spacecraft; velocity direction from the path around it
+    pathPoint(path, steps, pos);
+    pathPoint(path, steps + 1, ahead);
+    pathPoint(path, steps - 1, behind);
+    const svx = ahead.x - behind.x, svy = ahead.y - behind.y;
+    const spx = cx + pos.x * scale;
+    const spy = cy + pos.y * scale;
     if (spx > -20 && spx < W + 20 && spy > -20 && spy < H + 20) {
       // Glow
       const sGrad = ctx.createRadialGradient(spx, spy, 1, spx, spy, 10);
@@ -318,27 +700,19 @@ function lerp(a, b, t) { return a + (b - a) * t; }
     ctx.font = '10px sans-serif';
     ctx.fillText('궤적 색상: ', infoX, H - 30);
     const legY = H - 18;
-    for (let i = 0; i < 60; i++) {
-      const t = i / 59;
-      const r = Math.floor(80 + 175 * t);
-      const g = Math.floor(180 - 80 * t);
-      const b = Math.floor(255 - 200 * t);
-      ctx.fillStyle = `rgb(${r},${g},${b})`;
-      ctx.fillRect(infoX + i * 1.5, legY, 1.5, 8);
-    }
-    ctx.fillStyle = 'rgba(150,180,220,0.5)';
     ctx.fillText('느림', infoX - 2, legY + 7);
     ctx.fillText('빠름', infoX + 95, legY + 7);
   }
 
-  function animate() {
+  function animate(now) {
     if (!running) return;
-    for (let i = 0; i < 8; i++) { // multiple steps per frame
-      step();
-      if (!running) break;
+    stepCount = Math.min(stepCount + stepsPerTick * clock.tick(now), atlas.maxSteps);
+    if (finished()) {
+      running = false;
+      if (atlas.fate[path] !== CLOSED) stepCount = Math.min(stepCount, atlas.steps[path]);
     }
-    drawFrame();
-    if (running) animId = requestAnimationFrame(animate);
+    drawFrame(running ? Math.max(0, stepCount - stepsPerTick * (1 - clock.alpha)) : stepCount);
+    if (running) animId = simFrame(canvas, animate);
   }
 
   velSlider.addEventListener('input', function() {
@@ -351,89 +725,101 @@ function lerp(a, b, t) { return a + (b - a) * t; }
   launchBtn.addEventListener('click', function() {
     resetSim();
     running = true;
+    clock.reset();
     animate();
   });
 
   resetBtn.addEventListener('click', resetSim);
 
   resetSim();
-})();
+});
 
 // ═══════════════════════════════════════════════════════════
 // 2. Orbital Motion Simulation (Sun-Earth-Moon)
 // ═══════════════════════════════════════════════════════════
-(function() {
+simModule('orbitalCanvas', function() {
   const canvas = document.getElementById('orbitalCanvas');
   if (!canvas) return;
-  const ctx = canvas.getContext('2d');
-  const W = canvas.width, H = canvas.height;
+  const surface = simSurface(canvas);
+  const { ctx, W, H } = surface;
   const cx = W / 2, cy = H / 2;
 
   const playBtn = document.getElementById('orbitalPlayPause');
   const speedSlider = document.getElementById('orbitalSpeed');
   const info = document.getElementById('orbitalInfo');
 
-  let running = true, time = 0;
+  let running = true, time = 0; // days since the ephemeris table start
   const earthOrbitR = 180, moonOrbitR = 32;
-  const earthPeriod = 365.25, moonPeriod = 27.32;
-  let trail = [];
+  const MOON_MEAN_DIST = 384400; // km
+  const trail = simTrail(600);  // one point per clock step
+  const clock = simClock();
 
   playBtn.addEventListener('click', () => {
     running = !running;
     playBtn.textContent = running ? '⏸ 일시정지' : '▶ 재생';
-    if (running) animate();
+    if (running) { clock.reset(); animate(); }
   });
 
-  function animate() {
+  // Night sky and stars: on the first frames, and again after a resize clears the canvas
+  function drawSky() {
+    ctx.fillStyle = '#0a0e27'; ctx.fillRect(0, 0, W, H);
+    for (let i = 0; i < 80; i++) {
+      ctx.fillStyle = `rgba(255,255,255,${0.2 + Math.random() * 0.4})`;
+      ctx.beginPath();
+      ctx.arc((i * 137.5 + 33) % W, (i * 97.3 + 17) % H, 0.5 + Math.random() * 0.5, 0, TAU);
+      ctx.fill();
+    }
+  }
+  surface.onresize = drawSky;
+
+  // Earth position from the precomputed ephemeris (true ellipse, Meeus)
+  const at = { eph: null, earthX: 0, earthY: 0 };
+  function earthAt(t) {
+    const eph = ephemerisAt(t);
+    const earthAngle = eph.earthLon * DEG;
+    const earthR = earthOrbitR * eph.earthR;
+    at.eph = eph;
+    at.earthX = cx + earthR * Math.cos(earthAngle);
+    at.earthY = cy - earthR * Math.sin(earthAngle);
+    return at;
+  }
+
+  function animate(now) {
     if (!running) return;
-    const speed = parseFloat(speedSlider.value);
-    time += speed;
+    const speed = parseFloat(speedSlider.value); // days per clock step
+    for (let n = clock.tick(now); n > 0; n--) {
+      time += speed;
+      earthAt(time);
+      trail.push(at.earthX, at.earthY);
+    }
+    const shown = time - speed * (1 - clock.alpha); // between the last two steps
 
-    ctx.fillStyle = 'rgba(10,14,39,0.15)';
+    // Motion blur: the same fade per unit of time at any frame rate
+    ctx.fillStyle = `rgba(10,14,39,${1 - Math.pow(0.85, clock.dt)})`;
     ctx.fillRect(0, 0, W, H);
 
-    // Stars (only on first frame or when cleared)
-    if (time < speed * 2) {
-      ctx.fillStyle = '#0a0e27'; ctx.fillRect(0, 0, W, H);
-      for (let i = 0; i < 80; i++) {
-        ctx.fillStyle = `rgba(255,255,255,${0.2 + Math.random() * 0.4})`;
-        ctx.beginPath();
-        ctx.arc((i * 137.5 + 33) % W, (i * 97.3 + 17) % H, 0.5 + Math.random() * 0.5, 0, TAU);
-        ctx.fill();
-      }
-    }
+    if (time < speed * 2) drawSky();
 
     // Orbit paths
     ctx.strokeStyle = 'rgba(100,150,255,0.15)'; ctx.lineWidth = 1;
     ctx.beginPath(); ctx.arc(cx, cy, earthOrbitR, 0, TAU); ctx.stroke();
 
-    // Earth position (elliptical approximation e=0.0167)
-    const earthAngle = TAU * time / earthPeriod;
-    const e = 0.0167;
-    const earthR = earthOrbitR * (1 - e * e) / (1 + e * Math.cos(earthAngle));
-    const earthX = cx + earthR * Math.cos(earthAngle);
-    const earthY = cy - earthR * Math.sin(earthAngle);
+    const { eph, earthX, earthY } = earthAt(shown);
 
     // Moon orbit path
     ctx.strokeStyle = 'rgba(200,200,200,0.12)'; ctx.lineWidth = 0.5;
     ctx.beginPath(); ctx.arc(earthX, earthY, moonOrbitR, 0, TAU); ctx.stroke();
 
     // Moon position (CCW as seen from North Pole)
-    const moonAngle = TAU * time / moonPeriod;
-    const moonX = earthX + moonOrbitR * Math.cos(moonAngle);
-    const moonY = earthY - moonOrbitR * Math.sin(moonAngle);
+    const moonAngle = eph.moonLon * DEG;
+    const moonR = moonOrbitR * eph.moonDist / MOON_MEAN_DIST;
+    const moonX = earthX + moonR * Math.cos(moonAngle);
+    const moonY = earthY - moonR * Math.sin(moonAngle);
 
     // Earth trail
-    trail.push({ x: earthX, y: earthY });
-    if (trail.length > 600) trail.shift();
     if (trail.length > 2) {
       ctx.strokeStyle = 'rgba(68,136,204,0.3)'; ctx.lineWidth = 1;
-      ctx.beginPath(); ctx.moveTo(trail[0].x, trail[0].y);
-      for (let i = 1; i < trail.length; i++) {
-        if (Math.abs(trail[i].x - trail[i-1].x) < 50) ctx.lineTo(trail[i].x, trail[i].y);
-        else ctx.moveTo(trail[i].x, trail[i].y);
-      }
-      ctx.stroke();
+      trail.stroke(ctx, 50, surface.quality);
     }
 
     // Sun
@@ -472,92 +858,37 @@ function lerp(a, b, t) { return a + (b - a) * t; }
     ctx.fillText('달', moonX, moonY + 10);
 
     // Date display
-    const dayOfYear = Math.floor(time % earthPeriod);
-    const months = ['1월','2월','3월','4월','5월','6월','7월','8월','9월','10월','11월','12월'];
-    const monthDays = [31,28,31,30,31,30,31,31,30,31,30,31];
-    let d = dayOfYear, m = 0;
-    while (m < 11 && d >= monthDays[m]) { d -= monthDays[m]; m++; }
+    const date = jdToDate(eph.jd);
     ctx.fillStyle = '#7ec8e3'; ctx.font = '12px monospace'; ctx.textAlign = 'left';
-    ctx.fillText(`${months[m]} ${d+1}일 (${dayOfYear}일차)`, 10, 20);
+    ctx.fillText(`${date.year}년 ${date.month}월 ${date.day}일 (${date.dayOfYear}일차)`, 10, 20);
 
-    if (info) info.textContent = `경과: ${dayOfYear}일 | 지구 공전각: ${(earthAngle * 180 / Math.PI % 360).toFixed(1)}° | 달 위상각: ${(moonAngle * 180 / Math.PI % 360).toFixed(1)}°`;
+    if (info) info.textContent = `경과: ${Math.floor(shown)}일 | 지구 공전각: ${eph.earthLon.toFixed(1)}° | 달 위상각: ${eph.elongation.toFixed(1)}° | 지구-달 거리: ${Math.round(eph.moonDist).toLocaleString()} km`;
 
-    requestAnimationFrame(animate);
+    simFrame(canvas, animate);
   }
 
   // Initial stars
   ctx.fillStyle = '#0a0e27'; ctx.fillRect(0, 0, W, H);
   animate();
-})();
+});
 
 // ═══════════════════════════════════════════════════════════
 // 3. Solar Irradiance Simulation (Seoul / Jakarta / London)
 // ═══════════════════════════════════════════════════════════
-(function() {
+simModule('irradianceCanvas', function() {
   const canvas = document.getElementById('irradianceCanvas');
   if (!canvas) return;
-  const ctx = canvas.getContext('2d');
-  const W = canvas.width, H = canvas.height;
+  const { ctx, W, H } = simSurface(canvas);
   const daySlider = document.getElementById('daySlider');
   const info = document.getElementById('irradianceInfo');
 
-  const S0 = 1361; // solar constant W/m²
   const tilt = 23.44 * DEG;
 
-  // City data: latitude, color, monthly weather clearness factor (Jan-Dec)
-  // Based on typical monthly sunshine hours / possible sunshine hours
-  const cities = [
-    { name: '서울',    nameEn: 'Seoul',   lat: 37.5, color: '#ffaa44', colorDim: 'rgba(255,170,68,0.35)',
-      weather: [0.52, 0.53, 0.50, 0.48, 0.49, 0.36, 0.28, 0.32, 0.44, 0.53, 0.50, 0.52],
-      note: '장마·태풍(6-9월)' },
-    { name: '자카르타', nameEn: 'Jakarta', lat: -6.2, color: '#ff5566', colorDim: 'rgba(255,85,102,0.35)',
-      weather: [0.38, 0.38, 0.42, 0.48, 0.52, 0.55, 0.58, 0.60, 0.56, 0.48, 0.40, 0.36],
-      note: '우기(11-3월)' },
-    { name: '런던',    nameEn: 'London',  lat: 51.5, color: '#44aaff', colorDim: 'rgba(68,170,255,0.35)',
-      weather: [0.22, 0.28, 0.33, 0.38, 0.40, 0.42, 0.42, 0.40, 0.36, 0.28, 0.22, 0.18],
-      note: '연중 흐림' },
-  ];
-
-  function solarDeclination(day) {
-    return tilt * Math.sin(TAU / 365 * (day - 81));
-  }
-
-  function maxElevation(day, latDeg) {
-    const latR = latDeg * DEG;
-    const dec = solarDeclination(day);
-    return Math.asin(Math.sin(latR) * Math.sin(dec) + Math.cos(latR) * Math.cos(dec));
-  }
-
-  function dayLength(day, latDeg) {
-    const latR = latDeg * DEG;
-    const dec = solarDeclination(day);
-    const cosHA = -Math.tan(latR) * Math.tan(dec);
-    if (cosHA < -1) return 24;
-    if (cosHA > 1) return 0;
-    return 2 * Math.acos(cosHA) / TAU * 24;
-  }
-
-  function clearSkyIrradiance(day, latDeg) {
-    const elev = maxElevation(day, latDeg);
-    if (elev <= 0) return 0;
-    const AM = 1 / Math.sin(elev);
-    const transmission = Math.pow(0.7, Math.pow(AM, 0.678));
-    return S0 * Math.sin(elev) * transmission;
-  }
-
-  function weatherFactor(day, weatherArr) {
-    // Interpolate monthly weather factor to daily
-    const monthDays = [31,28,31,30,31,30,31,31,30,31,30,31];
-    let d = day, m = 0;
-    while (m < 11 && d >= monthDays[m]) { d -= monthDays[m]; m++; }
-    const frac = d / monthDays[m];
-    const next = (m + 1) % 12;
-    return weatherArr[m] * (1 - frac) + weatherArr[next] * frac;
-  }
-
-  function actualIrradiance(day, city) {
-    return clearSkyIrradiance(day, city.lat) * weatherFactor(day, city.weather);
-  }
+  // Per-city daily table from irradiance.py: dayLength, clearSky, actual (weather-weighted)
+  const sun = simTable('irradiance');
+  const cities = sun.cities;
+  const NC = sun.channels.length, CLEAR = 1, ACTUAL = 2;
+  function cityValue(ci, day, ch) { return sun.values[(ci * 365 + day) * NC + ch]; }
 
   function draw() {
     const currentDay = parseInt(daySlider.value);
@@ -603,7 +934,7 @@ function lerp(a, b, t) { return a + (b - a) * t; }
     ctx.lineTo(ex + 10 * Math.sin(tilt), ey + 10 * Math.cos(tilt));
     ctx.stroke();
 
-    // ── Right: Irradiance chart (3 cities) ──
+    // ── Right: Irradiance chart (per city) ──
     const rX = W * 0.36, rW = W * 0.61, rY = 14, rH = H - 40;
     const chartL = rX + 38, chartR = rX + rW - 6;
     const chartT = rY + 6, chartB = rY + rH - 24;
@@ -654,7 +985,7 @@ function lerp(a, b, t) { return a + (b - a) * t; }
       ctx.beginPath();
       for (let d = 0; d < 365; d++) {
         const x = chartL + d / 365 * chartW;
-        const y = chartB - clearSkyIrradiance(d, city.lat) / 1000 * chartH;
+        const y = chartB - cityValue(ci, d, CLEAR) / 1000 * chartH;
         d === 0 ? ctx.moveTo(x, y) : ctx.lineTo(x, y);
       }
       ctx.stroke();
@@ -665,7 +996,7 @@ function lerp(a, b, t) { return a + (b - a) * t; }
       ctx.beginPath();
       for (let d = 0; d < 365; d++) {
         const x = chartL + d / 365 * chartW;
-        const y = chartB - actualIrradiance(d, city) / 1000 * chartH;
+        const y = chartB - cityValue(ci, d, ACTUAL) / 1000 * chartH;
         d === 0 ? ctx.moveTo(x, y) : ctx.lineTo(x, y);
       }
       ctx.stroke();
@@ -679,8 +1010,8 @@ function lerp(a, b, t) { return a + (b - a) * t; }
     ctx.setLineDash([]);
 
     // Current day dots for each city
-    cities.forEach(city => {
-      const irr = actualIrradiance(currentDay, city);
+    cities.forEach((city, ci) => {
+      const irr = cityValue(ci, currentDay, ACTUAL);
       const y = chartB - irr / 1000 * chartH;
       ctx.fillStyle = city.color;
       ctx.beginPath(); ctx.arc(cdX, y, 3.5, 0, TAU); ctx.fill();
@@ -703,7 +1034,7 @@ function lerp(a, b, t) { return a + (b - a) * t; }
       ctx.fillText(`${city.name} (${city.lat > 0 ? city.lat+'°N' : Math.abs(city.lat)+'°S'})`, legX + 32, y + 7);
     });
     ctx.fillStyle = '#667'; ctx.font = '8px Noto Sans KR';
-    ctx.fillText('실선=실질 / 점선=이론', legX, legY + 48);
+    ctx.fillText('실선=실질 / 점선=이론', legX, legY + cities.length * 14 + 6);
 
     // Info
     const months2 = ['1월','2월','3월','4월','5월','6월','7월','8월','9월','10월','11월','12월'];
@@ -711,35 +1042,35 @@ function lerp(a, b, t) { return a + (b - a) * t; }
     let dd = currentDay, mm = 0;
     while (mm < 11 && dd >= monthDays2[mm]) { dd -= monthDays2[mm]; mm++; }
 
-    const seoulClear = clearSkyIrradiance(currentDay, 37.5);
-    const seoulActual = actualIrradiance(currentDay, cities[0]);
-    const jakartaActual = actualIrradiance(currentDay, cities[1]);
-    const londonActual = actualIrradiance(currentDay, cities[2]);
-
-    if (info) info.textContent = `${months2[mm]} ${dd+1}일 | 서울: ${seoulActual.toFixed(0)} W/m² (이론 ${seoulClear.toFixed(0)}) | 자카르타: ${jakartaActual.toFixed(0)} | 런던: ${londonActual.toFixed(0)}`;
+    const parts = cities.map((city, ci) => {
+      const actual = cityValue(ci, currentDay, ACTUAL).toFixed(0);
+      return ci === 0 ? `${city.name}: ${actual} W/m² (이론 ${cityValue(ci, currentDay, CLEAR).toFixed(0)})`
+                      : `${city.name}: ${actual}`;
+    });
+    if (info) info.textContent = `${months2[mm]} ${dd+1}일 | ` + parts.join(' | ');
   }
 
   daySlider.addEventListener('input', draw);
   draw();
-})();
+});
 
 // ═══════════════════════════════════════════════════════════
 // 4. Lunar Phase Simulation
 // ═══════════════════════════════════════════════════════════
-(function() {
+simModule('lunarCanvas', function() {
   const canvas = document.getElementById('lunarCanvas');
   if (!canvas) return;
-  const ctx = canvas.getContext('2d');
-  const W = canvas.width, H = canvas.height;
+  const { ctx, W, H } = simSurface(canvas);
   const daySlider = document.getElementById('lunarDay');
   const info = document.getElementById('lunarInfo');
 
-  const synodicPeriod = 29.53;
   const phaseNames = ['삭 (신월)', '초승달', '상현달', '상현망간', '망 (보름달)', '하현망간', '하현달', '그믐달'];
 
   function draw() {
     const day = parseFloat(daySlider.value);
-    const phase = (day % synodicPeriod) / synodicPeriod; // 0-1
+    // Real lunation from the ephemeris, starting at the first new moon in the table
+    const eph = ephemerisAt(simTable('ephemeris').newMoon + day);
+    const phase = eph.elongation / 360; // 0-1
     ctx.clearRect(0, 0, W, H);
     ctx.fillStyle = '#0a0e27'; ctx.fillRect(0, 0, W, H);
 
@@ -868,7 +1199,7 @@ function lerp(a, b, t) { return a + (b - a) * t; }
     ctx.fillText(phaseNames[phaseIdx], moonViewX, moonViewY + moonViewR + 24);
 
     // Illumination percentage
-    const illumPct = phase <= 0.5 ? phase * 2 * 100 : (1 - (phase - 0.5) * 2) * 100;
+    const illumPct = (1 - Math.cos(eph.elongation * DEG)) / 2 * 100;
     ctx.fillStyle = '#aab'; ctx.font = '11px monospace';
     ctx.fillText(`${illumPct.toFixed(0)}% 조명`, moonViewX, moonViewY + moonViewR + 42);
 
@@ -881,19 +1212,79 @@ function lerp(a, b, t) { return a + (b - a) * t; }
 
   daySlider.addEventListener('input', draw);
   draw();
-})();
+});
 
 // ═══════════════════════════════════════════════════════════
 // 5. Eclipse Simulation
 // ═══════════════════════════════════════════════════════════
-(function() {
+simModule('eclipseCanvas', function() {
   const canvas = document.getElementById('eclipseCanvas');
   if (!canvas) return;
-  const ctx = canvas.getContext('2d');
-  const W = canvas.width, H = canvas.height;
+  const { ctx, W, H } = simSurface(canvas);
   const typeSelect = document.getElementById('eclipseType');
   const inclSlider = document.getElementById('eclipseIncl');
   const info = document.getElementById('eclipseInfo');
+  // Mean shadow radii where each shadow falls, in radii of the body casting it (besselian.py)
+  const cones = simTable('eclipseCones');
+
+  // A shadow cone leaving a body of radius r0 at x0 with halfWidth(x1) = ratio * r0 at x1.
+  // Past the apex (ratio < 0 beyond x1) the edges cross, so the fill is the umbra plus the antumbra.
+  function coneHalfWidth(x0, r0, x1, ratio, x) {
+    return r0 * (1 + (ratio - 1) * (x - x0) / (x1 - x0));
+  }
+
+  function fillCone(x0, y0, r0, x1, ratio, xEnd, axisAt, style) {
+    const w = coneHalfWidth(x0, r0, x1, ratio, xEnd), yEnd = axisAt(xEnd);
+    ctx.fillStyle = style;
+    ctx.beginPath();
+    ctx.moveTo(x0, y0 - r0); ctx.lineTo(xEnd, yEnd - w);
+    ctx.lineTo(xEnd, yEnd + w); ctx.lineTo(x0, y0 + r0);
+    ctx.fill();
+  }
+
+  function strokeCone(x0, y0, r0, x1, ratio, xEnd, axisAt, style, dash) {
+    const w = coneHalfWidth(x0, r0, x1, ratio, xEnd), yEnd = axisAt(xEnd);
+    ctx.strokeStyle = style; ctx.lineWidth = 0.8;
+    ctx.setLineDash(dash);
+    ctx.beginPath(); ctx.moveTo(x0, y0 - r0); ctx.lineTo(xEnd, yEnd - w); ctx.stroke();
+    ctx.beginPath(); ctx.moveTo(x0, y0 + r0); ctx.lineTo(xEnd, yEnd + w); ctx.stroke();
+    ctx.setLineDash([]);
+  }
+
+  // Fraction of the Moon's diameter inside a shadow of this radius whose axis is offset away (Earth radii)
+  function coverage(radius, offset) {
+    const k = cones.moonRadius;
+    return Math.max(0, Math.min(1, (radius + k - offset) / (2 * k)));
+  }
+
+  function drawSun(sunX, cy, sunR) {
+    const sg = ctx.createRadialGradient(sunX, cy, 5, sunX, cy, sunR + 8);
+    sg.addColorStop(0, '#fff7a0'); sg.addColorStop(0.7, '#ffcc00');
+    sg.addColorStop(1, 'rgba(255,150,0,0)');
+    ctx.fillStyle = sg;
+    ctx.beginPath(); ctx.arc(sunX, cy, sunR + 8, 0, TAU); ctx.fill();
+    ctx.fillStyle = '#ffdd44';
+    ctx.beginPath(); ctx.arc(sunX, cy, sunR, 0, TAU); ctx.fill();
+    // Sunlight leaving the disc
+    const lg = ctx.createRadialGradient(sunX, cy, sunR, sunX, cy, W * 0.6);
+    lg.addColorStop(0, 'rgba(255,220,80,0.10)'); lg.addColorStop(1, 'rgba(255,220,80,0)');
+    ctx.fillStyle = lg;
+    ctx.fillRect(sunX, 0, W - sunX, H);
+  }
+
+  function drawEarth(earthX, cy, earthR) {
+    ctx.fillStyle = '#4488cc';
+    ctx.beginPath(); ctx.arc(earthX, cy, earthR, 0, TAU); ctx.fill();
+    ctx.fillStyle = '#66bb88';
+    ctx.beginPath(); ctx.arc(earthX, cy - 2, 11, 0.2, 2.2); ctx.fill();
+  }
+
+  function drawEcliptic(cy) {
+    ctx.strokeStyle = 'rgba(255,100,100,0.3)'; ctx.lineWidth = 0.5;
+    ctx.setLineDash([4, 4]);
+    ctx.beginPath(); ctx.moveTo(0, cy); ctx.lineTo(W, cy); ctx.stroke();
+    ctx.setLineDash([]);
+  }
 
   function draw() {
     const type = typeSelect.value;
@@ -902,153 +1293,61 @@ function lerp(a, b, t) { return a + (b - a) * t; }
     ctx.fillStyle = '#0a0e27'; ctx.fillRect(0, 0, W, H);
 
     const cy = H / 2;
-    const moonOffset = inclination * 2; // pixels offset from ecliptic
+    // The Moon's distance from the ecliptic at new/full moon, Earth radii
+    const offsetRe = cones.moonDistance * Math.sin(inclination * DEG);
 
     if (type === 'solar') {
       // Solar Eclipse: Sun -- Moon -- Earth (side view)
       const sunX = 80, moonX = W * 0.52, earthX = W - 100;
       const sunR = 40, moonR = 12, earthR = 18;
-
-      // ── Sunlight rays (diverging from sun surface) ──
-      // Rays that pass ABOVE and BELOW the moon → reach Earth
-      ctx.lineWidth = 1;
-      const rayCount = 14;
-      for (let i = 0; i < rayCount; i++) {
-        const srcY = cy + sunR * (2 * i / (rayCount - 1) - 1) * 0.95;
-        // Ray extends to far right
-        const dx = W - sunX - sunR;
-        const slope = (srcY - cy) / (sunX + sunR);
-        const endY = srcY + slope * dx * 0.5;
-
-        // Check if ray is blocked by moon
-        const tMoon = (moonX - sunX - sunR) / dx;
-        const rayYatMoon = srcY + (endY - srcY) * tMoon;
-        const blocked = Math.abs(rayYatMoon - (cy + moonOffset)) < moonR * 0.9;
-
-        if (blocked) {
-          // Draw ray only up to moon, dimmer
-          ctx.strokeStyle = 'rgba(255,220,80,0.12)';
-          ctx.beginPath();
-          ctx.moveTo(sunX + sunR, srcY);
-          ctx.lineTo(moonX - moonR, rayYatMoon);
-          ctx.stroke();
-        } else {
-          // Full ray passes through to earth and beyond
-          ctx.strokeStyle = 'rgba(255,220,80,0.15)';
-          ctx.beginPath();
-          ctx.moveTo(sunX + sunR, srcY);
-          ctx.lineTo(W, endY);
-          ctx.stroke();
-        }
-      }
-
-      // ── Shadow cones from moon edges (tangent lines) ──
-      // Penumbra: outer tangent lines (sun edge → moon opposite edge → earth)
-      // Umbra: inner tangent lines (sun edge → moon same edge → converge)
-      if (Math.abs(moonOffset) < 30) {
-        const moonCy = cy + moonOffset;
-
-        // Penumbra boundary lines (top-sun-edge → bottom-moon-edge → beyond)
-        ctx.strokeStyle = 'rgba(100,100,200,0.3)'; ctx.lineWidth = 0.8;
-        ctx.setLineDash([5, 3]);
-        // Upper penumbra edge
-        const pSlope1 = ((moonCy - moonR) - (cy - sunR)) / (moonX - sunX);
-        const pEndY1 = (moonCy - moonR) + pSlope1 * (W - moonX);
-        ctx.beginPath(); ctx.moveTo(sunX, cy - sunR);
-        ctx.lineTo(W, pEndY1); ctx.stroke();
-        // Lower penumbra edge
-        const pSlope2 = ((moonCy + moonR) - (cy + sunR)) / (moonX - sunX);
-        const pEndY2 = (moonCy + moonR) + pSlope2 * (W - moonX);
-        ctx.beginPath(); ctx.moveTo(sunX, cy + sunR);
-        ctx.lineTo(W, pEndY2); ctx.stroke();
-        ctx.setLineDash([]);
-
-        // Penumbra fill
-        ctx.fillStyle = 'rgba(30,30,80,0.2)';
-        ctx.beginPath();
-        ctx.moveTo(moonX, moonCy - moonR);
-        ctx.lineTo(W, pEndY1);
-        ctx.lineTo(W, pEndY2);
-        ctx.lineTo(moonX, moonCy + moonR);
-        ctx.fill();
-
-        // Umbra boundary lines (top-sun-edge → top-moon-edge → converge)
-        ctx.strokeStyle = 'rgba(200,100,100,0.4)'; ctx.lineWidth = 0.8;
-        ctx.setLineDash([3, 3]);
-        const uSlope1 = ((moonCy - moonR) - (cy + sunR)) / (moonX - sunX);
-        const uSlope2 = ((moonCy + moonR) - (cy - sunR)) / (moonX - sunX);
-        // Convergence point
-        const convX = moonX + (moonCy - moonR - (cy + sunR + uSlope1 * moonX)) / (-uSlope1);
-        const convXreal = moonX - (moonCy - moonR - (moonCy + moonR)) / (uSlope1 - uSlope2);
-        // Upper umbra edge
-        ctx.beginPath(); ctx.moveTo(sunX, cy + sunR);
-        ctx.lineTo(moonX, moonCy - moonR);
-        const uEndY1 = (moonCy - moonR) + uSlope1 * (earthX + 50 - moonX);
-        ctx.lineTo(earthX + 50, uEndY1); ctx.stroke();
-        // Lower umbra edge
-        ctx.beginPath(); ctx.moveTo(sunX, cy - sunR);
-        ctx.lineTo(moonX, moonCy + moonR);
-        const uEndY2 = (moonCy + moonR) + uSlope2 * (earthX + 50 - moonX);
-        ctx.lineTo(earthX + 50, uEndY2); ctx.stroke();
-        ctx.setLineDash([]);
-
-        // Umbra fill (darker cone)
-        ctx.fillStyle = 'rgba(0,0,20,0.45)';
-        ctx.beginPath();
-        ctx.moveTo(moonX, moonCy - moonR);
-        ctx.lineTo(earthX + 50, uEndY1);
-        ctx.lineTo(earthX + 50, uEndY2);
-        ctx.lineTo(moonX, moonCy + moonR);
-        ctx.fill();
-
-        // Labels for shadow regions
-        ctx.font = '9px Noto Sans KR'; ctx.textAlign = 'center';
-        ctx.fillStyle = 'rgba(200,150,150,0.6)';
-        ctx.fillText('본영 (Umbra)', (moonX + earthX) / 2, moonCy - 2);
-        ctx.fillStyle = 'rgba(150,150,200,0.6)';
-        const penLabelY = Math.min(moonCy - moonR - 12, cy - 30);
-        ctx.fillText('반영 (Penumbra)', (moonX + earthX) / 2, penLabelY);
-      }
-
-      // Sun
-      const sg = ctx.createRadialGradient(sunX, cy, 5, sunX, cy, sunR + 8);
-      sg.addColorStop(0, '#fff7a0'); sg.addColorStop(0.7, '#ffcc00');
-      sg.addColorStop(1, 'rgba(255,150,0,0)');
-      ctx.fillStyle = sg;
-      ctx.beginPath(); ctx.arc(sunX, cy, sunR + 8, 0, TAU); ctx.fill();
-      ctx.fillStyle = '#ffdd44';
-      ctx.beginPath(); ctx.arc(sunX, cy, sunR, 0, TAU); ctx.fill();
+      const cone = cones.solar;
+      const l1 = cone.penumbra * cones.moonRadius;
+      // Scaled so the drawn penumbra clears Earth exactly when the real one does (offset = 1 + l1)
+      const penumbraPx = coneHalfWidth(moonX, moonR, earthX, cone.penumbra, earthX);
+      const moonOffset = offsetRe / (1 + l1) * (earthR + penumbraPx) * (moonX - sunX) / (earthX - sunX);
+      const moonCy = cy + moonOffset;
+      // The shadow axis runs from the Sun's centre through the Moon's
+      const axisAt = x => cy + moonOffset * (x - sunX) / (moonX - sunX);
+      drawSun(sunX, cy, sunR);
+
+      // ── Shadow cones of the Moon, radii at Earth from the mean Besselian l1, l2 ──
+      fillCone(moonX, moonCy, moonR, earthX, cone.penumbra, W, axisAt, 'rgba(30,30,80,0.2)');
+      strokeCone(moonX, moonCy, moonR, earthX, cone.penumbra, W, axisAt, 'rgba(100,100,200,0.3)', [5, 3]);
+      fillCone(moonX, moonCy, moonR, earthX, cone.umbra, earthX + 50, axisAt, 'rgba(0,0,20,0.45)');
+      strokeCone(moonX, moonCy, moonR, earthX, cone.umbra, earthX + 50, axisAt, 'rgba(200,100,100,0.4)', [3, 3]);
+
+      // Labels for shadow regions
+      ctx.font = '9px Noto Sans KR'; ctx.textAlign = 'center';
+      ctx.fillStyle = 'rgba(200,150,150,0.6)';
+      ctx.fillText('본영 (Umbra)', (moonX + earthX) / 2, moonCy - 2);
+      ctx.fillStyle = 'rgba(150,150,200,0.6)';
+      const penLabelY = Math.min(moonCy - moonR - 12, cy - 30);
+      ctx.fillText('반영 (Penumbra)', (moonX + earthX) / 2, penLabelY);
 
       // Moon
       ctx.fillStyle = '#666';
-      ctx.beginPath(); ctx.arc(moonX, cy + moonOffset, moonR, 0, TAU); ctx.fill();
+      ctx.beginPath(); ctx.arc(moonX, moonCy, moonR, 0, TAU); ctx.fill();
       ctx.fillStyle = '#888';
-      ctx.beginPath(); ctx.arc(moonX, cy + moonOffset, moonR, -Math.PI/2 - 0.5, Math.PI/2 + 0.5, true); ctx.fill();
+      ctx.beginPath(); ctx.arc(moonX, moonCy, moonR, -Math.PI/2 - 0.5, Math.PI/2 + 0.5, true); ctx.fill();
 
       // Earth
-      ctx.fillStyle = '#4488cc';
-      ctx.beginPath(); ctx.arc(earthX, cy, earthR, 0, TAU); ctx.fill();
-      ctx.fillStyle = '#66bb88';
-      ctx.beginPath(); ctx.arc(earthX, cy - 2, 11, 0.2, 2.2); ctx.fill();
+      drawEarth(earthX, cy, earthR);
       // Atmosphere glow
       ctx.strokeStyle = 'rgba(100,180,255,0.3)'; ctx.lineWidth = 2;
       ctx.beginPath(); ctx.arc(earthX, cy, earthR + 2, 0, TAU); ctx.stroke();
 
-      // Ecliptic line
-      ctx.strokeStyle = 'rgba(255,100,100,0.3)'; ctx.lineWidth = 0.5;
-      ctx.setLineDash([4, 4]);
-      ctx.beginPath(); ctx.moveTo(0, cy); ctx.lineTo(W, cy); ctx.stroke();
-      ctx.setLineDash([]);
+      drawEcliptic(cy);
 
       // Labels
       ctx.fillStyle = '#fff'; ctx.font = '12px Noto Sans KR'; ctx.textAlign = 'center';
       ctx.fillText('태양', sunX, cy + sunR + 18);
-      ctx.fillText('달', moonX, cy + moonOffset + moonR + 18);
+      ctx.fillText('달', moonX, moonCy + moonR + 18);
       ctx.fillText('지구', earthX, cy + earthR + 18);
       ctx.fillStyle = '#ff6666'; ctx.font = '10px Noto Sans KR';
       ctx.fillText('황도면', W - 40, cy - 6);
 
-      const eclipseOccurs = Math.abs(moonOffset) < earthR;
+      // The penumbra reaches some part of Earth
+      const eclipseOccurs = offsetRe < 1 + l1;
       if (info) info.textContent = `일식 (Solar Eclipse) | 달 궤도 경사: ${inclination.toFixed(1)}° | ${eclipseOccurs ? '✓ 일식 발생!' : '✗ 일식 불발 (달이 황도면에서 벗어남)'}`;
 
     } else {
@@ -1056,102 +1355,20 @@ function lerp(a, b, t) { return a + (b - a) * t; }
       const sunX = 80, earthX = W * 0.45, moonX = W - 90;
       const sunR = 40, earthR = 18, moonR = 10;
       const atmoR = earthR + 4; // atmosphere radius
-
-      // ── Sunlight rays ──
-      const rayCount = 18;
-      ctx.lineWidth = 1;
-      for (let i = 0; i < rayCount; i++) {
-        const srcY = cy + sunR * (2 * i / (rayCount - 1) - 1) * 0.95;
-        const dx = W - sunX - sunR;
-        const slope = (srcY - cy) * 0.3 / dx;
-        const endY = srcY + slope * dx;
-
-        // Check if ray hits Earth
-        const tEarth = (earthX - sunX - sunR) / dx;
-        const rayYatEarth = srcY + (endY - srcY) * tEarth;
-        const hitsCore = Math.abs(rayYatEarth - cy) < earthR;
-        const hitsAtmo = Math.abs(rayYatEarth - cy) < atmoR;
-
-        if (hitsCore) {
-          // Ray blocked by solid Earth → draw only to Earth
-          ctx.strokeStyle = 'rgba(255,220,80,0.12)';
-          ctx.beginPath();
-          ctx.moveTo(sunX + sunR, srcY);
-          ctx.lineTo(earthX - earthR, rayYatEarth);
-          ctx.stroke();
-        } else if (hitsAtmo) {
-          // Ray passes through atmosphere → refracted, turns reddish
-          ctx.strokeStyle = 'rgba(255,220,80,0.15)';
-          ctx.beginPath();
-          ctx.moveTo(sunX + sunR, srcY);
-          ctx.lineTo(earthX - atmoR, rayYatEarth);
-          ctx.stroke();
-          // Refracted red ray bends into shadow
-          ctx.strokeStyle = 'rgba(220,80,40,0.3)';
-          ctx.beginPath();
-          ctx.moveTo(earthX + atmoR, rayYatEarth);
-          const bendSign = rayYatEarth > cy ? -1 : 1;
-          ctx.quadraticCurveTo(
-            (earthX + moonX) / 2, rayYatEarth + bendSign * 8,
-            moonX, cy + moonOffset
-          );
-          ctx.stroke();
-        } else {
-          // Ray passes freely
-          ctx.strokeStyle = 'rgba(255,220,80,0.13)';
-          ctx.beginPath();
-          ctx.moveTo(sunX + sunR, srcY);
-          ctx.lineTo(W, endY);
-          ctx.stroke();
-        }
-      }
-
-      // ── Shadow cones from Earth edges ──
-      // Penumbra edges (sun edge → earth opposite edge → diverge)
-      ctx.strokeStyle = 'rgba(100,100,200,0.35)'; ctx.lineWidth = 0.8;
-      ctx.setLineDash([5, 3]);
-      // Upper penumbra: from sun bottom → earth top → beyond
-      const pSlope1 = ((cy - earthR) - (cy + sunR)) / (earthX - sunX);
-      const pEndY1 = (cy - earthR) + pSlope1 * (W - earthX);
-      ctx.beginPath(); ctx.moveTo(sunX, cy + sunR);
-      ctx.lineTo(earthX, cy - earthR); ctx.lineTo(W, pEndY1); ctx.stroke();
-      // Lower penumbra: from sun top → earth bottom → beyond
-      const pSlope2 = ((cy + earthR) - (cy - sunR)) / (earthX - sunX);
-      const pEndY2 = (cy + earthR) + pSlope2 * (W - earthX);
-      ctx.beginPath(); ctx.moveTo(sunX, cy - sunR);
-      ctx.lineTo(earthX, cy + earthR); ctx.lineTo(W, pEndY2); ctx.stroke();
-      ctx.setLineDash([]);
-
-      // Penumbra fill
-      ctx.fillStyle = 'rgba(30,30,80,0.15)';
-      ctx.beginPath();
-      ctx.moveTo(earthX, cy - earthR);
-      ctx.lineTo(W, pEndY1);
-      ctx.lineTo(W, pEndY2);
-      ctx.lineTo(earthX, cy + earthR);
-      ctx.fill();
-
-      // Umbra edges (sun top → earth top → converge beyond earth)
-      ctx.strokeStyle = 'rgba(200,100,100,0.45)'; ctx.lineWidth = 0.8;
-      ctx.setLineDash([3, 3]);
-      const uSlope1 = ((cy - earthR) - (cy - sunR)) / (earthX - sunX);
-      const uEndY1 = (cy - earthR) + uSlope1 * (W - earthX);
-      ctx.beginPath(); ctx.moveTo(sunX, cy - sunR);
-      ctx.lineTo(earthX, cy - earthR); ctx.lineTo(W, uEndY1); ctx.stroke();
-      const uSlope2 = ((cy + earthR) - (cy + sunR)) / (earthX - sunX);
-      const uEndY2 = (cy + earthR) + uSlope2 * (W - earthX);
-      ctx.beginPath(); ctx.moveTo(sunX, cy + sunR);
-      ctx.lineTo(earthX, cy + earthR); ctx.lineTo(W, uEndY2); ctx.stroke();
-      ctx.setLineDash([]);
-
-      // Umbra fill
-      ctx.fillStyle = 'rgba(0,0,20,0.35)';
-      ctx.beginPath();
-      ctx.moveTo(earthX, cy - earthR);
-      ctx.lineTo(W, uEndY1);
-      ctx.lineTo(W, uEndY2);
-      ctx.lineTo(earthX, cy + earthR);
-      ctx.fill();
+      const cone = cones.lunar;
+      const axisAt = () => cy;
+      // Scaled so the drawn umbra touches the Moon when the real one does; kept on the canvas
+      const umbraPx = coneHalfWidth(earthX, earthR, moonX, cone.umbra, moonX);
+      const moonOffset = Math.min(offsetRe / (cone.umbra + cones.moonRadius) * (umbraPx + moonR), H / 2 - 30);
+      drawSun(sunX, cy, sunR);
+
+      // ── Shadow cones of Earth, radii at the Moon's distance (atmosphere included) ──
+      fillCone(earthX, cy, earthR, moonX, cone.penumbra, W, axisAt, 'rgba(30,30,80,0.15)');
+      strokeCone(earthX, cy, earthR, moonX, cone.penumbra, W, axisAt, 'rgba(100,100,200,0.35)', [5, 3]);
+      fillCone(earthX, cy, earthR, moonX, cone.umbra, W, axisAt, 'rgba(0,0,20,0.35)');
+      // Sunlight refracted by the atmosphere reddens the umbra
+      fillCone(earthX, cy, earthR, moonX, cone.umbra, W, axisAt, 'rgba(180,50,20,0.08)');
+      strokeCone(earthX, cy, earthR, moonX, cone.umbra, W, axisAt, 'rgba(200,100,100,0.45)', [3, 3]);
 
       // Shadow region labels
       ctx.font = '9px Noto Sans KR'; ctx.textAlign = 'center';
@@ -1160,20 +1377,8 @@ function lerp(a, b, t) { return a + (b - a) * t; }
       ctx.fillStyle = 'rgba(150,150,200,0.6)';
       ctx.fillText('반영 (Penumbra)', (earthX + moonX) / 2, cy - earthR - 14);
 
-      // Sun
-      const sg = ctx.createRadialGradient(sunX, cy, 5, sunX, cy, sunR + 8);
-      sg.addColorStop(0, '#fff7a0'); sg.addColorStop(0.7, '#ffcc00');
-      sg.addColorStop(1, 'rgba(255,150,0,0)');
-      ctx.fillStyle = sg;
-      ctx.beginPath(); ctx.arc(sunX, cy, sunR + 8, 0, TAU); ctx.fill();
-      ctx.fillStyle = '#ffdd44';
-      ctx.beginPath(); ctx.arc(sunX, cy, sunR, 0, TAU); ctx.fill();
-
       // Earth
-      ctx.fillStyle = '#4488cc';
-      ctx.beginPath(); ctx.arc(earthX, cy, earthR, 0, TAU); ctx.fill();
-      ctx.fillStyle = '#66bb88';
-      ctx.beginPath(); ctx.arc(earthX, cy - 2, 11, 0.2, 2.2); ctx.fill();
+      drawEarth(earthX, cy, earthR);
       // Atmosphere ring (key for red refraction)
       const atmoGrad = ctx.createRadialGradient(earthX, cy, earthR, earthX, cy, atmoR + 2);
       atmoGrad.addColorStop(0, 'rgba(100,180,255,0.25)');
@@ -1185,27 +1390,23 @@ function lerp(a, b, t) { return a + (b - a) * t; }
       ctx.fillStyle = 'rgba(100,200,255,0.5)'; ctx.font = '8px Noto Sans KR';
       ctx.fillText('대기', earthX, cy + earthR + 12);
 
-      // Moon
+      // Moon, darkened by how much of it the umbra and penumbra cover
       const moonY = cy + moonOffset;
+      const umbral = coverage(cone.umbra, offsetRe);
+      const penumbral = coverage(cone.penumbra, offsetRe);
       ctx.fillStyle = '#ccc';
       ctx.beginPath(); ctx.arc(moonX, moonY, moonR, 0, TAU); ctx.fill();
-
-      // If in shadow, darken moon and apply red tint (blood moon)
-      if (Math.abs(moonOffset) < earthR * 1.5) {
-        const shadowFactor = 1 - Math.abs(moonOffset) / (earthR * 1.5);
-        // Base shadow
-        ctx.fillStyle = `rgba(0,0,10,${shadowFactor * 0.6})`;
+      if (penumbral > 0) {
+        ctx.fillStyle = `rgba(0,0,10,${penumbral * 0.2 + umbral * 0.4})`;
         ctx.beginPath(); ctx.arc(moonX, moonY, moonR, 0, TAU); ctx.fill();
-        // Red tint from refracted light
-        ctx.fillStyle = `rgba(180,50,20,${shadowFactor * 0.55})`;
+      }
+      if (umbral > 0) {
+        // Red tint from refracted light (blood moon)
+        ctx.fillStyle = `rgba(180,50,20,${umbral * 0.55})`;
         ctx.beginPath(); ctx.arc(moonX, moonY, moonR, 0, TAU); ctx.fill();
       }
 
-      // Ecliptic line
-      ctx.strokeStyle = 'rgba(255,100,100,0.3)'; ctx.lineWidth = 0.5;
-      ctx.setLineDash([4, 4]);
-      ctx.beginPath(); ctx.moveTo(0, cy); ctx.lineTo(W, cy); ctx.stroke();
-      ctx.setLineDash([]);
+      drawEcliptic(cy);
 
       // Labels
       ctx.fillStyle = '#fff'; ctx.font = '12px Noto Sans KR'; ctx.textAlign = 'center';
@@ -1219,52 +1420,73 @@ function lerp(a, b, t) { return a + (b - a) * t; }
       ctx.fillStyle = 'rgba(220,100,60,0.6)'; ctx.font = '8px Noto Sans KR';
       ctx.fillText('대기 굴절 → 붉은빛', (earthX + moonX) / 2, cy + earthR + 22);
 
-      const eclipseOccurs = Math.abs(moonOffset) < earthR * 1.5;
-      if (info) info.textContent = `월식 (Lunar Eclipse) | 달 궤도 경사: ${inclination.toFixed(1)}° | ${eclipseOccurs ? '✓ 월식 발생! (대기 굴절로 달이 붉게 물듦)' : '✗ 월식 불발'}`;
+      const verdict = umbral > 0 ? '✓ 월식 발생! (대기 굴절로 달이 붉게 물듦)'
+                    : penumbral > 0 ? '△ 반영월식 (달이 살짝 어두워질 뿐)' : '✗ 월식 불발';
+      if (info) info.textContent = `월식 (Lunar Eclipse) | 달 궤도 경사: ${inclination.toFixed(1)}° | ${verdict}`;
     }
   }
 
   typeSelect.addEventListener('change', draw);
   inclSlider.addEventListener('input', draw);
   draw();
-})();
+});
 
 // ═══════════════════════════════════════════════════════════
-// 5b. Eclipse Observer Simulation (Seoul, 37.5°N)
+// 5b. Eclipse Observer Simulation (site from SIM_DATA, Seoul by default)
 // ═══════════════════════════════════════════════════════════
-(function() {
+simModule('eclipseObsCanvas', function() {
   const canvas = document.getElementById('eclipseObsCanvas');
   if (!canvas) return;
-  const ctx = canvas.getContext('2d');
-  const W = canvas.width, H = canvas.height;
+  const { ctx, W, H } = simSurface(canvas);
   const eventSelect = document.getElementById('eclipseEvent');
   const timeSlider = document.getElementById('eclipseTime');
   const info = document.getElementById('eclipseObsInfo');
 
-  // Real eclipse data visible from Seoul area (UTC+9)
-  // {name, type, date, startH, maxH, endH, maxMag, sunAlt, desc}
-  const eclipseEvents = [
-    { id: 'solar_20350902', name: '2035-09-02 개기일식', type: 'solar', kind: 'total',
-      date: '2035년 9월 2일', startH: 8.8, maxH: 9.95, endH: 11.2, maxMag: 1.02,
-      sunAltStart: 35, sunAltMax: 47, sunAltEnd: 57,
-      desc: '한반도에서 관측 가능한 개기일식. 개기식 지속시간 약 2분 10초. 북한 평양~원산 부근이 개기식 중심대.' },
-    { id: 'solar_20300601', name: '2030-06-01 금환일식', type: 'solar', kind: 'annular',
-      date: '2030년 6월 1일', startH: 15.5, maxH: 16.8, endH: 17.9, maxMag: 0.89,
-      sunAltStart: 52, sunAltMax: 38, sunAltEnd: 22,
-      desc: '서울에서 부분일식(식분 ~0.89)으로 관측. 금환일식 중심대는 일본 남부.' },
-    { id: 'solar_20280722', name: '2028-07-22 부분일식', type: 'solar', kind: 'partial',
-      date: '2028년 7월 22일', startH: 17.0, maxH: 17.8, endH: 18.5, maxMag: 0.36,
-      sunAltStart: 30, sunAltMax: 20, sunAltEnd: 10,
-      desc: '서울에서 부분일식(식분 ~0.36). 해질녘에 태양 우측 상단이 가려짐.' },
-    { id: 'lunar_20250914', name: '2025-09-07 개기월식', type: 'lunar', kind: 'total',
-      date: '2025년 9월 7일', startH: 23.3, maxH: 1.5, endH: 3.7, maxMag: 1.36,
-      moonAltStart: 35, moonAltMax: 28, moonAltEnd: 15,
-      desc: '한국에서 전 과정 관측 가능한 개기월식. 달이 붉게 물드는 "블러드 문".' },
-    { id: 'lunar_20261231', name: '2028-12-31 개기월식', type: 'lunar', kind: 'total',
-      date: '2028년 12월 31일', startH: 22.1, maxH: 0.5, endH: 2.9, maxMag: 1.22,
-      moonAltStart: 60, moonAltMax: 65, moonAltEnd: 55,
-      desc: '연말 밤하늘의 개기월식. 달이 높이 떠있어 최적의 관측 조건.' },
-  ];
+  // Eclipses visible from the site, found by eclipses.py at build time.
+  // Hours are local time counted from local midnight of the first contact (may exceed 24).
+  const eclipseData = simTable('eclipses');
+  const site = eclipseData.site;
+  const eclipseEvents = eclipseData.events;
+  // What the site sees over each event's slider span (eclipses.sky_tracks), and the
+  // magnitude/contact-time maps over Korea for the solar ones (besselian.eclipse_maps)
+  const tracks = simTable('eclipseTracks');
+  const maps = simTable('eclipseMaps');
+
+  // Altitude/azimuth of the eclipsed body and the Moon's (or umbra's) offset in body radii at progress t
+  function trackAt(ev, t) {
+    const tr = tracks.events[ev.id].track, n = tracks.samples;
+    const x = t * (n - 1), i = Math.min(Math.floor(x), n - 2), f = x - i;
+    const a = i * 4, b = a + 4;
+    let daz = tr[b + 1] - tr[a + 1];
+    daz -= 360 * Math.round(daz / 360);
+    return { alt: lerp(tr[a], tr[b], f), az: tr[a + 1] + daz * f, dx: lerp(tr[a + 2], tr[b + 2], f), dy: lerp(tr[a + 3], tr[b + 3], f) };
+  }
+
+  // Horizontal screen scale for an event: its azimuth range, centred, at least 90° wide
+  function azimuthView(ev) {
+    const tr = tracks.events[ev.id].track, n = tracks.samples;
+    let lo = tr[1], hi = tr[1], prev = tr[1], az = tr[1];
+    for (let i = 1; i < n; i++) {
+      let d = tr[i * 4 + 1] - prev;
+      d -= 360 * Math.round(d / 360);
+      az += d; prev = tr[i * 4 + 1];
+      lo = Math.min(lo, az); hi = Math.max(hi, az);
+    }
+    const mid = (lo + hi) / 2, half = Math.max(45, (hi - lo) / 2);
+    return az => {
+      const a = az - 360 * Math.round((az - mid) / 360);
+      return W * 0.55 + (a - mid) / half * W * 0.3;
+    };
+  }
+
+  // Fraction of a unit disc covered by a disc of radius r whose centre is d away
+  function discOverlap(d, r) {
+    if (d >= 1 + r) return 0;
+    if (d <= Math.abs(1 - r)) return Math.min(1, r * r);
+    const a = Math.acos((d * d + 1 - r * r) / (2 * d));
+    const b = Math.acos((d * d + r * r - 1) / (2 * d * r));
+    return (a + r * r * b - 0.5 * Math.sqrt((-d + 1 + r) * (d + 1 - r) * (d - 1 + r) * (d + 1 + r))) / Math.PI;
+  }
 
   function getEvent() {
     const idx = parseInt(eventSelect.value);
@@ -1278,6 +1500,68 @@ function lerp(a, b, t) { return a + (b - a) * t; }
     eventSelect.appendChild(opt);
   });
 
+  // ── Obscuration map inset (solar events) ──
+  const MAP_X = 12, MAP_Y = 70, MAP_H = 150;
+  const mapImage = document.createElement('canvas');
+  const mapShape = maps.maps[Object.keys(maps.maps)[0]];
+  const nLat = mapShape ? mapShape.shape[0] : 0, nLon = mapShape ? mapShape.shape[1] : 0;
+  mapImage.width = nLon; mapImage.height = nLat;
+  const mapCtx = mapImage.getContext('2d');
+  const mapPixels = nLat ? mapCtx.createImageData(nLon, nLat) : null;
+  // Cells are lonStep wide and |latStep| tall; squeeze longitude by cos(latitude) at the centre
+  const midLat = maps.lat0 + maps.latStep * (nLat - 1) / 2;
+  const cellH = MAP_H / Math.max(nLat - 1, 1);
+  const cellW = cellH * Math.cos(midLat * DEG) * maps.lonStep / -maps.latStep;
+  const MAP_W = cellW * Math.max(nLon - 1, 1);
+  const mapX = lon => MAP_X + (lon - maps.lon0) / maps.lonStep * cellW;
+  const mapY = lat => MAP_Y + (lat - maps.lat0) / maps.latStep * cellH;
+
+  function drawMap(ev, minutes) {
+    const grid = maps.maps[ev.id];
+    if (!grid || !mapPixels) return;
+    // Colour by maximum magnitude; cells where the eclipse is in progress at this moment are lit
+    const px = mapPixels.data, none = maps.noData, now = minutes * maps.timeScale;
+    for (let c = 0; c < nLat * nLon; c++) {
+      const mag = grid[c * 3], start = grid[c * 3 + 1], end = grid[c * 3 + 2];
+      const m = mag === none ? 0 : mag / maps.magScale;
+      const live = mag !== none && start !== none && end !== none && start <= now && now <= end;
+      const k = live ? 1 : 0.55;
+      px[c * 4] = (m >= 1 ? 255 : 40 + 215 * m) * k;
+      px[c * 4 + 1] = (m >= 1 ? 255 : 50 + 150 * m * m) * k;
+      px[c * 4 + 2] = (m >= 1 ? 255 : 90 - 60 * m) * k;
+      px[c * 4 + 3] = 230;
+    }
+    mapCtx.putImageData(mapPixels, 0, 0);
+    ctx.save();
+    ctx.imageSmoothingEnabled = true;
+    ctx.drawImage(mapImage, MAP_X - cellW / 2, MAP_Y - cellH / 2, MAP_W + cellW, MAP_H + cellH);
+    // Graticule every 2°
+    ctx.strokeStyle = 'rgba(255,255,255,0.15)'; ctx.lineWidth = 0.5;
+    ctx.beginPath();
+    for (let lon = Math.ceil(maps.lon0 / 2) * 2; lon <= maps.lon0 + maps.lonStep * (nLon - 1); lon += 2) {
+      ctx.moveTo(mapX(lon), MAP_Y - cellH / 2); ctx.lineTo(mapX(lon), MAP_Y + MAP_H + cellH / 2);
+    }
+    for (let lat = Math.ceil((maps.lat0 + maps.latStep * (nLat - 1)) / 2) * 2; lat <= maps.lat0; lat += 2) {
+      ctx.moveTo(MAP_X - cellW / 2, mapY(lat)); ctx.lineTo(MAP_X + MAP_W + cellW / 2, mapY(lat));
+    }
+    ctx.stroke();
+    // Cities and the site
+    ctx.font = '9px Noto Sans KR'; ctx.textAlign = 'left';
+    for (const city of maps.cities) {
+      ctx.fillStyle = 'rgba(255,255,255,0.8)';
+      ctx.beginPath(); ctx.arc(mapX(city.lon), mapY(city.lat), 1.5, 0, TAU); ctx.fill();
+      ctx.fillStyle = 'rgba(255,255,255,0.6)';
+      ctx.fillText(city.name, mapX(city.lon) + 3, mapY(city.lat) + 3);
+    }
+    ctx.strokeStyle = '#ff8844'; ctx.lineWidth = 1.5;
+    ctx.beginPath(); ctx.arc(mapX(site.lon), mapY(site.lat), 3.5, 0, TAU); ctx.stroke();
+    ctx.fillStyle = '#ffbb88';
+    ctx.fillText(site.name, mapX(site.lon) + 5, mapY(site.lat) - 4);
+    ctx.restore();
+    ctx.fillStyle = '#ddd'; ctx.font = '10px Noto Sans KR'; ctx.textAlign = 'left';
+    ctx.fillText('최대 식분 (흰색: 개기대)', MAP_X - cellW / 2, MAP_Y + MAP_H + cellH / 2 + 13);
+  }
+
   function draw() {
     const ev = getEvent();
     const t = parseFloat(timeSlider.value); // 0-1 progress through eclipse
@@ -1287,14 +1571,13 @@ function lerp(a, b, t) { return a + (b - a) * t; }
     const currentH = ev.startH + t * (ev.endH - ev.startH);
     const hours = Math.floor(currentH % 24);
     const mins = Math.floor((currentH % 1) * 60);
+    const pos = trackAt(ev, t);
+    const sep = Math.hypot(pos.dx, pos.dy);
 
     // Sky gradient based on time and eclipse
-    const isNight = !isSolar;
     if (isSolar) {
-      // Daytime sky, darken during max eclipse
-      const maxT = (ev.maxH - ev.startH) / (ev.endH - ev.startH);
-      const distToMax = Math.abs(t - maxT);
-      const eclipseDarkness = Math.max(0, 1 - distToMax * 4) * ev.maxMag;
+      // Daytime sky, darkened by the covered fraction of the Sun
+      const eclipseDarkness = discOverlap(sep, ev.ratio);
       const skyBright = Math.max(0.1, 1 - eclipseDarkness * 0.8);
       const r = Math.floor(100 * skyBright);
       const g = Math.floor(160 * skyBright);
@@ -1302,9 +1585,9 @@ function lerp(a, b, t) { return a + (b - a) * t; }
       ctx.fillStyle = `rgb(${r},${g},${b})`;
       ctx.fillRect(0, 0, W, H);
       // Stars visible during total eclipse
-      if (eclipseDarkness > 0.9) {
+      if (eclipseDarkness > 0.99) {
         for (let i = 0; i < 30; i++) {
-          ctx.fillStyle = `rgba(255,255,255,${eclipseDarkness - 0.8})`;
+          ctx.fillStyle = `rgba(255,255,255,${(eclipseDarkness - 0.99) * 50})`;
           ctx.beginPath();
           ctx.arc((i * 97 + 20) % W, (i * 61 + 10) % (H * 0.6), 1, 0, TAU);
           ctx.fill();
@@ -1312,14 +1595,10 @@ function lerp(a, b, t) { return a + (b - a) * t; }
       }
     } else {
       // Night sky
-      const grad = ctx.createLinearGradient(0, 0, 0, H);
-      grad.addColorStop(0, '#0a0e27'); grad.addColorStop(1, '#1a1a30');
-      ctx.fillStyle = grad; ctx.fillRect(0, 0, W, H);
-      for (let i = 0; i < 50; i++) {
-        ctx.fillStyle = `rgba(255,255,255,${0.2 + Math.random() * 0.4})`;
-        ctx.beginPath();
-        ctx.arc((i * 137 + 30) % W, (i * 89 + 15) % (H * 0.65), 0.6, 0, TAU);
-        ctx.fill();
+      if (!simSprite(ctx, 'eclipseNight', draw)) {
+        const grad = ctx.createLinearGradient(0, 0, 0, H);
+        grad.addColorStop(0, '#0a0e27'); grad.addColorStop(1, '#1a1a30');
+        ctx.fillStyle = grad; ctx.fillRect(0, 0, W, H);
       }
     }
 
@@ -1342,22 +1621,22 @@ function lerp(a, b, t) { return a + (b - a) * t; }
     ctx.beginPath();
     ctx.arc(W * 0.45 + 3, H * 0.67, 8, 0, TAU); ctx.fill();
 
-    // Calculate celestial body position
-    const altStart = isSolar ? ev.sunAltStart : ev.moonAltStart;
-    const altMax = isSolar ? ev.sunAltMax : ev.moonAltMax;
-    const altEnd = isSolar ? ev.sunAltEnd : ev.moonAltEnd;
-    const alt = altStart + t * (altEnd - altStart); // simplified linear interpolation
+    // Celestial body position from its computed altitude and azimuth
+    const screenX = azimuthView(ev);
+    const alt = pos.alt;
     const bodyY = H * 0.78 - (alt / 90) * H * 0.70;
-    const bodyX = W * 0.2 + t * W * 0.6;
+    const bodyX = screenX(pos.az);
+
+    // Body is hidden below the horizon
+    ctx.save();
+    ctx.beginPath(); ctx.rect(0, 0, W, H * 0.78); ctx.clip();
 
     if (isSolar) {
-      // ── Solar eclipse view from Seoul ──
+      // ── Solar eclipse view from the site: the Moon where it is relative to the Sun ──
       const sunR = 36;
-      const maxT = (ev.maxH - ev.startH) / (ev.endH - ev.startH);
-      // Moon moves across sun disk
-      const moonPhase = (t - maxT) * 3; // -1.5 to 1.5 normalized
-      const moonOffsetX = moonPhase * sunR * 1.2;
-      const moonOffsetY = -moonPhase * sunR * 0.3; // slight diagonal
+      const moonR = sunR * ev.ratio;
+      const moonOffsetX = pos.dx * sunR;
+      const moonOffsetY = -pos.dy * sunR;
 
       // Sun glow
       const glowR = sunR + 15;
@@ -1368,15 +1647,14 @@ function lerp(a, b, t) { return a + (b - a) * t; }
       ctx.beginPath(); ctx.arc(bodyX, bodyY, glowR, 0, TAU); ctx.fill();
 
       // Corona (visible near totality)
-      const distMax = Math.abs(t - maxT);
-      if (distMax < 0.15 && ev.kind === 'total') {
-        const coronaAlpha = Math.max(0, 1 - distMax * 10);
+      const coronaAlpha = Math.max(0, 1 - (sep - (ev.ratio - 1)) * 10);
+      if (coronaAlpha > 0 && ev.ratio > 1) {
         for (let a = 0; a < TAU; a += 0.15) {
           const cLen = sunR * (1.5 + 0.5 * Math.sin(a * 7));
           const cg = ctx.createLinearGradient(
             bodyX + sunR * 0.8 * Math.cos(a), bodyY + sunR * 0.8 * Math.sin(a),
             bodyX + cLen * Math.cos(a), bodyY + cLen * Math.sin(a));
-          cg.addColorStop(0, `rgba(255,255,255,${coronaAlpha * 0.5})`);
+          cg.addColorStop(0, `rgba(255,255,255,${Math.min(1, coronaAlpha) * 0.5})`);
           cg.addColorStop(1, 'rgba(255,255,255,0)');
           ctx.strokeStyle = cg; ctx.lineWidth = 2;
           ctx.beginPath();
@@ -1392,14 +1670,15 @@ function lerp(a, b, t) { return a + (b - a) * t; }
 
       // Moon disk overlapping
       ctx.fillStyle = '#1a1a2a';
-      const moonR = sunR * (ev.kind === 'annular' ? 0.92 : 1.02);
       ctx.beginPath(); ctx.arc(bodyX + moonOffsetX, bodyY + moonOffsetY, moonR, 0, TAU); ctx.fill();
 
     } else {
-      // ── Lunar eclipse view from Seoul ──
+      // ── Lunar eclipse view from the site: Earth's shadow where it is relative to the Moon ──
       const moonR = 32;
-      const maxT = (ev.maxH - ev.startH) / (ev.endH - ev.startH);
-      const eclipseProgress = 1 - Math.abs(t - maxT) / maxT; // 0 at start/end, 1 at max
+      const shadow = tracks.events[ev.id];
+      const shadowCx = bodyX + pos.dx * moonR, shadowCy = bodyY - pos.dy * moonR;
+      const umbraR = shadow.umbra * moonR, penumbraR = shadow.penumbra * moonR;
+      const umbral = Math.max(0, Math.min(1, (shadow.umbra + 1 - sep) / 2)); // covered fraction of the diameter
 
       // Moon disk (bright)
       ctx.fillStyle = '#e8e4d8';
@@ -1411,34 +1690,37 @@ function lerp(a, b, t) { return a + (b - a) * t; }
       ctx.beginPath(); ctx.arc(bodyX + 6, bodyY + 8, 5, 0, TAU); ctx.fill();
       ctx.beginPath(); ctx.arc(bodyX + 12, bodyY - 10, 4, 0, TAU); ctx.fill();
 
-      // Earth's shadow sweeping across
       ctx.save();
       ctx.beginPath(); ctx.arc(bodyX, bodyY, moonR, 0, TAU); ctx.clip();
 
-      // Shadow enters from left
-      const shadowCx = bodyX - moonR * 2.5 + eclipseProgress * moonR * 2.5;
-      const shadowR = moonR * 2.2;
-
-      // Penumbral shadow
-      const penGrad = ctx.createRadialGradient(shadowCx, bodyY, shadowR * 0.5, shadowCx, bodyY, shadowR);
-      penGrad.addColorStop(0, 'rgba(0,0,0,0.7)');
-      penGrad.addColorStop(0.6, 'rgba(80,20,10,0.5)');
+      // Penumbra: darkening towards the umbra's edge
+      const penGrad = ctx.createRadialGradient(shadowCx, shadowCy, umbraR, shadowCx, shadowCy, penumbraR);
+      penGrad.addColorStop(0, 'rgba(0,0,0,0.45)');
       penGrad.addColorStop(1, 'rgba(0,0,0,0)');
       ctx.fillStyle = penGrad;
-      ctx.beginPath(); ctx.arc(shadowCx, bodyY, shadowR, 0, TAU); ctx.fill();
+      ctx.beginPath(); ctx.arc(shadowCx, shadowCy, penumbraR, 0, TAU); ctx.fill();
 
-      // Blood moon tint at maximum
-      if (eclipseProgress > 0.6) {
-        const tint = (eclipseProgress - 0.6) / 0.4;
-        ctx.fillStyle = `rgba(180,50,20,${tint * 0.5})`;
-        ctx.beginPath(); ctx.arc(bodyX, bodyY, moonR, 0, TAU); ctx.fill();
-      }
+      // Umbra, reddened by sunlight refracted through Earth's atmosphere
+      ctx.fillStyle = 'rgba(0,0,0,0.7)';
+      ctx.beginPath(); ctx.arc(shadowCx, shadowCy, umbraR, 0, TAU); ctx.fill();
+      ctx.fillStyle = `rgba(180,50,20,${0.25 + 0.3 * umbral})`;
+      ctx.beginPath(); ctx.arc(shadowCx, shadowCy, umbraR, 0, TAU); ctx.fill();
       ctx.restore();
     }
+    ctx.restore();
+
+    // Compass direction, where it falls in this view
+    ctx.fillStyle = '#aaa'; ctx.font = '10px Noto Sans KR'; ctx.textAlign = 'center';
+    [['북', 0], ['동', 90], ['남', 180], ['서', 270]].forEach(([label, az]) => {
+      const x = screenX(az);
+      if (x > 10 && x < W - 10) ctx.fillText(label, x, H * 0.78 + 16);
+    });
+
+    if (isSolar) drawMap(ev, (currentH - ev.maxH) * 60);
 
     // Time and info display
     ctx.fillStyle = '#fff'; ctx.font = 'bold 13px Noto Sans KR'; ctx.textAlign = 'left';
-    ctx.fillText(`서울 관측 시각: ${String(hours).padStart(2,'0')}:${String(mins).padStart(2,'0')} KST`, 12, 22);
+    ctx.fillText(`${site.name} 관측 시각: ${String(hours).padStart(2,'0')}:${String(mins).padStart(2,'0')} ${site.tzName}`, 12, 22);
     ctx.font = '11px Noto Sans KR'; ctx.fillStyle = '#ddd';
     ctx.fillText(`고도: ${alt.toFixed(1)}°`, 12, 40);
     ctx.fillText(ev.date, 12, 56);
@@ -1450,109 +1732,167 @@ function lerp(a, b, t) { return a + (b - a) * t; }
     ctx.font = 'bold 12px Noto Sans KR'; ctx.textAlign = 'right';
     ctx.fillText(badge, W - 12, 22);
 
-    // Compass direction
-    ctx.fillStyle = '#aaa'; ctx.font = '10px Noto Sans KR'; ctx.textAlign = 'center';
-    ctx.fillText('남', W * 0.5, H * 0.78 + 16);
-    ctx.fillText('동', W * 0.08, H * 0.78 + 16);
-    ctx.fillText('서', W * 0.92, H * 0.78 + 16);
-
     if (info) info.textContent = ev.desc;
   }
 
   eventSelect.addEventListener('change', () => { timeSlider.value = 0; draw(); });
   timeSlider.addEventListener('input', draw);
   draw();
-})();
+});
 
 // ═══════════════════════════════════════════════════════════
 // 6. Geocentric vs Heliocentric Comparison
 // ═══════════════════════════════════════════════════════════
-(function() {
+simModule('geoCanvas', function() {
   const geoCanvas = document.getElementById('geoCanvas');
   const helioCanvas = document.getElementById('helioCanvas');
   if (!geoCanvas || !helioCanvas) return;
-  const gCtx = geoCanvas.getContext('2d');
-  const hCtx = helioCanvas.getContext('2d');
-  const gW = geoCanvas.width, gH = geoCanvas.height;
-  const hW = helioCanvas.width, hH = helioCanvas.height;
+  const geo = simSurface(geoCanvas), helio = simSurface(helioCanvas, geo);  // timed together by geoCanvas's loop
+  const { ctx: gCtx, W: gW, H: gH } = geo;
+  const { ctx: hCtx, W: hW, H: hH } = helio;
 
   const playBtn = document.getElementById('compPlayPause');
   const speedSlider = document.getElementById('compSpeed');
+  const planetSelect = document.getElementById('compPlanet');
   const info = document.getElementById('compInfo');
 
+  // Heliocentric tracks and retrograde stations (planets.py); t = days since jd0
+  const table = simTable('planets');
+  const nSamples = table.lon.shape[1];
+  const span = (nSamples - 1) * table.step;
+  const EARTH = table.bodies.indexOf('earth');
   let running = true, time = 0;
-  const earthPeriod = 365.25, marsPeriod = 687;
+  let planet = table.planets.find(p => p.key === 'mars') || table.planets[0];
+
+  // Planet trail in geocentric view, one point per clock step
+  const geoTrail = simTrail(800);
+  const clock = simClock();
 
-  // Mars trail in geocentric view
-  let marsGeoTrail = [];
+  table.planets.forEach(p => {
+    const opt = document.createElement('option');
+    opt.value = p.key; opt.textContent = `${p.name} (${p.nameEn})`;
+    opt.selected = p === planet;
+    planetSelect.appendChild(opt);
+  });
+  planetSelect.addEventListener('change', () => {
+    planet = table.planets.find(p => p.key === planetSelect.value);
+    geoTrail.clear();
+    if (!running) draw(time);
+  });
 
   playBtn.addEventListener('click', () => {
     running = !running;
     playBtn.textContent = running ? '⏸ 일시정지' : '▶ 재생';
-    if (running) animate();
+    if (running) { clock.reset(); animate(); }
   });
 
-  function drawStars(ctx, w, h) {
-    for (let i = 0; i < 40; i++) {
-      ctx.fillStyle = `rgba(255,255,255,${0.15 + Math.random() * 0.3})`;
-      ctx.beginPath();
-      ctx.arc((i * 137.5 + 50) % w, (i * 97.3 + 30) % h, 0.5, 0, TAU);
-      ctx.fill();
+  // Heliocentric (x, y) in AU, interpolated along the orbit in longitude and radius
+  function bodyAt(key, t, out) {
+    const x = t / table.step, i = Math.min(Math.floor(x), nSamples - 2), f = x - i;
+    const a = table.bodies.indexOf(key) * nSamples + i;
+    let d = table.lon[a + 1] - table.lon[a];
+    if (d > 180) d -= 360; else if (d < -180) d += 360;
+    const lon = (table.lon[a] + d * f) * DEG, r = lerp(table.r[a], table.r[a + 1], f);
+    out.x = r * Math.cos(lon); out.y = r * Math.sin(lon);
+    return out;
+  }
+
+  // The retrograde loop in progress at t, else the next one: {start, end, arc, active}
+  function loopAt(key, t) {
+    const s = table.stations[key];
+    for (let k = 0; k < s.length; k += 3) {
+      if (t < s[k + 1]) return { start: s[k], end: s[k + 1], arc: s[k + 2], active: t >= s[k] };
     }
+    return null;
+  }
+
+  function dateLabel(t) {
+    const d = jdToDate(table.jd0 + t);
+    return `${d.year}.${d.month}.${d.day}`;
+  }
+
+  // Stars are prerendered; the orbits depend on the planet
+  function drawBackdrop(ctx, name, w, h) {
+    if (simSprite(ctx, name)) return;
+    ctx.fillStyle = '#0a0e27'; ctx.fillRect(0, 0, w, h);
+  }
+
+  // Path of a body's orbit: the ellipse of its (a, e, ϖ) at jd0 with the Sun at (x0, y0), scale px per AU
+  function orbitPath(ctx, key, x0, y0, scale) {
+    const [a, e, varpi] = table.orbits[key];
+    const w = varpi * DEG, c = a * e * scale; // the centre is c from the Sun, away from perihelion
+    ctx.beginPath();
+    ctx.ellipse(x0 - c * Math.cos(w), y0 + c * Math.sin(w), a * scale, a * Math.sqrt(1 - e * e) * scale, -w, 0, TAU);
   }
 
-  function animate() {
+  const earth = { x: 0, y: 0 }, body = { x: 0, y: 0 };
+  // Geocentric view scale, px per AU: the farthest the planet gets from Earth
+  const geoScale = () => 150 / (planet.a + 1);
+
+  function animate(now) {
     if (!running) return;
-    const speed = parseFloat(speedSlider.value);
-    time += speed;
+    const speed = parseFloat(speedSlider.value); // days per clock step
+    for (let n = clock.tick(now); n > 0; n--) {
+      time += speed;
+      if (time > span) { time = 0; geoTrail.clear(); }
+      bodyAt('earth', time, earth);
+      bodyAt(planet.key, time, body);
+      geoTrail.push(gW / 2 + (body.x - earth.x) * geoScale(), gH / 2 - (body.y - earth.y) * geoScale());
+    }
+    draw(Math.max(0, time - speed * (1 - clock.alpha))); // between the last two steps
+    simFrame(geoCanvas, animate);
+  }
 
-    const earthAngle = TAU * time / earthPeriod;
-    const marsAngle = TAU * time / marsPeriod;
+  // Both views at time shown (also while paused, when the planet changes)
+  function draw(shown) {
+    bodyAt('earth', shown, earth);
+    bodyAt(planet.key, shown, body);
+    const loop = loopAt(planet.key, shown);
 
     // ── Heliocentric (right) ──
-    hCtx.fillStyle = '#0a0e27'; hCtx.fillRect(0, 0, hW, hH);
-    drawStars(hCtx, hW, hH);
+    drawBackdrop(hCtx, 'helio', hW, hH);
     const hCx = hW / 2, hCy = hH / 2;
-    const earthR = 90, marsR = 135;
+    const hScale = 135 / Math.max(planet.a, 1); // px per AU: the outer orbit fills the view
 
     // Orbits
-    hCtx.strokeStyle = 'rgba(68,136,204,0.2)'; hCtx.lineWidth = 0.5;
-    hCtx.beginPath(); hCtx.arc(hCx, hCy, earthR, 0, TAU); hCtx.stroke();
+    hCtx.lineWidth = 0.5;
+    hCtx.strokeStyle = 'rgba(68,136,204,0.2)';
+    orbitPath(hCtx, 'earth', hCx, hCy, hScale); hCtx.stroke();
     hCtx.strokeStyle = 'rgba(204,100,68,0.2)';
-    hCtx.beginPath(); hCtx.arc(hCx, hCy, marsR, 0, TAU); hCtx.stroke();
+    orbitPath(hCtx, planet.key, hCx, hCy, hScale); hCtx.stroke();
 
     // Sun
     hCtx.fillStyle = '#ffdd44';
     hCtx.beginPath(); hCtx.arc(hCx, hCy, 10, 0, TAU); hCtx.fill();
 
     // Earth
-    const eX = hCx + earthR * Math.cos(earthAngle);
-    const eY = hCy - earthR * Math.sin(earthAngle);
+    const eX = hCx + earth.x * hScale;
+    const eY = hCy - earth.y * hScale;
     hCtx.fillStyle = '#4488cc';
     hCtx.beginPath(); hCtx.arc(eX, eY, 5, 0, TAU); hCtx.fill();
 
-    // Mars
-    const mX = hCx + marsR * Math.cos(marsAngle);
-    const mY = hCy - marsR * Math.sin(marsAngle);
-    hCtx.fillStyle = '#cc6644';
-    hCtx.beginPath(); hCtx.arc(mX, mY, 4, 0, TAU); hCtx.fill();
+    // Planet
+    const pX = hCx + body.x * hScale;
+    const pY = hCy - body.y * hScale;
+    hCtx.fillStyle = planet.color;
+    hCtx.beginPath(); hCtx.arc(pX, pY, 4, 0, TAU); hCtx.fill();
 
     // Sight line
     hCtx.strokeStyle = 'rgba(255,255,100,0.2)'; hCtx.lineWidth = 0.5;
     hCtx.setLineDash([3, 3]);
-    hCtx.beginPath(); hCtx.moveTo(eX, eY); hCtx.lineTo(mX, mY); hCtx.stroke();
+    hCtx.beginPath(); hCtx.moveTo(eX, eY); hCtx.lineTo(pX, pY); hCtx.stroke();
     hCtx.setLineDash([]);
 
     // Labels
     hCtx.fillStyle = '#fff'; hCtx.font = '9px Noto Sans KR'; hCtx.textAlign = 'center';
     hCtx.fillText('태양', hCx, hCy + 18);
     hCtx.fillText('지구', eX, eY + 12);
-    hCtx.fillText('화성', mX, mY + 12);
+    hCtx.fillText(planet.name, pX, pY + 12);
 
     // ── Geocentric (left) ──
-    gCtx.fillStyle = '#0a0e27'; gCtx.fillRect(0, 0, gW, gH);
-    drawStars(gCtx, gW, gH);
+    drawBackdrop(gCtx, 'geo', gW, gH);
     const gCx = gW / 2, gCy = gH / 2;
+    const gScale = geoScale();
 
     // Earth at center
     gCtx.fillStyle = '#4488cc';
@@ -1561,79 +1901,53 @@ function lerp(a, b, t) { return a + (b - a) * t; }
     gCtx.fillText('지구', gCx, gCy + 18);
 
     // Sun orbits Earth in geocentric model
-    const sunGeoAngle = earthAngle; // Sun appears to orbit Earth
-    const sunGeoR = 80;
-    const sunGeoX = gCx + sunGeoR * Math.cos(sunGeoAngle);
-    const sunGeoY = gCy - sunGeoR * Math.sin(sunGeoAngle);
+    const sunGeoX = gCx - earth.x * gScale;
+    const sunGeoY = gCy + earth.y * gScale;
+    gCtx.strokeStyle = 'rgba(255,220,68,0.15)'; gCtx.lineWidth = 1;
+    gCtx.beginPath(); gCtx.arc(gCx, gCy, Math.hypot(earth.x, earth.y) * gScale, 0, TAU); gCtx.stroke();
     gCtx.fillStyle = '#ffdd44';
     gCtx.beginPath(); gCtx.arc(sunGeoX, sunGeoY, 8, 0, TAU); gCtx.fill();
     gCtx.fillStyle = '#fff'; gCtx.font = '9px Noto Sans KR';
     gCtx.fillText('태양', sunGeoX, sunGeoY + 15);
-    gCtx.strokeStyle = 'rgba(255,220,68,0.15)';
-    gCtx.beginPath(); gCtx.arc(gCx, gCy, sunGeoR, 0, TAU); gCtx.stroke();
-
-    // Mars in geocentric: relative position
-    const marsRelX = mX - eX; // Mars position relative to Earth
-    const marsRelY = mY - eY;
-    const marsRelDist = Math.sqrt(marsRelX * marsRelX + marsRelY * marsRelY);
-    const marsRelAngle = Math.atan2(marsRelY, marsRelX);
-
-    // Scale to fit canvas
-    const marsGeoR = marsRelDist * 0.7;
-    const marsGeoX = gCx + marsGeoR * Math.cos(marsRelAngle);
-    const marsGeoY = gCy + marsGeoR * Math.sin(marsRelAngle);
 
-    // Mars trail (shows epicycloid / retrograde)
-    marsGeoTrail.push({ x: marsGeoX, y: marsGeoY });
-    if (marsGeoTrail.length > 800) marsGeoTrail.shift();
+    // Planet relative to Earth (shows the epicycle-like loops)
+    const geoX = gCx + (body.x - earth.x) * gScale;
+    const geoY = gCy - (body.y - earth.y) * gScale;
 
     gCtx.strokeStyle = 'rgba(204,100,68,0.4)'; gCtx.lineWidth = 1;
-    gCtx.beginPath();
-    for (let i = 0; i < marsGeoTrail.length; i++) {
-      const p = marsGeoTrail[i];
-      i === 0 ? gCtx.moveTo(p.x, p.y) : gCtx.lineTo(p.x, p.y);
-    }
-    gCtx.stroke();
+    geoTrail.stroke(gCtx, Infinity, geo.quality);
 
-    gCtx.fillStyle = '#cc6644';
-    gCtx.beginPath(); gCtx.arc(marsGeoX, marsGeoY, 4, 0, TAU); gCtx.fill();
+    gCtx.fillStyle = planet.color;
+    gCtx.beginPath(); gCtx.arc(geoX, geoY, 4, 0, TAU); gCtx.fill();
     gCtx.fillStyle = '#fff'; gCtx.font = '9px Noto Sans KR';
-    gCtx.fillText('화성', marsGeoX, marsGeoY + 12);
+    gCtx.fillText(planet.name, geoX, geoY + 12);
 
-    // Epicycle explanation circle (visual only, approximate)
-    if (marsGeoTrail.length > 100) {
-      // Show that the trail forms loops
+    if (loop && loop.active) {
       gCtx.fillStyle = 'rgba(255,200,100,0.5)'; gCtx.font = '10px Noto Sans KR';
       gCtx.fillText('↺ 역행운동', gCx, gH - 12);
     }
 
-    // Check retrograde
-    const prevAngle = marsGeoTrail.length > 5 ?
-      Math.atan2(marsGeoTrail[marsGeoTrail.length-5].y - gCy, marsGeoTrail[marsGeoTrail.length-5].x - gCx) : marsRelAngle;
-    const angleDiff = marsRelAngle - prevAngle;
-    const isRetrograde = angleDiff < -0.001 || (angleDiff > Math.PI);
-
+    // Retrograde state straight from the station table
     if (info) {
-      const dayNum = Math.floor(time % (earthPeriod * 2));
-      info.textContent = `${dayNum}일 | ${isRetrograde ? '⚠ 역행 중 (Retrograde)' : '순행 중 (Prograde)'} | 화성의 궤적이 고리 모양을 그리는 것은 지구 공전 때문입니다`;
+      const loopText = loop ? `${dateLabel(loop.start)} ~ ${dateLabel(loop.end)}, 역행 호 ${loop.arc.toFixed(1)}°` : '';
+      const state = !loop ? '순행 중 (Prograde)'
+        : loop.active ? `⚠ 역행 중 (Retrograde): ${loopText}` : `순행 중 (Prograde) | 다음 역행: ${loopText}`;
+      info.textContent = `${dateLabel(shown)} | ${planet.name} ${state} | 고리 모양의 궤적은 지구 공전 때문입니다`;
     }
-
-    requestAnimationFrame(animate);
   }
 
   gCtx.fillStyle = '#0a0e27'; gCtx.fillRect(0, 0, gW, gH);
   hCtx.fillStyle = '#0a0e27'; hCtx.fillRect(0, 0, hW, hH);
   animate();
-})();
+});
 
 // ═══════════════════════════════════════════════════════════
 // 8. Axial Tilt & Seasons Simulation
 // ═══════════════════════════════════════════════════════════
-(function() {
+simModule('axialTiltCanvas', function() {
   const canvas = document.getElementById('axialTiltCanvas');
   if (!canvas) return;
-  const ctx = canvas.getContext('2d');
-  const W = canvas.width, H = canvas.height;
+  const { ctx, W, H } = simSurface(canvas);
   const latSlider = document.getElementById('tiltLatSlider');
   const daySlider = document.getElementById('tiltDaySlider');
   const latVal = document.getElementById('tiltLatVal');
@@ -1641,31 +1955,12 @@ function lerp(a, b, t) { return a + (b - a) * t; }
   const info = document.getElementById('tiltInfo');
 
   const OBLIQUITY = 23.44;
-  const S0 = 1361;
 
-  // ── Physics helpers ──
-  function solarDeclination(dayOfYear) {
-    return OBLIQUITY * Math.sin((dayOfYear - 81) * TAU / 365);
-  }
+  // ── Physics lookups (irradiance.py tables) ──
+  const declTable = simTable('irradiance').declination;
   function maxElevation(lat, decl) {
     return 90 - Math.abs(lat - decl);
   }
-  function dayLength(lat, decl) {
-    const latR = lat * DEG, declR = decl * DEG;
-    const cosHA = -Math.tan(latR) * Math.tan(declR);
-    if (cosHA <= -1) return 24;
-    if (cosHA >= 1) return 0;
-    return 2 * Math.acos(cosHA) / (15 * DEG) ;
-  }
-  function airMass(alpha) {
-    if (alpha <= 0) return Infinity;
-    return 1 / Math.sin(alpha * DEG);
-  }
-  function irradiance(alpha) {
-    if (alpha <= 0) return 0;
-    const am = airMass(alpha);
-    return S0 * Math.sin(alpha * DEG) * Math.pow(0.7, Math.pow(am, 0.678));
-  }
 
   function dayName(d) {
     const months = ['1월','2월','3월','4월','5월','6월','7월','8월','9월','10월','11월','12월'];
@@ -1684,23 +1979,17 @@ function lerp(a, b, t) { return a + (b - a) * t; }
     latVal.textContent = (lat >= 0 ? lat.toFixed(1) + '°N' : (-lat).toFixed(1) + '°S');
     dayVal.textContent = dayName(day);
 
-    const decl = solarDeclination(day);
+    const decl = declTable[day];
     const elev = maxElevation(lat, decl);
     const elevClamped = Math.max(elev, 0);
-    const dl = dayLength(lat, decl);
-    const irr = irradiance(elevClamped);
-    const am = elevClamped > 0 ? airMass(elevClamped) : Infinity;
-
-    ctx.clearRect(0, 0, W, H);
-    ctx.fillStyle = '#0a0e27';
-    ctx.fillRect(0, 0, W, H);
+    const dl = dayLengthAt(lat, decl);
+    const irr = elevationLookup('irradiance', elevClamped);
+    const am = elevationLookup('airMass', elevClamped);
 
     // Stars
-    for (let i = 0; i < 40; i++) {
-      ctx.fillStyle = `rgba(255,255,255,${0.15 + Math.random() * 0.35})`;
-      ctx.beginPath();
-      ctx.arc((i * 137.5) % W, (i * 97.3) % H, 0.4 + Math.random() * 0.6, 0, TAU);
-      ctx.fill();
+    if (!simSprite(ctx, 'axialTilt', draw)) {
+      ctx.fillStyle = '#0a0e27';
+      ctx.fillRect(0, 0, W, H);
     }
 
     // ── Left panel: Earth cross-section ──
@@ -2086,16 +2375,16 @@ function lerp(a, b, t) { return a + (b - a) * t; }
   latSlider.addEventListener('input', draw);
   daySlider.addEventListener('input', draw);
   draw();
-})();
+});
 
 // ═══════════════════════════════════════════════════════════
 // 9. Celestial Sphere — Sun's Diurnal Path (Oblique View)
 // ═══════════════════════════════════════════════════════════
-(function() {
+simModule('celestialSphereCanvas', function() {
   const canvas = document.getElementById('celestialSphereCanvas');
   if (!canvas) return;
-  const ctx = canvas.getContext('2d');
-  const W = canvas.width, H = canvas.height;
+  const surface = simSurface(canvas);
+  const { ctx, W, H } = surface;
   const latSlider = document.getElementById('csLatSlider');
   const daySlider = document.getElementById('csDaySlider');
   const latVal = document.getElementById('csLatVal');
@@ -2113,10 +2402,21 @@ function lerp(a, b, t) { return a + (b - a) * t; }
   const R = Math.min(W, H) * 0.40; // sphere radius in pixels (+10% zoom)
   const cx = W * 0.5, cy = H * 0.52;
 
-  let hourAngle = -180; // degrees, -180=midnight, 0=noon, +180=midnight
+  let hourAngle = -180; // degrees, -180=midnight, 0=noon, +180=midnight (as drawn)
   let playing = true;
   let animId = null;
-  let shadowTrail = []; // stores {x, y} of shadow tip positions
+  let swept = 0; // hour angle covered since the shadow trail was cleared, up to a full day
+  const HA_STEP = 0.8; // hour angle per clock step, degrees
+  const clock = simClock();
+  let stepHA = hourAngle; // hour angle at the last clock step; drawn up to one step behind
+
+  // Projected sun paths on a lat × decl × hour-angle grid (sun_paths.py), in sphere radii
+  const table = simTable('sunPaths');
+  const [nLat, nDecl, nHA] = table.points.shape;
+  const POLE_H = 0.22, SHADOW_MAX = 0.8;
+  const SIN_HALF_DEG = Math.sin(0.5 * DEG); // shadow shown above 0.5° altitude
+  let path = new Float32Array(nHA * 5); // the current day's samples, see pathFor()
+  let layer = null; // backdrop plus the current day's path, redrawn on slider input
 
   function solarDecl(day) {
     return OBLIQ * Math.sin((day - 81) * TAU / 365);
@@ -2172,17 +2472,37 @@ function lerp(a, b, t) { return a + (b - a) * t; }
     return Math.acos(cosH) / DEG;
   }
 
-  function draw() {
-    const lat = parseFloat(latSlider.value);
-    const day = parseInt(daySlider.value);
-    latVal.textContent = (lat >= 0 ? lat.toFixed(1) + '°N' : (-lat).toFixed(1) + '°S');
-    dayVal.textContent = dayName(day);
-
-    const decl = solarDecl(day);
-    const haMax = sunriseHA(lat, decl);
+  // Bilinear interpolation of the grid: one day's samples along the hour angle
+  function pathFor(lat, decl) {
+    const fi = Math.min(Math.max((lat - table.lat0) / table.latStep, 0), nLat - 1.000001);
+    const fj = Math.min(Math.max((decl - table.decl0) / table.declStep, 0), nDecl - 1.000001);
+    const i = Math.floor(fi), j = Math.floor(fj), u = fi - i, v = fj - j;
+    const w = [(1 - u) * (1 - v), (1 - u) * v, u * (1 - v), u * v];
+    const base = [(i * nDecl + j), (i * nDecl + j + 1), ((i + 1) * nDecl + j), ((i + 1) * nDecl + j + 1)];
+    const pts = table.points, out = new Float32Array(nHA * 5);
+    for (let c = 0; c < 4; c++) {
+      const o = base[c] * nHA * 5, wc = w[c] / table.scale;
+      for (let k = 0; k < nHA * 5; k++) out[k] += pts[o + k] * wc;
+    }
+    return out;
+  }
 
-    ctx.clearRect(0, 0, W, H);
+  // Sun (canvas px), sin(altitude) and shadow tip (offset from the gnomon base, px) at hour angle ha
+  function sample(ha, out) {
+    const f = Math.min(Math.max(((ha + 540) % 360 - 180 - table.ha0) / table.haStep, 0), nHA - 1.000001);
+    const k = Math.floor(f), t = f - k, a = k * 5, b = a + 5;
+    const s = lerp(path[a + 2], path[b + 2], t);
+    const len = s > 0 ? Math.min(POLE_H * Math.sqrt(Math.max(1 - s * s, 0)), SHADOW_MAX * s) / s : SHADOW_MAX;
+    out.x = cx + lerp(path[a], path[b], t) * R;
+    out.y = cy + lerp(path[a + 1], path[b + 1], t) * R;
+    out.sinAlt = s;
+    out.tipX = lerp(path[a + 3], path[b + 3], t) * len * R;
+    out.tipY = lerp(path[a + 4], path[b + 4], t) * len * R;
+    return out;
+  }
 
+  // The sky, ground, horizon and reference arcs never change
+  function drawBackdrop(ctx) {
     // Sky gradient
     const skyGrad = ctx.createLinearGradient(0, 0, 0, H);
     skyGrad.addColorStop(0, '#0a1530');
@@ -2316,52 +2636,48 @@ function lerp(a, b, t) { return a + (b - a) * t; }
     }
     ctx.setLineDash([]);
 
-    // ── Sun's diurnal path (full arc, dashed below horizon) ──
-    const pathPts = [];
-    for (let ha = -180; ha <= 180; ha += 1) {
-      const sp = sunPos(lat, decl, ha);
-      const pp = project(sp.azDeg, sp.altDeg);
-      pathPts.push({ ha, alt: sp.altDeg, px: pp.x, py: pp.y, depth: pp.depth });
-    }
+  }
+  // Layers at the resolution the surface started with (kept when its quality changes)
+  function layerCanvas() {
+    const c = document.createElement('canvas');
+    c.width = Math.round(W * surface.scale); c.height = Math.round(H * surface.scale);
+    c.getContext('2d').scale(c.width / W, c.height / H);
+    return c;
+  }
+  const backdrop = layerCanvas();
+  drawBackdrop(backdrop.getContext('2d'));
 
-    // Below-horizon portion (dashed)
-    ctx.strokeStyle = 'rgba(255,200,80,0.15)';
-    ctx.lineWidth = 1;
-    ctx.setLineDash([3, 5]);
-    ctx.beginPath();
-    first = true;
-    for (const pt of pathPts) {
-      if (pt.alt < 0) {
-        if (first) { ctx.moveTo(pt.px, pt.py); first = false; }
-        else ctx.lineTo(pt.px, pt.py);
-      } else {
-        first = true;
-      }
-    }
-    ctx.stroke();
-    ctx.setLineDash([]);
+  // Backdrop plus everything that depends only on the sliders
+  function drawDay(ctx, lat, decl, haMax, noonSun) {
+    ctx.drawImage(backdrop, 0, 0, W, H);
 
-    // Above-horizon portion (solid, glowing)
-    ctx.strokeStyle = 'rgba(255,200,80,0.6)';
-    ctx.lineWidth = 2;
-    ctx.beginPath();
-    first = true;
-    for (const pt of pathPts) {
-      if (pt.alt >= 0) {
-        if (first) { ctx.moveTo(pt.px, pt.py); first = false; }
-        else ctx.lineTo(pt.px, pt.py);
-      } else {
-        first = true;
+    // ── Sun's diurnal path (full arc, dashed below horizon) ──
+    // Table samples plus the exact sunrise/sunset, each span solid or dashed by its midpoint
+    const has = [];
+    for (let k = 0; k < nHA; k++) has.push(table.ha0 + k * table.haStep);
+    if (haMax > 0 && haMax < 180) has.push(-haMax, haMax);
+    has.sort((p, q) => p - q);
+    const p0 = {}, p1 = {}, mid = {};
+    for (const above of [false, true]) {
+      ctx.strokeStyle = above ? 'rgba(255,200,80,0.6)' : 'rgba(255,200,80,0.15)';
+      ctx.lineWidth = above ? 2 : 1;
+      ctx.setLineDash(above ? [] : [3, 5]);
+      ctx.beginPath();
+      let pen = false;
+      for (let k = 1; k < has.length; k++) {
+        if ((sample((has[k - 1] + has[k]) / 2, mid).sinAlt >= 0) !== above) { pen = false; continue; }
+        sample(has[k - 1], p0); sample(has[k], p1);
+        if (!pen) ctx.moveTo(p0.x, p0.y);
+        ctx.lineTo(p1.x, p1.y);
+        pen = true;
       }
+      ctx.stroke();
     }
-    ctx.stroke();
+    ctx.setLineDash([]);
 
     // Sunrise/sunset markers
     if (haMax > 0 && haMax < 180) {
-      const rise = sunPos(lat, decl, -haMax);
-      const set = sunPos(lat, decl, haMax);
-      const rp = project(rise.azDeg, Math.max(rise.altDeg, 0));
-      const sp2 = project(set.azDeg, Math.max(set.altDeg, 0));
+      const rp = sample(-haMax, p0), sp2 = sample(haMax, p1);
       // Rise marker
       ctx.fillStyle = '#ff8844';
       ctx.font = 'bold 10px sans-serif';
@@ -2372,83 +2688,97 @@ function lerp(a, b, t) { return a + (b - a) * t; }
       ctx.fillText('일몰', sp2.x, sp2.y + 14);
     }
 
+    // ── Meridian transit line (noon line from south horizon to zenith) ──
+    if (noonSun.altDeg > 0) {
+      const noonP = project(noonSun.azDeg, noonSun.altDeg);
+      ctx.strokeStyle = 'rgba(255,220,100,0.2)';
+      ctx.lineWidth = 1;
+      ctx.setLineDash([4, 4]);
+      ctx.beginPath();
+      ctx.moveTo(noonP.x, cy); // horizon at south
+      ctx.lineTo(noonP.x, noonP.y);
+      ctx.stroke();
+      ctx.setLineDash([]);
+      // Max altitude label
+      ctx.fillStyle = 'rgba(255,220,100,0.6)';
+      ctx.font = '10px sans-serif';
+      ctx.textAlign = 'left';
+      ctx.fillText('남중고도 ' + noonSun.altDeg.toFixed(1) + '°', noonP.x + 10, noonP.y - 2);
+    }
+  }
+
+  // Slider state, refreshed on input
+  let lat, decl, haMax, noonSun;
+  function update() {
+    lat = parseFloat(latSlider.value);
+    const day = parseInt(daySlider.value);
+    latVal.textContent = (lat >= 0 ? lat.toFixed(1) + '°N' : (-lat).toFixed(1) + '°S');
+    dayVal.textContent = dayName(day);
+    decl = solarDecl(day);
+    haMax = sunriseHA(lat, decl);
+    noonSun = sunPos(lat, decl, 0);
+    path = pathFor(lat, decl);
+    if (!layer) layer = layerCanvas();
+    drawDay(layer.getContext('2d'), lat, decl, haMax, noonSun);
+    swept = 0;
+    draw();
+  }
+
+  const sun = {}, tip = {};
+
+  // Per frame: the day layer, the shadow and the Sun marker
+  function draw() {
+    ctx.drawImage(layer, 0, 0, W, H);
+
     // ── Sun position (current hour angle) ──
-    const sunNow = sunPos(lat, decl, hourAngle);
-    const sunProj = project(sunNow.azDeg, sunNow.altDeg);
-    const isAbove = sunNow.altDeg >= 0;
+    const sunNow = sunPos(lat, decl, hourAngle); // for the readouts
+    sample(hourAngle, sun);
+    const isAbove = sun.sinAlt >= 0;
 
     if (isAbove) {
       // Sun glow
-      const sGrad = ctx.createRadialGradient(sunProj.x, sunProj.y, 3, sunProj.x, sunProj.y, 25);
+      const sGrad = ctx.createRadialGradient(sun.x, sun.y, 3, sun.x, sun.y, 25);
       sGrad.addColorStop(0, 'rgba(255,240,150,0.9)');
       sGrad.addColorStop(0.4, 'rgba(255,200,50,0.3)');
       sGrad.addColorStop(1, 'rgba(255,200,50,0)');
       ctx.fillStyle = sGrad;
-      ctx.beginPath(); ctx.arc(sunProj.x, sunProj.y, 25, 0, TAU); ctx.fill();
+      ctx.beginPath(); ctx.arc(sun.x, sun.y, 25, 0, TAU); ctx.fill();
       ctx.fillStyle = '#fff8d0';
-      ctx.beginPath(); ctx.arc(sunProj.x, sunProj.y, 7, 0, TAU); ctx.fill();
+      ctx.beginPath(); ctx.arc(sun.x, sun.y, 7, 0, TAU); ctx.fill();
     } else {
       // Below horizon: dim indicator
       ctx.fillStyle = 'rgba(255,200,100,0.3)';
-      ctx.beginPath(); ctx.arc(sunProj.x, sunProj.y, 5, 0, TAU); ctx.fill();
+      ctx.beginPath(); ctx.arc(sun.x, sun.y, 5, 0, TAU); ctx.fill();
       ctx.strokeStyle = 'rgba(255,200,100,0.2)';
       ctx.lineWidth = 1;
-      ctx.beginPath(); ctx.arc(sunProj.x, sunProj.y, 5, 0, TAU); ctx.stroke();
+      ctx.beginPath(); ctx.arc(sun.x, sun.y, 5, 0, TAU); ctx.stroke();
     }
 
     // ── Gnomon (vertical pole at center) and shadow ──
-    // The gnomon is a vertical stick at the observer's position (center of horizon)
-    const poleH = 0.22; // pole height in sphere-radius units
-    const origin = project(0, 0); // project won't work for center; use cx,cy directly
-    // Pole base = center of ground plane = (cx, cy) approximately
-    // But we need the projected center. Project a point at alt=0 averaged:
+    const poleTopZ = POLE_H * cosV; // the pole's top, tilted by the view
     const baseX = cx, baseY = cy;
-    // Pole top: a point straight up from center by poleH
-    // In 3D: (0, 0, poleH) → apply viewAz rotation (no effect on z-only), then tilt
-    const poleTopZ = poleH * cosV;
-    const poleTopY = poleH * sinV; // this becomes depth
-    const topX = baseX; // no x shift (pole is vertical, centered)
-    const topY = baseY - poleTopZ * R;
-
-    // Draw shadow first (behind pole)
-    if (isAbove && sunNow.altDeg > 0.5) {
-      // Shadow direction: opposite to sun's azimuth, projected on ground
-      const sunAzRad = sunNow.azDeg * DEG;
-      const sunAltRad = sunNow.altDeg * DEG;
-      const shadowLen = poleH / Math.tan(sunAltRad); // in sphere units
-      const clampedLen = Math.min(shadowLen, 0.8); // cap for very low sun
-
-      // Shadow tip in 3D ground plane: opposite to sun direction
-      // Sun at azimuth A → shadow points to azimuth A+180°
-      const shadAz = sunAzRad + Math.PI;
-      const shadX3 = clampedLen * Math.sin(shadAz); // east
-      const shadY3 = clampedLen * Math.cos(shadAz); // north
-      // Apply viewAz and viewElev rotation (z=0 for ground)
-      const sxr = shadX3 * cosA - shadY3 * sinA;
-      const syr = shadX3 * sinA + shadY3 * cosA;
-      const syr2 = syr * cosV;
-      const szr = syr * sinV;
-      const shadTipX = baseX + sxr * R;
-      const shadTipY = baseY - szr * R;
-
-      // Store shadow tip in trail
-      shadowTrail.push({ x: shadTipX, y: shadTipY });
-      if (shadowTrail.length > 600) shadowTrail.shift();
-
-      // Draw shadow trail (daytime segments only, broken by null markers)
-      if (shadowTrail.length > 1) {
-        ctx.strokeStyle = 'rgba(20,20,20,0.8)';
-        ctx.lineWidth = 1.5;
-        ctx.beginPath();
-        let penDown = false;
-        for (let i = 0; i < shadowTrail.length; i++) {
-          if (shadowTrail[i] === null) { penDown = false; continue; }
-          if (!penDown) { ctx.moveTo(shadowTrail[i].x, shadowTrail[i].y); penDown = true; }
-          else ctx.lineTo(shadowTrail[i].x, shadowTrail[i].y);
-        }
-        ctx.stroke();
+    const topX = baseX, topY = baseY - poleTopZ * R;
+
+    // Shadow trail: the tips over the hour angles swept so far, from the day's samples
+    ctx.strokeStyle = 'rgba(20,20,20,0.8)';
+    ctx.lineWidth = 1.5;
+    ctx.beginPath();
+    let pen = false;
+    const from = hourAngle - swept;
+    for (let ha = from; ; ha = Math.min((Math.floor(ha / table.haStep) + 1) * table.haStep, hourAngle)) {
+      sample(ha, tip);
+      if (tip.sinAlt > SIN_HALF_DEG) {
+        pen ? ctx.lineTo(baseX + tip.tipX, baseY + tip.tipY) : ctx.moveTo(baseX + tip.tipX, baseY + tip.tipY);
+        pen = true;
+      } else {
+        pen = false;
       }
+      if (ha >= hourAngle) break;
+    }
+    ctx.stroke();
 
+    if (sun.sinAlt > SIN_HALF_DEG) {
+      const shadTipX = baseX + sun.tipX, shadTipY = baseY + sun.tipY;
       // Shadow line (black, same thickness as pole)
       ctx.strokeStyle = '#111';
       ctx.lineWidth = 3;
@@ -2462,11 +2792,6 @@ function lerp(a, b, t) { return a + (b - a) * t; }
       ctx.beginPath();
       ctx.arc(shadTipX, shadTipY, 3, 0, TAU);
       ctx.fill();
-    } else {
-      // Sun below horizon: insert null break so trail segments don't connect
-      if (shadowTrail.length > 0 && shadowTrail[shadowTrail.length - 1] !== null) {
-        shadowTrail.push(null);
-      }
     }
 
     // Pole body
@@ -2487,25 +2812,6 @@ function lerp(a, b, t) { return a + (b - a) * t; }
     ctx.arc(baseX, baseY, 3, 0, TAU);
     ctx.fill();
 
-    // ── Meridian transit line (noon line from south horizon to zenith) ──
-    const noonSun = sunPos(lat, decl, 0);
-    if (noonSun.altDeg > 0) {
-      const noonP = project(noonSun.azDeg, noonSun.altDeg);
-      ctx.strokeStyle = 'rgba(255,220,100,0.2)';
-      ctx.lineWidth = 1;
-      ctx.setLineDash([4, 4]);
-      ctx.beginPath();
-      ctx.moveTo(noonP.x, cy); // horizon at south
-      ctx.lineTo(noonP.x, noonP.y);
-      ctx.stroke();
-      ctx.setLineDash([]);
-      // Max altitude label
-      ctx.fillStyle = 'rgba(255,220,100,0.6)';
-      ctx.font = '10px sans-serif';
-      ctx.textAlign = 'left';
-      ctx.fillText('남중고도 ' + noonSun.altDeg.toFixed(1) + '°', noonP.x + 10, noonP.y - 2);
-    }
-
     // ── Time info ──
     // Convert hour angle to clock time (HA=0 → 12:00, HA=-90 → 06:00)
     const clockH = ((hourAngle + 180) / 15 + 0) % 24;
@@ -2538,25 +2844,31 @@ function lerp(a, b, t) { return a + (b - a) * t; }
       '<strong>시각:</strong> ' + timeStr;
   }
 
-  function animate() {
+  function animate(now) {
     if (!playing) return;
-    hourAngle += 0.8; // speed
-    if (hourAngle > 180) hourAngle -= 360;
+    const from = hourAngle;
+    stepHA += HA_STEP * clock.tick(now);
+    if (stepHA > 180) stepHA -= 360;
+    hourAngle = stepHA - HA_STEP * (1 - clock.alpha); // between the last two steps
+    if (hourAngle < -180) hourAngle += 360;
+    let d = hourAngle - from;
+    if (d < -180) d += 360; // wrapped past midnight
+    swept = Math.min(swept + Math.max(d, 0), 360);
     draw();
-    animId = requestAnimationFrame(animate);
+    animId = simFrame(canvas, animate);
   }
 
-  latSlider.addEventListener('input', function() { shadowTrail = []; draw(); });
-  daySlider.addEventListener('input', function() { shadowTrail = []; draw(); });
+  latSlider.addEventListener('input', update);
+  daySlider.addEventListener('input', update);
   playBtn.addEventListener('click', function() {
     playing = !playing;
     playBtn.textContent = playing ? '⏸ 일시정지' : '▶ 재생';
-    if (playing) { shadowTrail = []; animate(); }
+    if (playing) { swept = 0; stepHA = hourAngle; clock.reset(); animate(); }
   });
 
-  draw();
+  update();
   animate();
-})();
+});
 
 // ═══════════════════════════════════════════════════════════
 // KaTeX auto-render
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""Static simulation backdrops rasterized once at build time into one PNG sprite atlas.
+
+Starfields, fixed orbit rings and colour legends never change between frames, yet
+the simulations used to repaint them (with Math.random alphas, so the stars
+flickered at the frame rate). Each layer here reproduces that drawing with
+NumPy coverage masks (anti-aliased discs, rings, dashes and rectangles) in
+the canvas' own CSS pixels, rasterized at SCALE device pixels per CSS pixel
+to stay sharp on HiDPI screens (simSurface() in simulations.js goes up to
+2x); the layers are stacked into one atlas, and simSprite() in
+simulations.js draws a layer at the canvas' CSS size with a single
+drawImage per frame.
+
+Only shapes are rasterized; text stays with the canvas so it uses the page's fonts.
+"""
+import struct, zlib
+
+import numpy as np
+
+SEED = 20260101
+SCALE = 2  # atlas pixels per CSS pixel
+
+
+# ═══════════════════════════════════════════════════════════
+# Rasterizer
+# ═══════════════════════════════════════════════════════════
+def _rgb(color):
+    color = color.lstrip('#')
+    return np.array([int(color[i:i + 2], 16) for i in (0, 2, 4)], dtype=float) / 255
+
+
+class Layer:
+    """Straight-alpha RGBA float image with 'source-over' compositing, like a 2D canvas.
+
+    w, h and every drawing coordinate are CSS pixels, as in the page's code; the
+    image has scale pixels per CSS pixel, like a canvas with that transform.
+    """
+
+    def __init__(self, w, h, background=None, scale=SCALE):
+        self.w, self.h, self.scale = w, h, scale
+        self.pw, self.ph = int(round(w * scale)), int(round(h * scale))
+        self.rgba = np.zeros((self.ph, self.pw, 4))
+        # Pixel centres, as the canvas samples them, in CSS pixels
+        self.x = (np.arange(self.pw) + 0.5) / scale
+        self.y = ((np.arange(self.ph) + 0.5) / scale)[:, None]
+        if background:
+            self.rgba[..., :3] = _rgb(background)
+            self.rgba[..., 3] = 1
+
+    def paint(self, coverage, color, alpha=1.0, box=None):
+        """Composite color at alpha * coverage (an array over the pixel box (y0, y1, x0, x1), default everything)."""
+        y0, y1, x0, x1 = box or (0, self.ph, 0, self.pw)
+        a = (np.clip(coverage, 0, 1) * alpha)[..., None]
+        dst = self.rgba[y0:y1, x0:x1]
+        out_a = a + dst[..., 3:] * (1 - a)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rgb = (_rgb(color) * a + dst[..., :3] * dst[..., 3:] * (1 - a)) / out_a
+        dst[..., :3] = np.where(out_a > 0, rgb, 0)
+        dst[..., 3:] = out_a
+
+    def _box(self, x0, y0, x1, y1):
+        """Pixel box (y0, y1, x0, x1) around a CSS-pixel rectangle, clipped to the image."""
+        s = self.scale
+        box = (max(int(np.floor(y0 * s)), 0), min(int(np.ceil(y1 * s)) + 1, self.ph),
+               max(int(np.floor(x0 * s)), 0), min(int(np.ceil(x1 * s)) + 1, self.pw))
+        return box if box[0] < box[1] and box[2] < box[3] else None
+
+    def disc(self, cx, cy, r, color, alpha=1.0):
+        box = self._box(cx - r - 1, cy - r - 1, cx + r + 1, cy + r + 1)
+        if box:
+            y0, y1, x0, x1 = box
+            d = np.hypot(self.x[x0:x1] - cx, self.y[y0:y1] - cy)
+            self.paint((r - d) * self.scale + 0.5, color, alpha, box)
+
+    def ring(self, cx, cy, r, width, color, alpha=1.0, dash=None):
+        """Stroked circle; dash = (on, off) in CSS pixels along the arc, starting at angle 0 like setLineDash."""
+        box = self._box(cx - r - width - 1, cy - r - width - 1, cx + r + width + 1, cy + r + width + 1)
+        if not box:
+            return
+        y0, y1, x0, x1 = box
+        dx, dy = self.x[x0:x1] - cx, self.y[y0:y1] - cy
+        # A hairline keeps its nominal alpha spread over ~1 device px, as canvas renders it
+        px_width = width * self.scale
+        half = max(px_width, 1.0) / 2
+        coverage = np.clip(half + 0.5 - np.abs(np.hypot(dx, dy) - r) * self.scale, 0, 1) * min(px_width, 1.0)
+        if dash:
+            arc = np.mod(np.arctan2(dy, dx), 2 * np.pi) * r
+            coverage = coverage * (np.mod(arc, dash[0] + dash[1]) < dash[0])
+        self.paint(coverage, color, alpha, box)
+
+    def rect(self, x, y, w, h, color, alpha=1.0):
+        """Axis-aligned rectangle with fractional edges."""
+        box = self._box(x, y, x + w, y + h)
+        if box:
+            y0, y1, x0, x1 = box
+            s = self.scale
+            px, py = np.arange(x0, x1), np.arange(y0, y1)[:, None]
+            cov_x = np.clip(np.minimum((x + w) * s, px + 1) - np.maximum(x * s, px), 0, 1)
+            cov_y = np.clip(np.minimum((y + h) * s, py + 1) - np.maximum(y * s, py), 0, 1)
+            self.paint(cov_x * cov_y, color, alpha, box)
+
+    def vertical_gradient(self, top, bottom):
+        t = (self.y / self.h) * np.ones((1, self.pw))
+        self.rgba[..., :3] = _rgb(top) * (1 - t[..., None]) + _rgb(bottom) * t[..., None]
+        self.rgba[..., 3] = 1
+
+    def to_uint8(self):
+        return np.rint(np.clip(self.rgba, 0, 1) * 255).astype(np.uint8)
+
+
+def encode_png(rgba):
+    """PNG bytes of an (h, w, 4) uint8 array (no image library needed)."""
+    h, w, _ = rgba.shape
+    raw = np.concatenate([np.zeros((h, 1), dtype=np.uint8), rgba.reshape(h, w * 4)], axis=1).tobytes()
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', w, h, 8, 6, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw, 9)) + chunk(b'IEND', b''))
+
+
+# ═══════════════════════════════════════════════════════════
+# Layers (each mirrors the drawing it replaces in simulations.js)
+# ═══════════════════════════════════════════════════════════
+NIGHT = '#0a0e27'
+
+
+def stars(layer, rng, count, x0, xk, y0, yk, r_min, r_rand, a_min, a_rand, height=None):
+    """The pages' starfield: star i at ((x0 + i*xk) % W, (y0 + i*yk) % H), random size and brightness."""
+    height = height or layer.h
+    for i in range(count):
+        layer.disc((x0 + i * xk) % layer.w, (y0 + i * yk) % height,
+                   r_min + rng.random() * r_rand, '#ffffff', a_min + rng.random() * a_rand)
+
+
+def gravity_layer(w, h, rng):
+    layer = Layer(w, h, NIGHT)
+    stars(layer, rng, 60, 0, 137.5, 0, 97.3, 0.5, 1.0, 0.2, 0.5)
+    return layer
+
+
+def escape_layer(w, h, rng):
+    layer = Layer(w, h, NIGHT)
+    stars(layer, rng, 50, 0, 137.5, 0, 97.3, 0.4, 0.5, 0.15, 0.3)
+    # Orbit reference circles (45 px per Earth radius, centred at 40% width)
+    for r in (2, 4, 6):
+        layer.ring(w * 0.4, h * 0.5, r * 45, 1, '#6496ff', 0.1, dash=(3, 5))
+    # Speed colour legend
+    for i in range(60):
+        t = i / 59
+        color = '#%02x%02x%02x' % (int(80 + 175 * t), int(180 - 80 * t), int(255 - 200 * t))
+        layer.rect(w - 140 + i * 1.5, h - 18, 1.5, 8, color)
+    return layer
+
+
+def comparison_layer(w, h, rng):
+    """geo/helio views: stars only, the orbit circles scale with the chosen planet."""
+    layer = Layer(w, h, NIGHT)
+    stars(layer, rng, 40, 50, 137.5, 30, 97.3, 0.5, 0, 0.15, 0.3)
+    return layer
+
+
+def axial_tilt_layer(w, h, rng):
+    layer = Layer(w, h, NIGHT)
+    stars(layer, rng, 40, 0, 137.5, 0, 97.3, 0.4, 0.6, 0.15, 0.35)
+    return layer
+
+
+def eclipse_night_layer(w, h, rng):
+    layer = Layer(w, h)
+    layer.vertical_gradient('#0a0e27', '#1a1a30')
+    stars(layer, rng, 50, 30, 137, 15, 89, 0.6, 0, 0.2, 0.4, height=h * 0.65)
+    return layer
+
+
+# sprite name -> (canvas id, draw(w, h, rng))
+LAYERS = {
+    'gravity': ('gravityCanvas', gravity_layer),
+    'escape': ('escapeCanvas', escape_layer),
+    'geo': ('geoCanvas', comparison_layer),
+    'helio': ('helioCanvas', comparison_layer),
+    'axialTilt': ('axialTiltCanvas', axial_tilt_layer),
+    'eclipseNight': ('eclipseObsCanvas', eclipse_night_layer),
+}
+
+
+def sprite_atlas(canvas_sizes):
+    """(png bytes, {name: [x, y, w, h]}) for every layer whose canvas is in canvas_sizes.
+
+    The rects are in atlas pixels, SCALE times the canvas' CSS size. Layers are stacked top to bottom; each uses its own seeded generator so
+    adding a layer does not reshuffle the others' stars.
+    """
+    layers = {}
+    for i, (name, (canvas_id, draw)) in enumerate(LAYERS.items()):
+        if canvas_id in canvas_sizes:
+            layers[name] = draw(*canvas_sizes[canvas_id], np.random.default_rng([SEED, i])).to_uint8()
+    if not layers:
+        return None, {}
+    width = max(img.shape[1] for img in layers.values())
+    atlas = np.zeros((sum(img.shape[0] for img in layers.values()), width, 4), dtype=np.uint8)
+    rects, y = {}, 0
+    for name, img in layers.items():
+        h, w, _ = img.shape
+        atlas[y:y + h, :w] = img
+        rects[name] = [0, y, w, h]
+        y += h
+    return encode_png(atlas), rects
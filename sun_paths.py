@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Projected diurnal sun paths and gnomon shadow tips for the chapter 4 celestial sphere.
+
+The celestial-sphere simulation draws the Sun's path for the latitude and
+date sliders in an oblique parallel projection, with a gnomon at the centre
+whose shadow tip traces a curve over the day. Both depend only on latitude,
+declination and hour angle. This module projects them for a latitude x
+declination x hour-angle grid at build time, in sphere-radius units with y
+down, so the page scales them by the canvas radius. The page interpolates the
+grid when a slider moves and only moves the Sun marker each frame.
+"""
+import numpy as np
+
+# Must match project() and the gnomon in the celestialSphereCanvas module
+VIEW_ELEV = 30.0      # view elevation above the horizon plane
+VIEW_AZ = -135.0      # scene rotation, so south is upper left
+POLE_H = 0.22         # gnomon height, sphere radii
+SHADOW_MAX = 0.8      # the drawn shadow is capped for a low Sun
+
+# ~1.5 px worst case on the 700 x 400 canvas (bench_kernels.py 'sun_path'), 75 kB
+LAT_RANGE = (-70.0, 90.0, 10.0)       # covers the csLatSlider range
+DECL_RANGE = (-24.0, 24.0, 6.0)       # covers ±23.44°
+HA_RANGE = (-180.0, 180.0, 7.5)
+SCALE = 8192                          # int16 quantum: 1/8192 sphere radius (0.02 px at R = 160)
+
+# Channels of the table's last axis
+SUN_X, SUN_Y, SIN_ALT, SHADOW_X, SHADOW_Y = range(5)
+
+
+# ═══════════════════════════════════════════════════════════
+# Kernels
+# ═══════════════════════════════════════════════════════════
+def horizon_vector(lat, decl, ha):
+    """Unit vector to the Sun in the horizon frame: (east, north, up)."""
+    phi, delta, h = np.radians(lat), np.radians(decl), np.radians(ha)
+    east = -np.cos(delta) * np.sin(h)
+    north = np.cos(phi) * np.sin(delta) - np.sin(phi) * np.cos(delta) * np.cos(h)
+    up = np.sin(phi) * np.sin(delta) + np.cos(phi) * np.cos(delta) * np.cos(h)
+    return east, north, up
+
+
+def project(east, north, up):
+    """Canvas offset from the sphere centre in sphere radii (x right, y down)."""
+    ca, sa = np.cos(np.radians(VIEW_AZ)), np.sin(np.radians(VIEW_AZ))
+    cv, sv = np.cos(np.radians(VIEW_ELEV)), np.sin(np.radians(VIEW_ELEV))
+    x = east * ca - north * sa
+    y = east * sa + north * ca
+    return x, -(y * sv + up * cv)
+
+
+def shadow_length(sin_alt):
+    """Length of the drawn shadow in sphere radii: POLE_H / tan(altitude), capped at SHADOW_MAX."""
+    sin_alt = np.asarray(sin_alt, dtype=float)
+    cos_alt = np.sqrt(np.maximum(1 - sin_alt ** 2, 0.0))
+    return np.minimum(POLE_H * cos_alt, SHADOW_MAX * np.maximum(sin_alt, 0.0)) / np.maximum(sin_alt, 1e-12)
+
+
+def shadow_direction(east, north):
+    """Projected unit ground vector pointing away from the Sun (the shadow's direction)."""
+    ground = np.maximum(np.hypot(east, north), 1e-12)
+    return project(-east / ground, -north / ground, 0.0)
+
+
+def sun_path(lat, decl, ha):
+    """(..., 5) array: projected Sun x, y, sin(altitude), shadow direction x, y.
+
+    These interpolate smoothly across the grid; the altitude and the shadow
+    length are nonlinear in them, so the page derives both per sample.
+    """
+    east, north, up = horizon_vector(lat, decl, ha)
+    sx, sy = project(east, north, up)
+    dx, dy = shadow_direction(east, north)
+    return np.stack(np.broadcast_arrays(sx, sy, up, dx, dy), axis=-1)
+
+
+def shadow_tip(lat, decl, ha):
+    """Projected shadow tip (x, y) relative to the gnomon's base, sphere radii."""
+    east, north, up = horizon_vector(lat, decl, ha)
+    dx, dy = shadow_direction(east, north)
+    length = shadow_length(up)
+    return dx * length, dy * length
+
+
+# ═══════════════════════════════════════════════════════════
+# Table for the page
+# ═══════════════════════════════════════════════════════════
+def _grid(lo, hi, step):
+    return np.arange(lo, hi + step / 2, step)
+
+
+def sun_path_table(lat_range=LAT_RANGE, decl_range=DECL_RANGE, ha_range=HA_RANGE):
+    """SIM_DATA.sunPaths: int16 (lat, decl, ha, 5) sun_path() samples.
+
+    Every channel is multiplied by scale. The page interpolates bilinearly
+    in (lat, decl) and linearly along the hour angle.
+    """
+    lat, decl, ha = _grid(*lat_range), _grid(*decl_range), _grid(*ha_range)
+    path = sun_path(lat[:, None, None], decl[None, :, None], ha[None, None, :])
+    return {
+        'lat0': float(lat[0]), 'latStep': lat_range[2],
+        'decl0': float(decl[0]), 'declStep': decl_range[2],
+        'ha0': float(ha[0]), 'haStep': ha_range[2],
+        'scale': SCALE,
+        'channels': ['sunX', 'sunY', 'sinAlt', 'shadowX', 'shadowY'],
+        'points': np.rint(path * SCALE).astype(np.int16),
+    }
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""Launch trajectories for the chapter 1 escape-velocity simulation, integrated in bulk.
+
+Every launch speed on the slider grid is advanced at once as NumPy arrays
+with the same velocity Verlet scheme and step the page used to run live
+(GM = 1, Earth radius = 1, launch horizontally from r = 1.2). A trajectory
+stops where the page would stop it: impact on the surface, escape beyond
+r = 12, or the step limit. Closed orbits also stop after one revolution,
+since the page can replay them periodically. The paths are decimated,
+quantized to int16, and baked into the escape module, so the slider only
+selects a path.
+
+    python trajectories.py fan.svg   # every trajectory in one classroom fan plot
+"""
+import sys
+
+import numpy as np
+
+GM = 1.0
+LAUNCH_R = 1.2
+DT = 0.005
+MAX_STEPS = 12000
+ESCAPE_R = 12.0
+IMPACT_MIN_STEPS = 5      # grazing launches may dip below r = 1 in the first few steps
+V_RANGE = (0.3, 2.0, 0.01)  # the escapeVelSlider min/max/step
+EVERY = 20                # keep one sample per EVERY integration steps
+SCALE = 2048              # int16 quantum: 1/2048 Earth radii (~0.02 px on the 45 px/R canvas)
+
+# Fates
+RUNNING, IMPACT, ESCAPE, CLOSED = 0, 1, 2, 3
+
+
+# ═══════════════════════════════════════════════════════════
+# Integrator
+# ═══════════════════════════════════════════════════════════
+def _accel(pos):
+    r2 = np.einsum('ij,ij->i', pos, pos)
+    return -GM * pos / (r2 * np.sqrt(r2))[:, None]
+
+
+def verlet_step(pos, vel, acc, dt=DT):
+    """One velocity Verlet step for (n, 2) arrays; returns the new (pos, vel, acc)."""
+    v_half = vel + 0.5 * dt * acc
+    pos = pos + dt * v_half
+    acc = _accel(pos)
+    return pos, v_half + 0.5 * dt * acc, acc
+
+
+def integrate(v0, dt=DT, max_steps=MAX_STEPS, every=EVERY):
+    """Advance every launch speed in v0 together.
+
+    Returns (samples, steps, fate): samples is (max_steps // every + 2, n, 2)
+    float64 positions at step k * every (each path frozen after it stops, with
+    its exact final position as the sample after its last full one), steps the
+    step each path stopped at, fate one of RUNNING/IMPACT/ESCAPE/CLOSED.
+    """
+    v0 = np.asarray(v0, dtype=float)
+    n = len(v0)
+    pos = np.zeros((n, 2))
+    pos[:, 1] = -LAUNCH_R
+    vel = np.zeros((n, 2))
+    vel[:, 0] = v0
+    acc = _accel(pos)
+    swept = np.zeros(n)
+    steps = np.full(n, max_steps, dtype=np.int64)
+    fate = np.zeros(n, dtype=np.uint8)
+    samples = np.empty((max_steps // every + 2, n, 2))
+    samples[0] = pos
+    live = np.arange(n)  # indices still integrating
+    for step in range(1, max_steps + 1):
+        p = pos[live]
+        p_new, vel[live], a_new = verlet_step(p, vel[live], acc[live], dt)
+        # Signed angle swept this step, for detecting one full revolution
+        swept[live] += np.arctan2(p[:, 0] * p_new[:, 1] - p[:, 1] * p_new[:, 0],
+                                  np.einsum('ij,ij->i', p, p_new))
+        pos[live], acc[live] = p_new, a_new
+
+        r = np.hypot(p_new[:, 0], p_new[:, 1])
+        hit = (r < 1.0) & (step > IMPACT_MIN_STEPS)
+        gone = r > ESCAPE_R
+        closed = np.abs(swept[live]) >= 2 * np.pi
+        done = hit | gone | closed
+        if step % every == 0:
+            samples[step // every] = pos
+        if done.any():
+            ended = live[done]
+            fate[ended] = np.select([hit[done], gone[done]], [IMPACT, ESCAPE], CLOSED)
+            steps[ended] = step
+            samples[-(-step // every), ended] = pos[ended]  # end point at the next sample slot
+            live = live[~done]
+            if not len(live):
+                break
+    return samples, steps, fate
+
+
+# ═══════════════════════════════════════════════════════════
+# Table for the page
+# ═══════════════════════════════════════════════════════════
+def launch_speeds(v_range=V_RANGE):
+    lo, hi, step = v_range
+    return np.round(np.arange(lo, hi + step / 2, step), 6)
+
+
+def escape_atlas(v_range=V_RANGE, every=EVERY):
+    """SIM_DATA.escapeAtlas: ragged int16 paths, one per slider value.
+
+    Path i occupies samples offsets[i]..offsets[i+1] of xy (x, y interleaved,
+    Earth radii * scale); sample k is step k * every, except the last, which
+    is the path's final step. CLOSED paths repeat with a period of steps[i].
+    """
+    v0 = launch_speeds(v_range)
+    samples, steps, fate = integrate(v0, every=every)
+    counts = -(-steps // every) + 1
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    xy = np.concatenate([samples[:c, i] for i, c in enumerate(counts)])
+    return {
+        'v0': float(v0[0]), 'vStep': v_range[2], 'dt': DT, 'every': every,
+        'maxSteps': MAX_STEPS, 'scale': SCALE,
+        'fates': ['running', 'impact', 'escape', 'closed'],
+        'steps': steps.astype(np.uint16),
+        'fate': fate,
+        'offsets': offsets.astype(np.uint32),
+        'xy': np.rint(xy * SCALE).astype(np.int16),
+    }
+
+
+# ═══════════════════════════════════════════════════════════
+# Fan plot
+# ═══════════════════════════════════════════════════════════
+FATE_COLORS = {RUNNING: '#8899aa', IMPACT: '#ff6644', ESCAPE: '#ffcc44', CLOSED: '#66aaff'}
+
+
+def fan_svg(v_range=V_RANGE, every=EVERY, size=720, extent=6.0):
+    """Every trajectory of the atlas in one SVG, colored by fate, clipped to |x|, |y| < extent."""
+    v0 = launch_speeds(v_range)
+    samples, steps, fate = integrate(v0, every=every)
+    k = size / (2 * extent)
+    paths = []
+    for i in range(len(v0)):
+        pts = samples[:-(-steps[i] // every) + 1, i] * k + size / 2
+        d = 'M' + ' L'.join(f'{x:.1f},{y:.1f}' for x, y in pts)
+        paths.append(f'<path d="{d}" stroke="{FATE_COLORS[fate[i]]}"><title>v = {v0[i]:.2f}</title></path>')
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" viewBox="0 0 {size} {size}">\n'
+            f'<rect width="{size}" height="{size}" fill="#0a0e27"/>\n'
+            f'<clipPath id="c"><rect width="{size}" height="{size}"/></clipPath>\n'
+            f'<g clip-path="url(#c)" fill="none" stroke-width="0.8" stroke-opacity="0.7">\n'
+            + '\n'.join(paths) +
+            f'\n</g>\n<circle cx="{size / 2}" cy="{size / 2}" r="{k}" fill="#2266cc"/>\n</svg>\n')
+
+
+if __name__ == '__main__':
+    out = sys.argv[1] if len(sys.argv) > 1 else 'escape-fan.svg'
+    with open(out, 'w', encoding='utf-8') as f:
+        f.write(fan_svg())
+    print(f'{out}: {len(launch_speeds())} trajectories')